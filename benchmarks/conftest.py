@@ -0,0 +1,54 @@
+"""
+Fixtures of the benchmark suite, every benchmark runs against the simulator and records in the extra_info of the
+report the terminal calls and the memory allocated by one execution of the operation.
+
+Usage:
+    pytest benchmarks --benchmark-autosave
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+
+import importlib.util
+import tracemalloc
+
+import pytest
+
+from metatrader5EasyT.simulator import Simulator
+
+# The MetaTrader5 package only exists on Windows, elsewhere a simulator stands in for it before the benchmarks import the
+# other modules of this package, every benchmark installs its own simulator anyway.
+if importlib.util.find_spec("MetaTrader5") is None:
+    Simulator(symbols=["EURUSD"], history_minutes=1).install()
+
+from metatrader5EasyT.symbol_info import symbol_cache  # noqa: E402
+
+
+@pytest.fixture
+def terminal():
+    """
+    It installs a simulator with one EURUSD symbol and enough history for 100k bars.
+    """
+    simulator = Simulator(symbols=["EURUSD"], tick_rate=1000, history_minutes=110_000).install()
+    symbol_cache.invalidate()
+    yield simulator
+    simulator.uninstall()
+    symbol_cache.invalidate()
+
+
+def account(benchmark, terminal: Simulator, function, *args) -> dict:
+    """
+    It executes the function once, recording the terminal calls and the allocations in benchmark.extra_info.
+
+    Returns:
+        It returns the terminal calls of the execution.
+    """
+    terminal.calls.clear()
+    tracemalloc.start()
+    function(*args)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    calls = dict(terminal.calls)
+    benchmark.extra_info["terminal_calls"] = calls
+    benchmark.extra_info["allocated_bytes"] = size
+    benchmark.extra_info["peak_allocated_bytes"] = peak
+    return calls
@@ -0,0 +1,45 @@
+"""
+Benchmark of Trade.normalize for an array of prices against normalizing one price at time.
+
+Usage:
+    python benchmarks/normalize.py --size 1000000
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from metatrader5EasyT.simulator import Simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    Simulator(symbols=["EURUSD"], history_minutes=10).install()
+
+    from metatrader5EasyT.trade import Trade
+
+    trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=0.001, take_profit=0.001)
+    prices = 1.1 + np.random.default_rng(0).random(args.size) / 100
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    vectorized = trade.normalize(prices)
+    elapsed = time.perf_counter() - start
+    print(f"array of {args.size} prices: {elapsed * 1000:.1f} ms ({args.size / elapsed / 1e6:.1f} M prices/s)")
+
+    sample = prices[: min(args.size, 100_000)]
+    start = time.perf_counter()
+    scalar = [trade.normalize(price) for price in sample]
+    elapsed = time.perf_counter() - start
+    print(f"one price at time: {elapsed / len(sample) * args.size * 1000:.1f} ms estimated for {args.size} prices")
+
+    assert np.array_equal(vectorized[: len(sample)], scalar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Latency benchmark of the order path of Trade against the simulator, that counts the calls.
+
+Every call to the simulator sleeps the given latency, like the IPC to Metatrader5, so the time of a position_open
+plus position_close cycle is dominated by the amount of calls.
+
+Usage:
+    python benchmarks/order_path.py --cycles 200 --latency 0.0005
+"""
+
+import argparse
+import statistics
+import time
+
+from metatrader5EasyT.simulator import Simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0005, help="Seconds slept by every terminal call.")
+    args = parser.parse_args()
+
+    terminal = Simulator(symbols=["EURUSD"], latency=args.latency, history_minutes=10).install()
+
+    from metatrader5EasyT.trade import Trade
+
+    trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=0.001, take_profit=0.001)
+    trade._trade_allowed = True
+    terminal.calls.clear()
+
+    durations = []
+    for _ in range(args.cycles):
+        start = time.perf_counter()
+        trade.position_open(True, False)
+        trade.position_close()
+        durations.append(time.perf_counter() - start)
+
+    print(f"cycles: {args.cycles}, latency per call: {args.latency * 1000:.3f} ms")
+    for name, count in sorted(terminal.calls.items()):
+        print(f"{name:>18}: {count / args.cycles:.1f} calls per open/close cycle")
+
+    durations.sort()
+    print(
+        f"median: {statistics.median(durations) * 1000:.3f} ms, p99: {durations[int(len(durations) * 0.99)] * 1000:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
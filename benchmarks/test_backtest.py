@@ -0,0 +1,60 @@
+"""
+Throughput of the backtest in bars per second, over M1 bars of the simulator and a moving average strategy. The targets
+are 1M bars per second for the signal path, ten years of M1 bars in a few seconds, and 20k bars per second for the event
+path, where the strategy itself runs in Python after every bar.
+"""
+
+import numpy as np
+import pytest
+
+from metatrader5EasyT.backtest import Backtest
+from metatrader5EasyT.simulator import Simulator
+
+SIGNAL_TARGET = 1_000_000
+EVENT_TARGET = 20_000
+
+
+@pytest.fixture(scope="module")
+def bars():
+    simulator = Simulator(symbols=["EURUSD"], history_minutes=1_000_000)
+    return simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 0, 1_000_000)
+
+
+def bars_per_second(benchmark, size: int, target: int) -> None:
+    # With --benchmark-disable the function runs once without timing, there is no speed to check.
+    if not benchmark.stats:
+        return
+
+    speed = size / benchmark.stats.stats.mean
+    benchmark.extra_info["bars_per_second"] = speed
+    assert speed > target
+
+
+def test_signal_path(benchmark, bars):
+    close = bars["close"]
+    average = np.convolve(close, np.ones(20) / 20, "full")[: len(close)]
+    backtest = Backtest("EURUSD", bars, point=0.00001)
+
+    result = benchmark.pedantic(
+        backtest.run_signals, args=(close > average + 0.0002, close < average - 0.0002, 0.0015, 0.003), rounds=5
+    )
+
+    assert len(result.trades) > 1000
+    bars_per_second(benchmark, len(bars), SIGNAL_TARGET)
+
+
+def test_event_path(benchmark, bars):
+    backtest = Backtest("EURUSD", bars[:100_000], point=0.00001)
+    rates = backtest.rates(count=20)
+    trade = backtest.trade(lot=1.0, stop_loss=0.0015, take_profit=0.003)
+
+    def strategy():
+        rates.update_rates()
+        close = rates.close
+        average = close.mean()
+        trade.position_open(close[-1] > average + 0.0002, close[-1] < average - 0.0002)
+
+    result = benchmark.pedantic(backtest.run, args=(strategy, 20), rounds=3)
+
+    assert len(result.trades) > 100
+    bars_per_second(benchmark, 100_000, EVENT_TARGET)
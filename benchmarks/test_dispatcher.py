@@ -0,0 +1,48 @@
+"""
+A burst rebalance of 200 orders through the OrderDispatcher, 100 closes and 100 opens, the queue statistics are
+recorded in the extra_info of the report to size the rate limit.
+"""
+
+import pytest
+
+from metatrader5EasyT.dispatcher import OrderDispatcher
+from metatrader5EasyT.simulator import Simulator
+from metatrader5EasyT.symbol_info import symbol_cache
+from metatrader5EasyT.trade import Trade
+
+
+@pytest.mark.parametrize("max_orders_per_second", [1000, 1_000_000])
+def test_rebalance_200_orders(benchmark, max_orders_per_second):
+    symbols = [f"SYMBOL{index}" for index in range(200)]
+    terminal = Simulator(symbols=symbols, history_minutes=1).install()
+    try:
+        symbol_cache.invalidate()
+        trades = [Trade(symbol, lot=0.1, stop_loss=0.001, take_profit=0.001) for symbol in symbols]
+
+        def setup():
+            for position in terminal.positions_get():
+                request = {"action": terminal.TRADE_ACTION_DEAL, "symbol": position.symbol, "volume": position.volume}
+                terminal.order_send({**request, "type": 1 - position.type, "position": position.ticket})
+
+            for symbol in symbols[:100]:
+                terminal.order_send({"action": terminal.TRADE_ACTION_DEAL, "symbol": symbol, "volume": 0.1, "type": 0})
+
+        def rebalance():
+            dispatcher = OrderDispatcher(max_orders_per_second=max_orders_per_second)
+            futures = [dispatcher.open_buy(trade) for trade in trades[100:]]
+            futures += [dispatcher.close(trade) for trade in trades[:100]]
+            results = [future.result() for future in futures]
+            dispatcher.shutdown()
+            return dispatcher.stats(), results
+
+        stats, results = benchmark.pedantic(rebalance, setup=setup, rounds=3)
+
+    finally:
+        terminal.uninstall()
+        symbol_cache.invalidate()
+
+    assert stats.sent == 200
+    assert all(result.retcode == terminal.TRADE_RETCODE_DONE for result in results)
+    benchmark.extra_info.update(stats._asdict())
+    if benchmark.stats:
+        benchmark.extra_info["orders_per_second"] = 200 / benchmark.stats.stats.mean
@@ -0,0 +1,165 @@
+"""
+Benchmarks of the hot paths of the package. The assertions on the terminal calls fail when an operation starts calling
+Metatrader5 more times than it does today.
+"""
+
+import numpy as np
+import pytest
+from conftest import account
+
+from metatrader5EasyT import metrics
+from metatrader5EasyT.indicators import IndicatorSet
+from metatrader5EasyT.initialization import Initialize
+from metatrader5EasyT.metrics import MetricsRegistry
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.simulator import Simulator
+from metatrader5EasyT.symbol_info import symbol_cache
+from metatrader5EasyT.tick import Tick
+from metatrader5EasyT.timeframe import TimeFrame
+from metatrader5EasyT.trade import Trade
+
+
+@pytest.mark.parametrize("count", [100, 10_000, 100_000])
+@pytest.mark.parametrize("incremental", [False, True])
+def test_update_rates(benchmark, terminal, count, incremental):
+    rates = Rates("EURUSD", TimeFrame().ONE_MINUTE, count, incremental=incremental)
+    rates.update_rates()
+
+    calls = account(benchmark, terminal, rates.update_rates)
+    benchmark(rates.update_rates)
+
+    assert calls == {"copy_rates_from_pos": 1}
+    assert len(rates.close) == count
+
+
+@pytest.mark.parametrize("instrumented", [False, True])
+def test_get_new_tick(benchmark, terminal, instrumented):
+    tick = Tick("EURUSD")
+    if instrumented:
+        metrics.enable(MetricsRegistry())
+
+    try:
+        calls = account(benchmark, terminal, tick.get_new_tick)
+        benchmark(tick.get_new_tick)
+
+    finally:
+        metrics.disable()
+
+    assert calls == {"symbol_info_tick": 1}
+
+
+def test_update_ticks(benchmark, terminal):
+    tick = Tick("EURUSD", capacity=100_000)
+    tick.update_ticks()
+
+    def advance():
+        terminal.advance(1.0)
+
+    advance()
+    calls = account(benchmark, terminal, tick.update_ticks)
+    benchmark.pedantic(tick.update_ticks, setup=advance, rounds=200)
+
+    assert calls == {"copy_ticks_from": 1}
+
+
+@pytest.mark.parametrize("size", [1, 100_000])
+def test_normalize(benchmark, terminal, size):
+    trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=0.001, take_profit=0.001)
+    prices = 1.1 + np.random.default_rng(0).random(size) / 100
+    price = prices if size > 1 else float(prices[0])
+
+    calls = account(benchmark, terminal, trade.normalize, price)
+    benchmark(trade.normalize, price)
+
+    assert calls == {}
+
+
+def test_position_open_close(benchmark, terminal):
+    trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=0.001, take_profit=0.001)
+    trade._trade_allowed = True
+
+    def cycle():
+        trade.position_open(True, False)
+        trade.position_close()
+
+    calls = account(benchmark, terminal, cycle)
+    benchmark(cycle)
+
+    assert calls == {"positions_get": 2, "symbol_info_tick": 2, "order_send": 2}
+    assert terminal.positions_get() == ()
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_position_check_150_symbols(benchmark, shared):
+    symbols = [f"SYMBOL{index}" for index in range(150)]
+    terminal = Simulator(symbols=symbols, history_minutes=1).install()
+    try:
+        symbol_cache.invalidate()
+        book = PositionBook() if shared else None
+        trades = [Trade(symbol, lot=0.1, stop_loss=0.001, take_profit=0.001, book=book) for symbol in symbols]
+
+        def cycle():
+            if book is not None:
+                book.refresh()
+
+            for trade in trades:
+                trade.position_check()
+
+        calls = account(benchmark, terminal, cycle)
+        benchmark(cycle)
+
+    finally:
+        terminal.uninstall()
+        symbol_cache.invalidate()
+
+    assert calls == {"positions_get": 1 if shared else 150}
+
+
+@pytest.mark.parametrize("method", ["initialize_symbol", "initialize_symbols"])
+def test_initialize_500_symbols(benchmark, method):
+    symbols = [f"SYMBOL{index}" for index in range(500)]
+    terminal = Simulator(symbols=symbols, history_minutes=1).install()
+    try:
+        initialize = getattr(Initialize(), method)
+
+        def setup():
+            symbol_cache.invalidate()
+            terminal._selected.clear()
+
+        setup()
+        calls = account(benchmark, terminal, initialize, *symbols)
+        benchmark.pedantic(initialize, args=symbols, setup=setup, rounds=20)
+
+    finally:
+        terminal.uninstall()
+        symbol_cache.invalidate()
+
+    assert sum(calls.values()) == (1000 if method == "initialize_symbol" else 501)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_indicators_new_bar(benchmark, terminal, incremental):
+    bars = Rates("EURUSD", TimeFrame().ONE_MINUTE, 10_000)
+    bars.update_rates()
+    bars = bars.rates
+
+    def indicator_set():
+        indicators = IndicatorSet("EURUSD", TimeFrame().ONE_MINUTE, 10_000)
+        indicators.sma(20), indicators.ema(50), indicators.rsi(14), indicators.atr(14), indicators.bollinger(20)
+        return indicators
+
+    window = 8_000
+    shared = indicator_set()
+    shared.update(bars[:window])
+    # Every round one more bar closes, like an update_rates() per bar.
+    ends = iter(range(window + 1, len(bars)))
+
+    def update():
+        end = next(ends)
+        (shared if incremental else indicator_set()).update(bars[end - window : end])
+
+    calls = account(benchmark, terminal, update)
+    benchmark.pedantic(update, rounds=1000)
+
+    assert calls == {}
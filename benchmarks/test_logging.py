@@ -0,0 +1,36 @@
+"""
+Per tick overhead of the logging. "before" writes every get_new_tick record to the log file in the calling thread, like
+the package did when the hot path logged at INFO, "after" is the hot path at DEBUG, which is not enabled, with the
+opt-in queue logging, so the other records are written by the background thread.
+"""
+
+import logging
+
+import pytest
+from conftest import account
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.log import start_queue_logging
+from metatrader5EasyT.log import stop_queue_logging
+from metatrader5EasyT.tick import Tick
+
+
+@pytest.mark.parametrize("mode", ["before", "after"])
+def test_get_new_tick_logging(benchmark, terminal, mode):
+    get_log_manager()
+    root = logging.getLogger()
+    level = root.level
+    if mode == "before":
+        root.setLevel(logging.DEBUG)
+
+    else:
+        start_queue_logging()
+
+    try:
+        tick = Tick("EURUSD")
+        account(benchmark, terminal, tick.get_new_tick)
+        benchmark(tick.get_new_tick)
+
+    finally:
+        root.setLevel(level)
+        stop_queue_logging()
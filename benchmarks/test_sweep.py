@@ -0,0 +1,47 @@
+"""
+Throughput of the sweep in jobs per second, with one process and with one process per CPU, the ratio between them is
+the scaling with the cores. The history is mapped by the workers, only the job indexes are sent to them.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from metatrader5EasyT.history import HistoryCache
+from metatrader5EasyT.simulator import Simulator
+from metatrader5EasyT.sweep import grid
+from metatrader5EasyT.sweep import run_sweep
+
+
+def momentum(bars, lookback):
+    close = bars["close"]
+    change = np.zeros(len(close))
+    change[lookback:] = close[lookback:] - close[:-lookback]
+    return change > 0.0005, change < -0.0005
+
+
+@pytest.fixture(scope="module")
+def history(tmp_path_factory):
+    symbols = [f"SYMBOL{index}" for index in range(8)]
+    simulator = Simulator(symbols=symbols, history_minutes=50_000)
+    history = HistoryCache(str(tmp_path_factory.mktemp("history")))
+    for symbol in symbols:
+        history.append(symbol, 1, simulator.copy_rates_from_pos(symbol, simulator.TIMEFRAME_M1, 0, 50_000))
+
+    return history, {symbol: 0.00001 for symbol in symbols}
+
+
+@pytest.mark.parametrize("processes", sorted({1, os.cpu_count()}))
+def test_sweep(benchmark, history, processes):
+    history, symbols = history
+    params = grid(lookback=[5, 10, 20, 40], stop_loss=[0.001, 0.002], take_profit=[0.002, 0.004])
+
+    result = benchmark.pedantic(
+        run_sweep, args=(history, symbols, 1, momentum, params), kwargs={"processes": processes}, rounds=2
+    )
+
+    jobs = len(symbols) * len(params)
+    assert len(result.table) == jobs
+    if benchmark.stats:
+        benchmark.extra_info["jobs_per_second"] = jobs / benchmark.stats.stats.mean
@@ -0,0 +1,39 @@
+"""
+The trailing stop of 300 positions, the levels are computed at once and only the stops that moved are sent.
+"""
+
+import pytest
+from conftest import account
+
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.simulator import Simulator
+from metatrader5EasyT.symbol_info import symbol_cache
+from metatrader5EasyT.trailing import TrailingStop
+
+
+@pytest.fixture
+def terminal():
+    symbols = [f"SYMBOL{index}" for index in range(100)]
+    simulator = Simulator(symbols=symbols, history_minutes=1).install()
+    symbol_cache.invalidate()
+    for symbol in symbols:
+        for order_type in (0, 1, 0):
+            request = {"action": simulator.TRADE_ACTION_DEAL, "symbol": symbol, "volume": 0.1, "type": order_type}
+            simulator.order_send(request)
+
+    yield simulator
+    simulator.uninstall()
+    symbol_cache.invalidate()
+
+
+def test_trail_300_positions(benchmark, terminal):
+    book = PositionBook(max_age=0.0)
+    trailing = TrailingStop(0.001, book=book)
+    trailing.update()
+
+    # The prices did not move, only the positions are read.
+    calls = account(benchmark, terminal, trailing.update)
+    benchmark(trailing.update)
+
+    assert calls == {"positions_get": 1}
+    assert len(book.table) == 300
@@ -0,0 +1,54 @@
+"""
+Load test of Tick.update_ticks and Rates.update_rates against the simulator, at the given amount of ticks per second
+per symbol, with the latency of every terminal call.
+
+Usage:
+    python benchmarks/tick_stream.py --tick-rate 100000 --seconds 10 --latency 0.0002
+"""
+
+import argparse
+import logging
+import time
+
+from metatrader5EasyT.simulator import Simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tick-rate", type=float, default=100_000, help="Ticks per simulated second per symbol.")
+    parser.add_argument("--seconds", type=int, default=10, help="Simulated seconds, one update per second.")
+    parser.add_argument("--symbols", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0002, help="Seconds slept by every terminal call.")
+    args = parser.parse_args()
+
+    symbols = [f"SYMBOL{index}" for index in range(args.symbols)]
+    terminal = Simulator(symbols=symbols, tick_rate=args.tick_rate, latency=args.latency).install()
+
+    from metatrader5EasyT.rates import Rates
+    from metatrader5EasyT.tick import Tick
+    from metatrader5EasyT.timeframe import TimeFrame
+
+    logging.disable(logging.INFO)
+    ticks = [Tick(symbol, capacity=int(args.tick_rate * 2)) for symbol in symbols]
+    rates = [Rates(symbol, TimeFrame().ONE_MINUTE, 1000, incremental=True) for symbol in symbols]
+    for tick in ticks:
+        tick.update_ticks()
+
+    terminal.calls.clear()
+    received, elapsed = 0, 0.0
+    for _ in range(args.seconds):
+        terminal.advance(1.0)
+        start = time.perf_counter()
+        for tick, rate in zip(ticks, rates):
+            received += len(tick.update_ticks())
+            rate.update_rates()
+
+        elapsed += time.perf_counter() - start
+
+    print(f"{received} ticks of {args.symbols} symbol(s) in {elapsed:.3f} s: {received / elapsed:,.0f} ticks/s")
+    for name, count in sorted(terminal.calls.items()):
+        print(f"{name:>20}: {count / args.seconds / args.symbols:.1f} calls per symbol per second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from typing import Dict
+from typing import Iterable
+
+import MetaTrader5 as Mt5
+import numpy as np
+
+from metatrader5EasyT.buffer import RingBuffer
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.resample import Period
+from metatrader5EasyT.resample import resample_ticks
+from metatrader5EasyT.resample import timeframe_seconds
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+class _Series:
+    def __init__(self, timeframe, capacity: int):
+        self.timeframe = timeframe
+        self.closed = RingBuffer(capacity, RATES_DTYPE)
+        self.forming = None
+        self.unreconciled = 0
+
+
+class BarAggregator:
+    """
+    This class builds the bars of many timeframes of a symbol from its ticks, so the forming bar moves at tick latency
+    without polling Rates. Each batch of ticks costs O(1) per tick and per timeframe.
+
+    When a bar closes it is replaced by the bar of Metatrader5, which is the reference, the terminal is called only then.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        timeframes: Iterable[TimeFrame],
+        capacity: int = 1000,
+        reconcile: bool = True,
+        price: str = "bid",
+        point: float = None,
+    ):
+        """
+        Args:
+            symbol:
+                It is the symbol of the ticks.
+
+            timeframes:
+                It is the timeframes built, Metatrader5 timeframes or Periods, see metatrader5EasyT.resample.
+
+            capacity:
+                It is the amount of closed bars kept for each timeframe.
+
+            reconcile:
+                When it is True the closed bars are fetched from Metatrader5 with copy_rates_from_pos and replace the
+                local ones. The Periods are never reconciled, Metatrader5 does not have them.
+
+            price:
+                It is the field of the ticks used as price.
+
+            point:
+                It is the point of the symbol, when it is given the spread of the local bars is calculated.
+        """
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in BarAggregator")
+
+        self._symbol = symbol.upper()
+        self._reconcile = reconcile
+        self._price = price
+        self._point = point
+        self._series = {timeframe: _Series(timeframe, capacity) for timeframe in timeframes}
+
+    def closed(self, timeframe: TimeFrame) -> np.ndarray:
+        """
+        Returns:
+            It returns a view of the closed bars of the timeframe with RATES_DTYPE.
+        """
+        return self._series[timeframe].closed.view()
+
+    def forming(self, timeframe: TimeFrame) -> np.void or None:
+        """
+        Returns:
+            It returns the bar that is still forming, or None before the first tick.
+        """
+        forming = self._series[timeframe].forming
+        return None if forming is None else forming[0]
+
+    def bars(self, timeframe: TimeFrame) -> np.ndarray:
+        """
+        Returns:
+            It returns a new array with the closed bars and the forming one, like Rates.rates.
+        """
+        series = self._series[timeframe]
+        if series.forming is None:
+            return series.closed.view().copy()
+
+        return np.concatenate((series.closed.view(), series.forming))
+
+    def update(self, ticks: np.ndarray) -> Dict[TimeFrame, np.ndarray]:
+        """
+        This function consumes new ticks, like the ones returned by Tick.update_ticks().
+
+        Args:
+            ticks:
+                It is a structured array of ticks with time_msc and the price field, sorted by time. The ticks older than
+                the forming bar are ignored.
+
+        Returns:
+            It returns a dict from the timeframe to the bars closed by these ticks, only the timeframes with closed bars
+            are in it.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.aggregator import BarAggregator
+            >>> from metatrader5EasyT.tick import Tick
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> timeframe = TimeFrame()
+            >>> eurusd_tick = Tick('EURUSD')
+            >>> aggregator = BarAggregator('EURUSD', [timeframe.ONE_MINUTE, timeframe.FIVE_MINUTES])
+            >>> aggregator.update(eurusd_tick.update_ticks())
+            {}
+            >>> aggregator.forming(timeframe.ONE_MINUTE)["close"]
+            1.09975
+            >>> # A minute later, the one minute bar closed:
+            >>> closed = aggregator.update(eurusd_tick.update_ticks())
+            >>> closed[timeframe.ONE_MINUTE]["close"]
+            array([1.09981])
+
+        """
+        closed = {}
+        if len(ticks) == 0:
+            return closed
+
+        for timeframe, series in self._series.items():
+            new_ticks = ticks
+            if series.forming is not None:
+                new_ticks = ticks[ticks["time_msc"] >= series.forming["time"][0] * 1000]
+                if len(new_ticks) == 0:
+                    continue
+
+            bars = resample_ticks(new_ticks, timeframe, price=self._price, point=self._point)
+            forming = series.forming
+            if forming is not None and forming["time"][0] == bars["time"][0]:
+                bars["open"][0] = forming["open"][0]
+                bars["high"][0] = max(forming["high"][0], bars["high"][0])
+                bars["low"][0] = min(forming["low"][0], bars["low"][0])
+                bars["tick_volume"][0] += forming["tick_volume"][0]
+                bars["real_volume"][0] += forming["real_volume"][0]
+                if self._point is not None:
+                    bars["spread"][0] = min(forming["spread"][0], bars["spread"][0])
+
+            elif forming is not None:
+                bars = np.concatenate((forming, bars))
+
+            series.forming = bars[-1:].copy()
+            if len(bars) > 1:
+                series.closed.extend(bars[:-1])
+                series.unreconciled += len(bars) - 1
+                if self._reconcile and not isinstance(timeframe, Period):
+                    self._reconcile_closed(series)
+
+                # The reconciliation can change the number of bars, they are selected by the time of the first one.
+                view = series.closed.view()
+                closed[timeframe] = view[view["time"].searchsorted(bars["time"][0]) :]
+
+        return closed
+
+    def _reconcile_closed(self, series: _Series) -> None:
+        """
+        It replaces the closed bars that were built locally by the bars of Metatrader5, the bars from the time of the
+        first local bar not reconciled yet until the forming bar.
+        """
+        local = series.closed.view()
+        since = local["time"][-min(series.unreconciled, len(local))]
+        # The terminal can have bars the ticks missed, the count covers every bar from the time of the first one.
+        seconds = timeframe_seconds(series.timeframe)
+        count = series.unreconciled + 1
+        if seconds is not None:
+            count = max(count, int(series.forming["time"][0] - since) // seconds + 1)
+
+        result = Mt5.copy_rates_from_pos(self._symbol, series.timeframe, 0, count)
+        if result is None:
+            self._log.logger.error("It was not possible to reconcile %s bars: %s", self._symbol, Mt5.last_error())
+            return
+
+        result = result[(result["time"] >= since) & (result["time"] < series.forming["time"][0])]
+        if len(result) == 0:
+            # The terminal did not close the bars yet, they are reconciled with the next closed bar.
+            return
+
+        records = np.zeros(len(result), dtype=RATES_DTYPE)
+        for name in RATES_DTYPE.names:
+            if name in result.dtype.names:
+                records[name] = result[name]
+
+        # The local bars after the last bar of the terminal are kept until the next reconciliation.
+        pending = local[local["time"] > records["time"][-1]].copy()
+        series.closed.truncate(len(local) - local["time"].searchsorted(since))
+        series.closed.extend(records)
+        series.closed.extend(pending)
+        series.unreconciled = len(pending)
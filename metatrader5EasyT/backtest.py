@@ -0,0 +1,641 @@
+"""
+Backtesting over cached candlesticks or ticks, without Metatrader5.
+
+The signal path receives the buy, sell and close signals of all the bars as arrays and only loops over the trades, the
+event path calls a strategy after every bar with Rates, Tick and Trade objects backed by the history, so the code that
+runs live runs in the backtest:
+
+    >>> from metatrader5EasyT.backtest import Backtest
+    >>> backtest = Backtest('EURUSD', history.load('EURUSD', timeframe.ONE_MINUTE), point=0.00001)
+    >>> rates, trade = backtest.rates(count=20), backtest.trade(lot=1.0, stop_loss=0.001, take_profit=0.002)
+    >>> def strategy():
+    ...     rates.update_rates()
+    ...     trade.position_open(rates.close[-1] > rates.close.mean(), rates.close[-1] < rates.close.mean())
+    >>> backtest.run(strategy, start=20).summary()
+    {'trades': 1045, 'profit': 0.0312, 'win_rate': 0.36, 'profit_factor': 1.04, 'max_drawdown': 0.0214}
+
+The orders sent at the close of a bar are filled at the open of the next bar, the buys at the ask, which is the bid plus
+the spread, and the sells at the bid, because the bars of Metatrader5 are built from the bid. The stop loss and the take
+profit are checked with the high and the low of every bar, when both are hit in the same bar the stop loss is assumed,
+and when the bar opens beyond them the position is closed at the open. This module does not import MetaTrader5.
+"""
+
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+from abstractEasyT import rates
+from abstractEasyT import tick
+from abstractEasyT import trade
+
+from metatrader5EasyT.indicators import IndicatorSet
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.resample import RATES_DTYPE
+
+REASON_SIGNAL = 0
+REASON_STOP_LOSS = 1
+REASON_TAKE_PROFIT = 2
+REASON_END = 3
+
+# The type is 0 for buy and 1 for sell, like the positions of Metatrader5.
+TRADES_DTYPE = np.dtype(
+    [
+        ("time_open", "<i8"),
+        ("time_close", "<i8"),
+        ("type", "i1"),
+        ("volume", "<f8"),
+        ("price_open", "<f8"),
+        ("price_close", "<f8"),
+        ("sl", "<f8"),
+        ("tp", "<f8"),
+        ("profit", "<f8"),
+        ("reason", "u1"),
+    ]
+)
+
+
+class BacktestResult:
+    """
+    The trades of a backtest and their statistics, the profit is in the currency of the quote times the contract size.
+    """
+
+    def __init__(self, trades: np.ndarray, bars: int):
+        """
+        Args:
+            trades:
+                It is a structured array with TRADES_DTYPE.
+
+            bars:
+                It is the amount of bars replayed.
+        """
+        self.trades = trades
+        self.bars = bars
+
+    @property
+    def profit(self) -> float:
+        return float(self.trades["profit"].sum())
+
+    @property
+    def win_rate(self) -> float:
+        return float((self.trades["profit"] > 0).mean()) if len(self.trades) else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        """
+        It is the gross profit divided by the gross loss, inf when there is no loss.
+        """
+        profit = self.trades["profit"]
+        loss = -profit[profit < 0].sum()
+        return float(profit[profit > 0].sum() / loss) if loss > 0 else float("inf")
+
+    def equity(self) -> np.ndarray:
+        """
+        Returns:
+            It returns the accumulated profit after every trade.
+        """
+        return np.cumsum(self.trades["profit"])
+
+    @property
+    def max_drawdown(self) -> float:
+        """
+        It is the largest fall of the accumulated profit from a previous peak, measured on the closed trades.
+        """
+        equity = np.concatenate(([0.0], self.equity()))
+        return float((np.maximum.accumulate(equity) - equity).max())
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            It returns a dict with the amount of trades, the profit, the win rate, the profit factor and the maximum
+            drawdown.
+        """
+        return {
+            "trades": len(self.trades),
+            "profit": self.profit,
+            "win_rate": self.win_rate,
+            "profit_factor": self.profit_factor,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+class Backtest:
+    """
+    This class replays the history of a symbol, see the module documentation. Only one position is open at time, like
+    Trade.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        bars: np.ndarray,
+        point: float,
+        digits: int = None,
+        spread: int = None,
+        contract_size: float = 1.0,
+    ):
+        """
+        Args:
+            symbol:
+                It is the symbol of the history.
+
+            bars:
+                It is a structured array with the fields of RATES_DTYPE, sorted by time, like the arrays of Rates or the
+                memory-mapped files of HistoryCache.
+
+            point:
+                It is the tick size of the symbol, the stop loss and the take profit are rounded to it.
+
+            digits:
+                It is the amount of digits of the price, when it is None it is calculated from the point.
+
+            spread:
+                It is the spread in points, when it is None the spread of every bar is used.
+
+            contract_size:
+                It is multiplied by the lot and the price difference to calculate the profit.
+        """
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in Backtest")
+
+        self.symbol = symbol.upper()
+        self.bars = bars
+        self.point = point
+        self.digits = int(round(-np.log10(point))) if digits is None else digits
+        self.contract_size = contract_size
+
+        self._time = np.asarray(bars["time"], dtype=np.int64)
+        self._open = np.asarray(bars["open"], dtype=np.float64)
+        self._high = np.asarray(bars["high"], dtype=np.float64)
+        self._low = np.asarray(bars["low"], dtype=np.float64)
+        self._close = np.asarray(bars["close"], dtype=np.float64)
+        spread = bars["spread"] if spread is None else np.full(len(bars), spread)
+        self._spread = np.asarray(spread, dtype=np.float64) * point
+
+        self._index = -1
+        self._position = None
+        self._pending_open = 0
+        self._pending_close = False
+        self._order = None
+        self._trades = []
+
+    @classmethod
+    def from_ticks(cls, symbol: str, ticks: np.ndarray, point: float, **kwargs) -> "Backtest":
+        """
+        This function replays ticks instead of bars, every tick is a bar with open, high, low and close at the bid and
+        the spread of the tick, so the stop loss and the take profit are checked tick by tick.
+
+        Args:
+            ticks:
+                It is the structured array returned by Metatrader5 copy_ticks_* functions, or Tick.ticks.
+
+        Returns:
+            It returns a Backtest over the ticks, the other arguments are the ones of Backtest.
+        """
+        bars = np.zeros(len(ticks), dtype=RATES_DTYPE)
+        bars["time"] = ticks["time_msc"] // 1000
+        for name in ("open", "high", "low", "close"):
+            bars[name] = ticks["bid"]
+
+        bars["spread"] = np.round((ticks["ask"] - ticks["bid"]) / point)
+        bars["tick_volume"] = 1
+        return cls(symbol, bars, point, **kwargs)
+
+    def normalize(self, price: float) -> float:
+        """
+        It rounds the price to the point and to the digits, like Trade.normalize().
+        """
+        return round(round(price / self.point) * self.point, self.digits)
+
+    def _stops(self, direction: int, price: float, stop_loss: float, take_profit: float) -> tuple:
+        return self.normalize(price - direction * stop_loss), self.normalize(price + direction * take_profit)
+
+    def _exit_price(self, direction: int, index: int, sl: float, tp: float) -> tuple:
+        """
+        It checks the stop loss and the take profit in the bar, it returns the price and the reason when the position
+        is closed, or None.
+        """
+        if direction > 0:
+            if self._low[index] <= sl:
+                return min(self._open[index], sl), REASON_STOP_LOSS
+
+            if self._high[index] >= tp:
+                return max(self._open[index], tp), REASON_TAKE_PROFIT
+
+            return None
+
+        spread = self._spread[index]
+        if self._high[index] + spread >= sl:
+            return max(self._open[index] + spread, sl), REASON_STOP_LOSS
+
+        if self._low[index] + spread <= tp:
+            return min(self._open[index] + spread, tp), REASON_TAKE_PROFIT
+
+        return None
+
+    def _market_price(self, direction: int, index: int, field: np.ndarray) -> float:
+        # The buys are filled at the ask and the sells at the bid.
+        return float(field[index] + (self._spread[index] if direction > 0 else 0.0))
+
+    def _record(self, direction, volume, index_open, price_open, sl, tp, index_close, price_close, reason) -> None:
+        profit = direction * (price_close - price_open) * volume * self.contract_size
+        self._trades.append(
+            (
+                self._time[index_open],
+                self._time[index_close],
+                0 if direction > 0 else 1,
+                volume,
+                price_open,
+                price_close,
+                sl,
+                tp,
+                profit,
+                reason,
+            )
+        )
+
+    def _result(self) -> BacktestResult:
+        trades = np.array(self._trades, dtype=TRADES_DTYPE)
+        self._trades = []
+        return BacktestResult(trades, len(self.bars))
+
+    # ------------------------------ Signal path ------------------------------ #
+
+    def _find_stop(self, direction: int, start: int, sl: float, tp: float) -> int:
+        """
+        It returns the first bar from start where the stop loss or the take profit is hit, or the amount of bars. The
+        bars are scanned in blocks that double in size, so a trade costs a few numpy calls.
+        """
+        size = len(self._time)
+        block = 64
+        while start < size:
+            end = min(size, start + block)
+            if direction > 0:
+                hits = (self._low[start:end] <= sl) | (self._high[start:end] >= tp)
+
+            else:
+                spread = self._spread[start:end]
+                hits = (self._high[start:end] + spread >= sl) | (self._low[start:end] + spread <= tp)
+
+            first = int(hits.argmax())
+            if hits[first]:
+                return start + first
+
+            start = end
+            block *= 2
+
+        return size
+
+    def run_signals(
+        self,
+        buy: np.ndarray,
+        sell: np.ndarray,
+        stop_loss: float,
+        take_profit: float,
+        close: np.ndarray = None,
+        lot: float = 1.0,
+    ) -> BacktestResult:
+        """
+        This function is the fast path, for strategies whose signals can be calculated for all the bars at once. The
+        signals of a bar are the arguments of Trade.position_open(buy, sell) and Trade.position_close() at its close.
+
+        Args:
+            buy:
+                It is a bool array, a position is opened when buy is True, sell is False and there is no position.
+
+            sell:
+                It is a bool array, a position is opened when sell is True, buy is False and there is no position.
+
+            stop_loss:
+                It is the distance of the stop loss from the open price, like Trade.stop_loss.
+
+            take_profit:
+                It is the distance of the take profit from the open price, like Trade.take_profit.
+
+            close:
+                It is a bool array, the position is closed when it is True, after the open signals of the same bar, so
+                an open and a close in the same bar cancel the order before it is filled.
+
+            lot:
+                It is the volume of the positions.
+
+        Returns:
+            It returns the BacktestResult.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.backtest import Backtest
+            >>> from metatrader5EasyT.indicators import IndicatorSet
+            >>> backtest = Backtest('EURUSD', eurusd_m1, point=0.00001)
+            >>> indicators = IndicatorSet('EURUSD', timeframe.ONE_MINUTE, capacity=len(eurusd_m1))
+            >>> sma = indicators.sma(50)
+            >>> indicators.update(eurusd_m1)
+            >>> close = eurusd_m1['close'][:-1]
+            >>> result = backtest.run_signals(close > sma.values, close < sma.values, 0.001, 0.002)
+            >>> result.summary()['trades']
+            1045
+
+        """
+        size = len(self._time)
+        buy = np.asarray(buy, dtype=bool)[:size]
+        sell = np.asarray(sell, dtype=bool)[:size]
+        entries = np.flatnonzero(buy != sell)
+        closes = np.flatnonzero(np.asarray(close, dtype=bool)[:size]) if close is not None else np.empty(0, np.int64)
+
+        first_allowed = 0
+        while True:
+            position = entries.searchsorted(first_allowed)
+            if position == len(entries) or entries[position] + 1 >= size:
+                break
+
+            index_open = entries[position] + 1
+            signal = closes.searchsorted(entries[position])
+            if signal < len(closes) and closes[signal] == entries[position]:
+                # The close signal of the same bar cancels the order that was not filled yet, like run() does.
+                first_allowed = index_open
+                continue
+
+            direction = 1 if buy[index_open - 1] else -1
+            price_open = self._market_price(direction, index_open, self._open)
+            sl, tp = self._stops(direction, price_open, stop_loss, take_profit)
+
+            index_close = self._find_stop(direction, index_open, sl, tp)
+            if signal < len(closes) and closes[signal] < index_close:
+                # The position is closed at the open of the bar after the close signal.
+                index_close = closes[signal] + 1
+                if index_close < size:
+                    price_close, reason = self._market_price(-direction, index_close, self._open), REASON_SIGNAL
+
+            elif index_close < size:
+                price_close, reason = self._exit_price(direction, index_close, sl, tp)
+
+            if index_close >= size:
+                index_close = size - 1
+                price_close, reason = self._market_price(-direction, index_close, self._close), REASON_END
+
+            self._record(direction, lot, index_open, price_open, sl, tp, index_close, price_close, reason)
+            first_allowed = index_close
+
+        return self._result()
+
+    # ------------------------------ Event path ------------------------------ #
+
+    def rates(self, count: int) -> "BacktestRates":
+        """
+        Returns:
+            It returns a Rates of the history, see BacktestRates.
+        """
+        return BacktestRates(self, count)
+
+    def tick(self) -> "BacktestTick":
+        """
+        Returns:
+            It returns a Tick of the history, see BacktestTick.
+        """
+        return BacktestTick(self)
+
+    def trade(self, lot: float, stop_loss: float, take_profit: float) -> "BacktestTrade":
+        """
+        Returns:
+            It returns a Trade that sends its orders to the backtest, see BacktestTrade.
+        """
+        return BacktestTrade(self, lot, stop_loss, take_profit)
+
+    @property
+    def direction(self) -> str or None:
+        """
+        It is the direction of the position, including the orders waiting for the next bar, like Trade.trade_direction.
+        """
+        if self._pending_close:
+            direction = self._pending_open
+
+        elif self._position is not None:
+            direction = self._position[0]
+
+        else:
+            direction = self._pending_open
+
+        return {1: "buy", -1: "sell"}.get(direction)
+
+    def order(self, direction: int, volume: float, stop_loss: float, take_profit: float) -> None:
+        """
+        This function receives a market order at the close of the current bar, it is filled at the open of the next
+        bar. An order in the opposite direction of the position closes it, like Metatrader5 does for Trade, and an
+        order in the same direction is ignored.
+
+        Args:
+            direction:
+                It is 1 to buy and -1 to sell.
+        """
+        position = self._position[0] if self._position is not None and not self._pending_close else 0
+        if position == -direction:
+            self._pending_close = True
+
+        elif self._pending_open == -direction:
+            self._pending_open = 0
+
+        elif position == 0 and self._pending_open == 0:
+            self._pending_open = direction
+            self._order = (volume, stop_loss, take_profit)
+
+        else:
+            self._log.logger.debug("Order ignored, there is a position in the same direction.")
+
+    def run(self, strategy: Callable[[], None], start: int = 0) -> BacktestResult:
+        """
+        This function is the event path, the strategy is called after every bar closes, from the bar start, and it reads
+        the history and sends orders with the objects returned by rates(), tick() and trade().
+
+        Args:
+            strategy:
+                It is called without arguments after every bar.
+
+            start:
+                It is the first bar when the strategy is called, the bars before it are only history.
+
+        Returns:
+            It returns the BacktestResult, the position open at the end is closed at the last close.
+        """
+        self._position = None
+        self._pending_open = 0
+        self._pending_close = False
+        open_, spread = self._open.tolist(), self._spread.tolist()
+        for index in range(start, len(self._time)):
+            self._index = index
+            position = self._position
+            if position is not None and self._pending_close:
+                direction = position[0]
+                price = open_[index] + (spread[index] if direction < 0 else 0.0)
+                self._record(*position, index, price, REASON_SIGNAL)
+                position = None
+
+            if self._pending_open:
+                direction = self._pending_open
+                volume, stop_loss, take_profit = self._order
+                price = open_[index] + (spread[index] if direction > 0 else 0.0)
+                position = (direction, volume, index, price, *self._stops(direction, price, stop_loss, take_profit))
+
+            self._position = position
+            self._pending_open = 0
+            self._pending_close = False
+            if position is not None:
+                closed = self._exit_price(position[0], index, position[4], position[5])
+                if closed is not None:
+                    self._record(*position, index, *closed)
+                    self._position = None
+
+            strategy()
+
+        if self._position is not None:
+            index = len(self._time) - 1
+            price = self._market_price(-self._position[0], index, self._close)
+            self._record(*self._position, index, price, REASON_END)
+            self._position = None
+
+        self._pending_open = 0
+        self._pending_close = False
+        return self._result()
+
+
+class BacktestRates(rates.Rates):
+    """
+    This class has the attributes of Rates, update_rates() shows the last count bars closed in the backtest.
+    """
+
+    def __init__(self, backtest: Backtest, count: int):
+        self._backtest = backtest
+        self._symbol = backtest.symbol
+        self._timeframe = None
+        self._count = count
+        self._rates = None
+        self._indicators = None
+
+    @property
+    def rates(self) -> np.ndarray or None:
+        return self._rates
+
+    def _field(self, name: str) -> np.ndarray or None:
+        return None if self._rates is None else self._rates[name]
+
+    @property
+    def time(self) -> np.ndarray or None:
+        return self._field("time")
+
+    @property
+    def open(self) -> np.ndarray or None:
+        return self._field("open")
+
+    @property
+    def high(self) -> np.ndarray or None:
+        return self._field("high")
+
+    @property
+    def low(self) -> np.ndarray or None:
+        return self._field("low")
+
+    @property
+    def close(self) -> np.ndarray or None:
+        return self._field("close")
+
+    @property
+    def tick_volume(self) -> np.ndarray or None:
+        return self._field("tick_volume")
+
+    @property
+    def spread(self) -> np.ndarray or None:
+        return self._field("spread")
+
+    @property
+    def real_volume(self) -> np.ndarray or None:
+        return self._field("real_volume")
+
+    @property
+    def indicators(self) -> IndicatorSet:
+        """
+        It is an IndicatorSet of this backtest, it is not shared with the live Rates.
+        """
+        if self._indicators is None:
+            self._indicators = IndicatorSet(self._symbol, self._timeframe, self._count)
+            self._indicators.update(self._rates)
+
+        return self._indicators
+
+    def update_rates(self) -> None:
+        """
+        It updates the attributes with the bars until the current one, which is the last one and is already closed.
+        """
+        end = self._backtest._index + 1
+        self._rates = self._backtest.bars[max(0, end - self._count) : end]
+        if self._indicators is not None:
+            # The indicators treat the last bar as forming, so the closed bar is peeked and then added.
+            self._indicators.update(self._rates)
+
+
+class BacktestTick(tick.Tick):
+    """
+    This class has the attributes of Tick, get_new_tick() shows the close of the current bar.
+    """
+
+    def __init__(self, backtest: Backtest):
+        super().__init__(backtest.symbol)
+        self._backtest = backtest
+        self.time_msc = None
+
+    def get_new_tick(self) -> None:
+        backtest = self._backtest
+        index = backtest._index
+        seconds = int(backtest._time[index])
+        # A datetime, like the time of the live Tick.
+        self.time = datetime.fromtimestamp(seconds)
+        self.time_msc = seconds * 1000
+        self.bid = float(backtest._close[index])
+        self.ask = self.bid + float(backtest._spread[index])
+        self.last = 0.0
+        self.volume = int(backtest.bars["tick_volume"][index])
+
+
+class BacktestTrade(trade.Trade):
+    """
+    This class has the interface of Trade, its orders are filled by the backtest. It is always allowed to trade.
+    """
+
+    def __init__(self, backtest: Backtest, lot: float, stop_loss: float, take_profit: float):
+        self._backtest = backtest
+        self.points = backtest.point
+        self.digits = backtest.digits
+        self.ticket = None
+        super().__init__(backtest.symbol, lot, stop_loss, take_profit)
+        self._trade_allowed = True
+
+    def normalize(self, price: float or np.ndarray) -> float or np.ndarray:
+        normalized = np.round(np.round(np.asarray(price, dtype=np.float64) / self.points) * self.points, self.digits)
+        return float(normalized) if normalized.ndim == 0 else normalized
+
+    def open_buy(self) -> None:
+        self._backtest.order(1, self.lot, self.stop_loss, self.take_profit)
+        self.position_check()
+
+    def open_sell(self) -> None:
+        self._backtest.order(-1, self.lot, self.stop_loss, self.take_profit)
+        self.position_check()
+
+    def position_open(self, buy: bool, sell: bool) -> str or None:
+        self.position_check()
+        if self._trade_allowed and self.trade_direction is None:
+            if buy and not sell:
+                self.open_buy()
+
+            if sell and not buy:
+                self.open_sell()
+
+        return self.trade_direction
+
+    def position_close(self) -> None:
+        self.position_check()
+        if self.trade_direction == "buy":
+            self.open_sell()
+
+        elif self.trade_direction == "sell":
+            self.open_buy()
+
+    def position_check(self) -> None:
+        self.trade_direction = self._backtest.direction
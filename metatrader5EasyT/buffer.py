@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed capacity buffer that keeps the most recent values always contiguous in memory.
+
+    The storage is preallocated with twice the capacity. New values are written after the current window and, only
+    when the end of the storage is reached, the last `capacity` values are moved back to the beginning. It means that
+    appending is amortized O(1) and the window returned by `view()` is a zero-copy contiguous slice.
+    """
+
+    def __init__(self, capacity: int, dtype):
+        """
+        Args:
+            capacity:
+                It is the maximum amount of values kept in the buffer, older values are discarded.
+
+            dtype:
+                It is the numpy dtype of the values stored in the buffer.
+        """
+        if capacity < 1:
+            raise ValueError("The capacity must be a positive integer.")
+
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._data.dtype
+
+    def view(self) -> np.ndarray:
+        """
+        Returns:
+            It returns a zero-copy view of the values in the buffer, from the oldest to the most recent.
+        """
+        return self._data[self._start : self._end]
+
+    def clear(self) -> None:
+        """
+        It empties the buffer without releasing the preallocated memory.
+        """
+        self._start = 0
+        self._end = 0
+
+    def truncate(self, amount: int) -> None:
+        """
+        It drops the `amount` most recent values, it is used to overwrite values that are still changing.
+
+        Args:
+            amount:
+                It is the amount of values to be removed from the end of the buffer.
+        """
+        self._end = max(self._start, self._end - amount)
+
+    def extend(self, values: np.ndarray) -> None:
+        """
+        It appends the values at the end of the buffer, discarding the oldest ones when the capacity is exceeded.
+
+        Args:
+            values:
+                It is an array with the same dtype of the buffer.
+        """
+        size = len(values)
+        if size == 0:
+            return
+
+        if size >= self.capacity:
+            self._data[: self.capacity] = values[-self.capacity :]
+            self._start = 0
+            self._end = self.capacity
+            return
+
+        if self._end + size > len(self._data):
+            kept = min(len(self), self.capacity - size)
+            self._data[:kept] = self._data[self._end - kept : self._end]
+            self._start = 0
+            self._end = kept
+
+        self._data[self._end : self._end + size] = values
+        self._end += size
+        self._start = max(self._start, self._end - self.capacity)
@@ -0,0 +1,271 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+from typing import NamedTuple
+
+import MetaTrader5 as Mt5
+import numpy as np
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.trade import Trade
+from metatrader5EasyT.worker import TerminalWorker
+from metatrader5EasyT.worker import get_worker
+
+# The lower priorities are sent first, the orders with the same priority are sent in the order they were submitted.
+PRIORITY_STOP_OUT = 0
+PRIORITY_CLOSE = 1
+PRIORITY_OPEN = 2
+
+# The last_result of a Trade while it is filled, it stays when no order was sent, like a close without position.
+_NOT_SENT = object()
+
+
+class DispatcherStats(NamedTuple):
+    """
+    The queue of an OrderDispatcher, see OrderDispatcher.stats(). The times are in seconds.
+    """
+
+    # The orders waiting to be sent.
+    depth: int
+    # The largest depth since the dispatcher was created.
+    max_depth: int
+    sent: int
+    # The calls that raised and the orders rejected, order_send returned None or a retcode different of done.
+    failed: int
+    # The time between submit() and the order being sent, of the last 1000 orders.
+    wait_mean: float
+    wait_p95: float
+    wait_max: float
+
+
+class OrderDispatcher:
+    """
+    This class receives many orders at once, like the ones of a portfolio rebalance, and sends them one by one through
+    the terminal worker, see metatrader5EasyT.worker, the closes and the stop-outs first. The orders sent per second
+    are limited, up to one second of unused orders can be sent at once.
+
+    Every order returns a concurrent.futures.Future with the result of order_send, it can be awaited with
+    asyncio.wrap_future().
+    """
+
+    def __init__(
+        self,
+        max_orders_per_second: float = 10.0,
+        worker: TerminalWorker = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_orders_per_second:
+                It is the maximum amount of orders sent per second, the limit of the broker.
+
+            worker:
+                It is the TerminalWorker the orders are sent through, when it is None it is the one of get_worker().
+
+            clock:
+                It is the function that returns the time in seconds.
+        """
+        if max_orders_per_second <= 0:
+            raise ValueError("max_orders_per_second must be positive.")
+
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in OrderDispatcher")
+
+        self._max_orders_per_second = max_orders_per_second
+        self._worker = worker if worker is not None else get_worker()
+        self._clock = clock
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._order = itertools.count()
+        self._tokens = max_orders_per_second
+        self._refilled = clock()
+        self._thread = None
+        self._running = True
+
+        self._max_depth = 0
+        self._sent = 0
+        self._failed = 0
+        self._waits = collections.deque(maxlen=1000)
+        self._wait_max = 0.0
+
+    def submit(self, function: Callable, *args, priority: int = PRIORITY_OPEN) -> Future:
+        """
+        This function queues a call to be run in the terminal worker, like an order that is not a market order of
+        Trade.
+
+        Args:
+            function:
+                It is the function called in the terminal thread with args, its result is the result of the future.
+
+            priority:
+                It is the priority of the call, PRIORITY_STOP_OUT, PRIORITY_CLOSE, PRIORITY_OPEN or any integer.
+
+        Returns:
+            It returns a concurrent.futures.Future with the result of the function, it can be cancelled while it waits.
+            A result with a retcode different of Mt5.TRADE_RETCODE_DONE is counted as failed in stats().
+
+        Raises:
+            RuntimeError: If the dispatcher was shut down.
+        """
+        future = Future()
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("The OrderDispatcher was shut down.")
+
+            heapq.heappush(self._queue, (priority, next(self._order), self._clock(), function, args, future))
+            self._max_depth = max(self._max_depth, len(self._queue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metatrader5-dispatcher", daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+        return future
+
+    def open_buy(self, trade: Trade, priority: int = PRIORITY_OPEN) -> Future:
+        """
+        Returns:
+            It returns a Future with the result of the order_send of trade.open_buy(), it raises a RuntimeError when
+            order_send returned None.
+        """
+        return self.submit(self._fill, trade.open_buy, trade, priority=priority)
+
+    def open_sell(self, trade: Trade, priority: int = PRIORITY_OPEN) -> Future:
+        """
+        Returns:
+            It returns a Future with the result of the order_send of trade.open_sell(), it raises a RuntimeError when
+            order_send returned None.
+        """
+        return self.submit(self._fill, trade.open_sell, trade, priority=priority)
+
+    def close(self, trade: Trade, priority: int = PRIORITY_CLOSE) -> Future:
+        """
+        This function queues trade.position_close(), before the orders that open positions.
+
+        Returns:
+            It returns a Future with the result of the order_send, or None when there was no position to close, it
+            raises a RuntimeError when order_send returned None.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.dispatcher import OrderDispatcher, PRIORITY_STOP_OUT
+            >>> from metatrader5EasyT.trade import Trade
+            >>> dispatcher = OrderDispatcher(max_orders_per_second=20)
+            >>> trades = {symbol: Trade(symbol, lot=0.1, stop_loss=0.001, take_profit=0.001) for symbol in symbols}
+            >>> closes = [dispatcher.close(trades[symbol]) for symbol in sold]
+            >>> opens = [dispatcher.open_buy(trades[symbol]) for symbol in bought]
+            >>> stop_out = dispatcher.close(trades['EURUSD'], priority=PRIORITY_STOP_OUT)
+            >>> [future.result().retcode for future in opens]
+            [10009, 10009, 10009]
+            >>> dispatcher.stats().wait_max
+            0.4513
+
+        """
+        return self.submit(self._fill, trade.position_close, trade, priority=priority)
+
+    @staticmethod
+    def _fill(method: Callable[[], None], trade: Trade):
+        trade.last_result = _NOT_SENT
+        method()
+        result = trade.last_result
+        if result is _NOT_SENT:
+            trade.last_result = None
+            return None
+
+        if result is None:
+            # Trade logged the error of Metatrader5.
+            raise RuntimeError(f"Metatrader5 did not return the result of the order of {trade.symbol}.")
+
+        return result
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and self._running:
+                    self._condition.wait()
+
+                if not self._queue:
+                    return
+
+                now = self._clock()
+                self._tokens = min(
+                    self._max_orders_per_second, self._tokens + (now - self._refilled) * self._max_orders_per_second
+                )
+                self._refilled = now
+                if self._tokens < 1:
+                    # An order with a higher priority submitted while waiting is sent first.
+                    self._condition.wait((1 - self._tokens) / self._max_orders_per_second)
+                    continue
+
+                _, _, queued, function, args, future = heapq.heappop(self._queue)
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                self._tokens -= 1
+                wait = now - queued
+                self._waits.append(wait)
+                self._wait_max = max(self._wait_max, wait)
+
+            try:
+                result = self._worker.submit(None, function, *args).result()
+
+            except BaseException as error:
+                self._log.logger.error("The order %s failed: %s", getattr(function, "__name__", function), error)
+                with self._condition:
+                    self._failed += 1
+
+                future.set_exception(error)
+
+            else:
+                retcode = getattr(result, "retcode", Mt5.TRADE_RETCODE_DONE)
+                if retcode != Mt5.TRADE_RETCODE_DONE:
+                    self._log.logger.error(
+                        "The order %s was rejected: %s", getattr(function, "__name__", function), retcode
+                    )
+
+                with self._condition:
+                    if retcode == Mt5.TRADE_RETCODE_DONE:
+                        self._sent += 1
+
+                    else:
+                        self._failed += 1
+
+                future.set_result(result)
+
+    def stats(self) -> DispatcherStats:
+        """
+        Returns:
+            It returns the DispatcherStats of the queue.
+        """
+        with self._condition:
+            waits = np.array(self._waits, dtype=np.float64)
+            return DispatcherStats(
+                depth=len(self._queue),
+                max_depth=self._max_depth,
+                sent=self._sent,
+                failed=self._failed,
+                wait_mean=float(waits.mean()) if len(waits) else 0.0,
+                wait_p95=float(np.percentile(waits, 95)) if len(waits) else 0.0,
+                wait_max=self._wait_max,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        It stops accepting orders, the ones in the queue are still sent.
+
+        Args:
+            wait:
+                When it is True it waits until the queue is empty.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+            thread = self._thread
+
+        if wait and thread is not None:
+            thread.join()
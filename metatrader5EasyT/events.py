@@ -0,0 +1,198 @@
+import time
+from typing import Callable
+from typing import Iterable
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.positions import compare
+from metatrader5EasyT.positions import get_position_book
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.resample import bar_starts
+from metatrader5EasyT.tick import Tick
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+class _Subscription:
+    def __init__(self, symbol: str, timeframes: Iterable[TimeFrame], count: int):
+        self.tick = Tick(symbol)
+        self.last_time_msc = None
+        self.rates = {timeframe: Rates(symbol, timeframe, count, incremental=True) for timeframe in timeframes}
+        self.last_bar_time = dict.fromkeys(self.rates)
+
+
+class EventEngine:
+    """
+    This class owns the polling of Tick and Rates of all the subscribed symbols and calls the callbacks only when
+    something changed, instead of a loop that updates everything and compares the arrays.
+
+    A new tick is detected comparing its time_msc with the last one. A bar closes when the time of the last tick starts
+    a new bar, so Rates is only updated then, without asking Metatrader5. The positions of all the symbols are read once
+    per cycle by a PositionBook and only when there is a callback for them.
+    """
+
+    def __init__(self, interval: float = 0.1, book: PositionBook = None):
+        """
+        Args:
+            interval:
+                It is the time in seconds that run() waits when a cycle had no event.
+
+            book:
+                It is the PositionBook refreshed in every cycle, give the same book to the Trade instances so they read
+                the positions of this cycle. When it is None the shared book of get_position_book() is used.
+        """
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in EventEngine")
+
+        self._interval = interval
+        self._subscriptions = {}
+        self._tick_callbacks = []
+        self._bar_callbacks = []
+        self._position_callbacks = []
+        self._book = book if book is not None else get_position_book()
+        self._positions = self._book.table
+        self._running = False
+
+    def subscribe(self, symbol: str, timeframes: Iterable[TimeFrame] = (), count: int = 100) -> None:
+        """
+        This function adds the symbol to the polled ones.
+
+        Args:
+            symbol:
+                It is the symbol polled.
+
+            timeframes:
+                It is the timeframes of the bars, Metatrader5 timeframes or Periods, that call on_bar_close callbacks.
+
+            count:
+                It is the amount of candlesticks kept in the Rates of each timeframe.
+        """
+        symbol = symbol.upper()
+        self._subscriptions[symbol] = _Subscription(symbol, timeframes, count)
+        self._log.logger.info("EventEngine subscribed to %s", symbol)
+
+    def unsubscribe(self, symbol: str) -> None:
+        """
+        This function stops polling the symbol.
+        """
+        self._subscriptions.pop(symbol.upper(), None)
+
+    def on_tick(self, callback: Callable[[str, Tick], None]) -> Callable:
+        """
+        This function registers a callback called with the symbol and its Tick when a new tick arrives, it can be used
+        as a decorator.
+        """
+        self._tick_callbacks.append(callback)
+        return callback
+
+    def on_bar_close(self, callback: Callable[[str, TimeFrame, Rates], None]) -> Callable:
+        """
+        This function registers a callback called with the symbol, the timeframe and its Rates when a bar closes, the
+        closed bar is rates.rates[-2] and the last one is the new bar. It can be used as a decorator.
+        """
+        self._bar_callbacks.append(callback)
+        return callback
+
+    def on_position_change(self, callback: Callable[[tuple], None]) -> Callable:
+        """
+        This function registers a callback called with the result of positions_get when a position is opened, closed
+        or modified, it can be used as a decorator.
+        """
+        self._position_callbacks.append(callback)
+        return callback
+
+    def poll(self) -> int:
+        """
+        This function runs one cycle, it asks the last tick of every symbol and calls the callbacks of what changed.
+
+        Returns:
+            It returns the amount of events dispatched.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.events import EventEngine
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> timeframe = TimeFrame()
+            >>> engine = EventEngine()
+            >>> engine.subscribe('EURUSD', [timeframe.ONE_MINUTE])
+            >>> @engine.on_bar_close
+            ... def print_close(symbol, timeframe, rates):
+            ...     print(symbol, rates.close[-2])
+            >>> engine.poll()
+            1
+            >>> # When the bar closed:
+            >>> engine.poll()
+            EURUSD 1.09981
+            2
+
+        """
+        events = 0
+        for symbol, subscription in self._subscriptions.items():
+            events += self._poll_symbol(symbol, subscription)
+
+        if self._position_callbacks:
+            events += self._poll_positions()
+
+        return events
+
+    def _poll_symbol(self, symbol: str, subscription: _Subscription) -> int:
+        tick = subscription.tick
+        tick.get_new_tick()
+        if tick.time_msc == subscription.last_time_msc:
+            return 0
+
+        subscription.last_time_msc = tick.time_msc
+        events = 1
+        for callback in self._tick_callbacks:
+            callback(symbol, tick)
+
+        for timeframe, rates in subscription.rates.items():
+            last_bar_time = subscription.last_bar_time[timeframe]
+            if last_bar_time is not None and bar_starts([tick.time_msc // 1000], timeframe)[0] <= last_bar_time:
+                continue
+
+            rates.update_rates()
+            if rates.time is None or len(rates.time) == 0:
+                continue
+
+            if last_bar_time is not None and rates.time[-1] <= last_bar_time:
+                # Metatrader5 did not start the new bar yet, it is asked again with the next tick.
+                continue
+
+            subscription.last_bar_time[timeframe] = rates.time[-1]
+            if last_bar_time is None:
+                continue
+
+            self._log.logger.debug("Bar of %s closed", symbol)
+            events += 1
+            for callback in self._bar_callbacks:
+                callback(symbol, timeframe, rates)
+
+        return events
+
+    def _poll_positions(self) -> int:
+        self._book.refresh()
+        # The book can also be refreshed by the Trade instances, so the changes are counted from the last table seen.
+        if not compare(self._positions, self._book.table):
+            return 0
+
+        self._positions = self._book.table
+        for callback in self._position_callbacks:
+            callback(self._book.snapshot)
+
+        return 1
+
+    def run(self) -> None:
+        """
+        This function polls until stop() is called, from a callback or another thread. When a cycle has no event it
+        waits the interval.
+        """
+        self._running = True
+        while self._running:
+            if self.poll() == 0:
+                time.sleep(self._interval)
+
+    def stop(self) -> None:
+        """
+        It stops run() after the current cycle.
+        """
+        self._running = False
@@ -0,0 +1,111 @@
+import os
+import threading
+
+import numpy as np
+
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+class HistoryCache:
+    """
+    This class keeps the candlesticks on disk, one file per symbol and timeframe that only grows, that is mapped in
+    memory when it is read. The history survives restarts and many processes can read the same file without each one holding
+    its own copy in RAM.
+
+    The files hold the records of Metatrader5 copy_rates_* functions one after another, without header, so they can be
+    opened with numpy.memmap(path, dtype=RATES_DTYPE). Only one process should write a symbol and timeframe at time.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory:
+                It is the directory where the files are stored, it is created if it does not exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str, timeframe: TimeFrame) -> str:
+        """
+        Returns:
+            It returns the path of the file of the symbol and timeframe.
+        """
+        return os.path.join(self.directory, f"{symbol.upper()}_{timeframe}.rates")
+
+    def load(self, symbol: str, timeframe: TimeFrame) -> np.ndarray:
+        """
+        This function maps the history of the symbol and timeframe in memory.
+
+        Args:
+            symbol:
+                The symbol of the history.
+
+            timeframe:
+                The timeframe of the history.
+
+        Returns:
+            It returns a read-only array with RATES_DTYPE, it is empty when there is no history.
+        """
+        path = self.path(symbol, timeframe)
+        size = os.path.getsize(path) // RATES_DTYPE.itemsize if os.path.exists(path) else 0
+        if size == 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+
+        return np.memmap(path, dtype=RATES_DTYPE, mode="r", shape=(size,))
+
+    def append(self, symbol: str, timeframe: TimeFrame, rates: np.ndarray) -> np.ndarray:
+        """
+        This function stores new candlesticks, the candlesticks already stored from the time of the first new one to
+        the time of the last one are replaced, so the last one, which can be still forming, is always replaced by its
+        new version, and the stored candlesticks after them are kept.
+
+        The file is only overwritten or extended in place, it never shrinks, so the processes that mapped it are not
+        affected. When the new candlesticks replace more stored ones than they are, the history is written to a new
+        file that replaces the old one, the processes that mapped the old file keep reading it.
+
+        Args:
+            symbol:
+                The symbol of the history.
+
+            timeframe:
+                The timeframe of the history.
+
+            rates:
+                It is the structured array returned by Metatrader5 copy_rates_* functions, sorted by time.
+
+        Returns:
+            It returns the history updated, like load().
+        """
+        with self._lock:
+            if len(rates) > 0:
+                records = np.zeros(len(rates), dtype=RATES_DTYPE)
+                for name in RATES_DTYPE.names:
+                    if name in rates.dtype.names:
+                        records[name] = rates[name]
+
+                stored = self.load(symbol, timeframe)
+                stored_time = stored["time"]
+                index = stored_time.searchsorted(records["time"][0])
+                tail = np.array(stored[max(index, stored_time.searchsorted(records["time"][-1], side="right")) :])
+                head = np.array(stored[:index]) if index + len(records) + len(tail) < len(stored) else None
+                del stored, stored_time
+
+                path = self.path(symbol, timeframe)
+                if head is None:
+                    with open(path, "r+b" if os.path.exists(path) else "wb") as file:
+                        file.seek(index * RATES_DTYPE.itemsize)
+                        file.write(records.tobytes())
+                        file.write(tail.tobytes())
+
+                else:
+                    # Only when the platform returns less candlesticks than the ones already stored in the same time.
+                    with open(path + ".tmp", "wb") as file:
+                        file.write(head.tobytes())
+                        file.write(records.tobytes())
+                        file.write(tail.tobytes())
+
+                    os.replace(path + ".tmp", path)
+
+            return self.load(symbol, timeframe)
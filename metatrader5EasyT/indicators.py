@@ -0,0 +1,552 @@
+"""
+Technical indicators that keep a rolling state, the first update computes the whole history with numpy and every new
+closed bar costs O(1), the bar that is still forming is only peeked, so it never changes the state.
+
+The indicators of a symbol, timeframe and count of bars are shared, the strategies that ask the same indicator get the
+same object:
+
+    >>> from metatrader5EasyT.indicators import get_indicators
+    >>> indicators = get_indicators('EURUSD', timeframe.ONE_MINUTE, count=500)
+    >>> rsi = indicators.rsi(14)
+    >>> indicators.update(eurusd_rates.rates)
+    >>> rsi.value, rsi.values[-1]
+    (48.61, 51.03)
+"""
+
+import threading
+from abc import ABC
+from abc import abstractmethod
+from typing import Dict
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from metatrader5EasyT.buffer import RingBuffer
+
+BOLLINGER_DTYPE = np.dtype([("middle", "<f8"), ("upper", "<f8"), ("lower", "<f8")])
+
+
+def _ewm(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    It calculates y[i] = y[i - 1] + alpha * (values[i] - y[i - 1]), starting from y[-1] = initial, without a Python
+    loop per value. The values are processed in blocks short enough to keep the powers of the decay in float64.
+    """
+    decay = 1.0 - alpha
+    if decay == 0.0:
+        return np.array(values, dtype=np.float64)
+
+    result = np.empty(len(values))
+    block = max(1, int(200 / -np.log10(decay)))
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start : start + block]
+        powers = decay ** np.arange(len(chunk))
+        # y[k] = decay ** (k + 1) * previous + alpha * decay ** k * sum(values[j] / decay ** j for j <= k)
+        chunk_result = decay * powers * previous + alpha * powers * np.cumsum(chunk / powers)
+        result[start : start + len(chunk)] = chunk_result
+        previous = chunk_result[-1]
+
+    return result
+
+
+class _Smoother:
+    """
+    An exponential moving average seeded with the simple average of the first period values, like the EMA and the
+    Wilder smoothing of the RSI and the ATR.
+    """
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.seed = []
+        self.value = None
+
+    def warm_up(self, values: np.ndarray) -> np.ndarray:
+        result = np.full(len(values), np.nan)
+        self.seed = []
+        self.value = None
+        if len(values) < self.period:
+            self.seed = [float(value) for value in values]
+            return result
+
+        result[self.period - 1] = values[: self.period].mean()
+        result[self.period :] = _ewm(values[self.period :], self.alpha, result[self.period - 1])
+        self.value = float(result[-1])
+        return result
+
+    def push(self, value: float) -> float:
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) < self.period:
+                return np.nan
+
+            self.value = sum(self.seed) / self.period
+            self.seed = []
+
+        else:
+            self.value += self.alpha * (value - self.value)
+
+        return self.value
+
+    def peek(self, value: float) -> float:
+        if self.value is None:
+            return (sum(self.seed) + value) / self.period if len(self.seed) + 1 == self.period else np.nan
+
+        return self.value + self.alpha * (value - self.value)
+
+
+class _Window:
+    """
+    The last period values with their sums, the values are shifted by the first one, so the variance of prices does
+    not lose precision. The sums are calculated again every period values, so the rounding errors do not accumulate.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.data = np.empty(period)
+        self.count = 0
+        self.index = 0
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+
+    def warm_up(self, values: np.ndarray) -> None:
+        values = values[-self.period :]
+        self.count = len(values)
+        self.data[: self.count] = values
+        self.index = self.count % self.period
+        self.shift = float(values[-1]) if self.count else 0.0
+        self._recalculate()
+
+    def _recalculate(self) -> None:
+        shifted = self.data[: self.count] - self.shift
+        self.sum = float(shifted.sum())
+        self.sum_squares = float((shifted**2).sum())
+
+    def push(self, value: float) -> None:
+        if self.count == 0:
+            self.shift = value
+
+        if self.count == self.period:
+            dropped = self.data[self.index] - self.shift
+            self.sum -= dropped
+            self.sum_squares -= dropped * dropped
+
+        else:
+            self.count += 1
+
+        self.data[self.index] = value
+        self.sum += value - self.shift
+        self.sum_squares += (value - self.shift) ** 2
+        self.index = (self.index + 1) % self.period
+        if self.index == 0:
+            self._recalculate()
+
+    def stats(self, value: float = None) -> Tuple[float, float]:
+        """
+        It returns the mean and the population standard deviation of the window, or NaN when it is not full. When a
+        value is given it replaces the oldest one, without changing the window.
+        """
+        count, total, squares = self.count, self.sum, self.sum_squares
+        if value is not None:
+            if count == self.period:
+                dropped = self.data[self.index] - self.shift
+                total -= dropped
+                squares -= dropped * dropped
+
+            else:
+                count += 1
+
+            total += value - self.shift
+            squares += (value - self.shift) ** 2
+
+        if count < self.period:
+            return np.nan, np.nan
+
+        mean = total / count
+        return mean + self.shift, max(squares / count - mean * mean, 0.0) ** 0.5
+
+
+class Indicator(ABC):
+    """
+    The base of the indicators, the values of the closed bars are in self.values and the value with the forming bar in
+    self.value. The indicators implement _warm_up(), _push() and _peek().
+    """
+
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, capacity: int):
+        self._values = RingBuffer(capacity, self.dtype)
+        self._one = np.empty(1, dtype=self.dtype)
+        self.value = np.full(1, np.nan, dtype=self.dtype)[0]
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        It is a view of the values of the closed bars, from the oldest to the most recent, NaN before the period.
+        """
+        return self._values.view()
+
+    def warm_up(self, bars: np.ndarray) -> None:
+        """
+        It calculates the values of all the closed bars at once and keeps the state after the last one.
+        """
+        self._values.clear()
+        self._values.extend(self._warm_up(bars).astype(self.dtype, copy=False))
+
+    def push(self, bar: np.void) -> None:
+        """
+        It adds a closed bar in O(1).
+        """
+        self._one[0] = self._push(bar)
+        self._values.extend(self._one)
+
+    def peek(self, bar: np.void) -> None:
+        """
+        It calculates self.value with the forming bar, the state is not changed.
+        """
+        self._one[0] = self._peek(bar)
+        self.value = self._one[0].copy()
+
+    @abstractmethod
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        """
+        It returns the values of all the closed bars and keeps the state after the last one.
+        """
+
+    @abstractmethod
+    def _push(self, bar: np.void):
+        """
+        It returns the value of a new closed bar and moves the state after it.
+        """
+
+    @abstractmethod
+    def _peek(self, bar: np.void):
+        """
+        It returns the value with the forming bar without changing the state.
+        """
+
+
+class SMA(Indicator):
+    """
+    The simple moving average of the close price.
+    """
+
+    def __init__(self, period: int, capacity: int = 1000):
+        super().__init__(capacity)
+        self.period = period
+        self._window = _Window(period)
+
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        close = bars["close"]
+        self._window.warm_up(close)
+        result = np.full(len(close), np.nan)
+        if len(close) >= self.period:
+            result[self.period - 1 :] = sliding_window_view(close, self.period).mean(axis=1)
+
+        return result
+
+    def _push(self, bar: np.void) -> float:
+        self._window.push(float(bar["close"]))
+        return self._window.stats()[0]
+
+    def _peek(self, bar: np.void) -> float:
+        return self._window.stats(float(bar["close"]))[0]
+
+
+class EMA(Indicator):
+    """
+    The exponential moving average of the close price, with alpha = 2 / (period + 1), it starts with the simple average
+    of the first period bars.
+    """
+
+    def __init__(self, period: int, capacity: int = 1000):
+        super().__init__(capacity)
+        self.period = period
+        self._smoother = _Smoother(period, 2.0 / (period + 1))
+
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        return self._smoother.warm_up(bars["close"])
+
+    def _push(self, bar: np.void) -> float:
+        return self._smoother.push(float(bar["close"]))
+
+    def _peek(self, bar: np.void) -> float:
+        return self._smoother.peek(float(bar["close"]))
+
+
+class RSI(Indicator):
+    """
+    The relative strength index of Wilder, from 0 to 100, the gains and the losses are smoothed with alpha = 1 / period.
+    """
+
+    def __init__(self, period: int = 14, capacity: int = 1000):
+        super().__init__(capacity)
+        self.period = period
+        self._gains = _Smoother(period, 1.0 / period)
+        self._losses = _Smoother(period, 1.0 / period)
+        self._close = None
+
+    @staticmethod
+    def _rsi(gain, loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), 100.0 - 100.0 / (1.0 + gain / loss))
+
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        close = bars["close"]
+        change = np.diff(close)
+        gains = self._gains.warm_up(np.maximum(change, 0.0))
+        losses = self._losses.warm_up(np.maximum(-change, 0.0))
+        self._close = float(close[-1]) if len(close) else None
+        return np.concatenate(([np.nan], self._rsi(gains, losses)))[: len(close)]
+
+    def _push(self, bar: np.void) -> float:
+        close = float(bar["close"])
+        if self._close is None:
+            self._close = close
+            return np.nan
+
+        change = close - self._close
+        self._close = close
+        return float(self._rsi(self._gains.push(max(change, 0.0)), self._losses.push(max(-change, 0.0))))
+
+    def _peek(self, bar: np.void) -> float:
+        if self._close is None:
+            return np.nan
+
+        change = float(bar["close"]) - self._close
+        return float(self._rsi(self._gains.peek(max(change, 0.0)), self._losses.peek(max(-change, 0.0))))
+
+
+class ATR(Indicator):
+    """
+    The average true range of Wilder, the true ranges are smoothed with alpha = 1 / period. The true range of the first
+    bar is its high - low.
+    """
+
+    def __init__(self, period: int = 14, capacity: int = 1000):
+        super().__init__(capacity)
+        self.period = period
+        self._smoother = _Smoother(period, 1.0 / period)
+        self._close = None
+
+    def _true_range(self, bar: np.void) -> float:
+        high, low = float(bar["high"]), float(bar["low"])
+        if self._close is None:
+            return high - low
+
+        return max(high, self._close) - min(low, self._close)
+
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        previous = np.concatenate((bars["close"][:1], bars["close"][:-1]))
+        true_range = np.maximum(bars["high"], previous) - np.minimum(bars["low"], previous)
+        self._close = float(bars["close"][-1]) if len(bars) else None
+        return self._smoother.warm_up(true_range)
+
+    def _push(self, bar: np.void) -> float:
+        value = self._smoother.push(self._true_range(bar))
+        self._close = float(bar["close"])
+        return value
+
+    def _peek(self, bar: np.void) -> float:
+        return self._smoother.peek(self._true_range(bar))
+
+
+class Bollinger(Indicator):
+    """
+    The Bollinger bands of the close price, the middle band is the simple moving average and the bands are deviations
+    times the population standard deviation away from it. The values have BOLLINGER_DTYPE.
+    """
+
+    dtype = BOLLINGER_DTYPE
+
+    def __init__(self, period: int = 20, deviations: float = 2.0, capacity: int = 1000):
+        super().__init__(capacity)
+        self.period = period
+        self.deviations = deviations
+        self._window = _Window(period)
+
+    def _bands(self, mean, deviation):
+        return mean, mean + self.deviations * deviation, mean - self.deviations * deviation
+
+    def _warm_up(self, bars: np.ndarray) -> np.ndarray:
+        close = bars["close"]
+        self._window.warm_up(close)
+        result = np.full(len(close), np.nan, dtype=BOLLINGER_DTYPE)
+        if len(close) >= self.period:
+            windows = sliding_window_view(close, self.period)
+            middle, upper, lower = self._bands(windows.mean(axis=1), windows.std(axis=1))
+            result["middle"][self.period - 1 :] = middle
+            result["upper"][self.period - 1 :] = upper
+            result["lower"][self.period - 1 :] = lower
+
+        return result
+
+    def _push(self, bar: np.void) -> tuple:
+        self._window.push(float(bar["close"]))
+        return self._bands(*self._window.stats())
+
+    def _peek(self, bar: np.void) -> tuple:
+        return self._bands(*self._window.stats(float(bar["close"])))
+
+
+class IndicatorSet:
+    """
+    This class keeps the indicators of a symbol and timeframe up to date with the rates, it is shared by the strategies
+    that use the same symbol, timeframe and count of bars, see get_indicators().
+    """
+
+    def __init__(self, symbol: str, timeframe, capacity: int = 1000):
+        """
+        Args:
+            symbol:
+                It is the symbol of the rates.
+
+            timeframe:
+                It is the timeframe of the rates.
+
+            capacity:
+                It is the amount of values of the closed bars kept by each indicator.
+        """
+        self.symbol = symbol.upper()
+        self.timeframe = timeframe
+        self._capacity = capacity
+        self._lock = threading.RLock()
+        self._indicators = {}
+        self._pending = []
+        self._last_time = None
+
+    def _get(self, kind: type, *args) -> Indicator:
+        key = (kind,) + args
+        with self._lock:
+            indicator = self._indicators.get(key)
+            if indicator is None:
+                indicator = kind(*args, capacity=self._capacity)
+                self._indicators[key] = indicator
+                self._pending.append(indicator)
+
+            return indicator
+
+    def sma(self, period: int) -> SMA:
+        """
+        Returns:
+            It returns the shared simple moving average, it is calculated in the next update().
+        """
+        return self._get(SMA, period)
+
+    def ema(self, period: int) -> EMA:
+        """
+        Returns:
+            It returns the shared exponential moving average, it is calculated in the next update().
+        """
+        return self._get(EMA, period)
+
+    def rsi(self, period: int = 14) -> RSI:
+        """
+        Returns:
+            It returns the shared relative strength index, it is calculated in the next update().
+        """
+        return self._get(RSI, period)
+
+    def atr(self, period: int = 14) -> ATR:
+        """
+        Returns:
+            It returns the shared average true range, it is calculated in the next update().
+        """
+        return self._get(ATR, period)
+
+    def bollinger(self, period: int = 20, deviations: float = 2.0) -> Bollinger:
+        """
+        Returns:
+            It returns the shared Bollinger bands, it is calculated in the next update().
+        """
+        return self._get(Bollinger, period, float(deviations))
+
+    def update(self, rates: np.ndarray) -> None:
+        """
+        This function updates the indicators with the rates, the last bar is the forming one. Only the bars closed since
+        the last update are added, when some bars are missing, because the update was late or the rates went back, the
+        indicators are calculated again from all the closed bars. Calling it again with the same rates is cheap.
+
+        Args:
+            rates:
+                It is the structured array of Rates.rates, sorted by time.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.indicators import get_indicators
+            >>> from metatrader5EasyT.rates import Rates
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> timeframe = TimeFrame()
+            >>> eurusd_rates = Rates('EURUSD', timeframe.ONE_MINUTE, 500, incremental=True)
+            >>> indicators = get_indicators('EURUSD', timeframe.ONE_MINUTE, count=500)
+            >>> sma = indicators.sma(20)
+            >>> eurusd_rates.update_rates()
+            >>> indicators.update(eurusd_rates.rates)
+            >>> sma.value
+            1.10212
+
+        """
+        if rates is None or len(rates) == 0:
+            return
+
+        with self._lock:
+            closed = rates[:-1]
+            times = closed["time"]
+            start = 0 if self._last_time is None else times.searchsorted(self._last_time, side="right")
+            # The first update, bars missing between the updates or rates that went back.
+            missing = self._last_time is None or len(times) > 0 and (start == 0 or times[-1] < self._last_time)
+            if missing:
+                for indicator in self._indicators.values():
+                    indicator.warm_up(closed)
+
+            else:
+                for indicator in self._pending:
+                    indicator.warm_up(closed)
+
+                for bar in closed[start:]:
+                    for indicator in self._indicators.values():
+                        if indicator not in self._pending:
+                            indicator.push(bar)
+
+            self._pending = []
+            if len(times) > 0:
+                self._last_time = times[-1]
+
+            forming = rates[-1]
+            for indicator in self._indicators.values():
+                indicator.peek(forming)
+
+
+_registry: Dict[tuple, IndicatorSet] = {}
+_registry_lock = threading.Lock()
+
+
+def get_indicators(symbol: str, timeframe, capacity: int = 1000, count: int = None) -> IndicatorSet:
+    """
+    Args:
+        symbol:
+            It is the symbol of the rates.
+
+        timeframe:
+            It is the timeframe of the rates.
+
+        capacity:
+            It is the amount of values of the closed bars kept by each indicator, it is used only by the first call.
+
+        count:
+            It is the amount of bars of the rates the IndicatorSet is updated with, like Rates.count. The indicators are
+            calculated from the bars of their first update, so rates of different lengths do not share them.
+
+    Returns:
+        It returns the IndicatorSet shared by all the callers with the same symbol, timeframe and count.
+    """
+    key = (symbol.upper(), timeframe, count)
+    with _registry_lock:
+        indicators = _registry.get(key)
+        if indicators is None:
+            indicators = IndicatorSet(symbol, timeframe, capacity)
+            _registry[key] = indicators
+
+        return indicators
@@ -1,6 +1,12 @@
+import time
+from collections import namedtuple
+from typing import Dict
+
 import MetaTrader5 as Mt5
 from abstractEasyT import initialization
-from supportLibEasyT import log_manager
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.symbol_info import symbol_cache
 
 
 class PlatformNotInitialized(BaseException):
@@ -11,6 +17,17 @@ class SymbolNotFound(BaseException):
     """Raise this error when the symbol is not found."""
 
 
+SYMBOL_OK = "ok"
+SYMBOL_NOT_FOUND = "not found"
+SYMBOL_NOT_SELECTED = "not selected"
+
+SymbolInitialization = namedtuple("SymbolInitialization", "symbol status latency")
+SymbolInitialization.__doc__ = """
+The result of the initialization of one symbol, the status is SYMBOL_OK, SYMBOL_NOT_FOUND or SYMBOL_NOT_SELECTED and
+the latency is the time in seconds of its symbol_select() call, 0.0 when the symbol was already visible or not found.
+"""
+
+
 class Initialize(initialization.Initialize):
     """
     This class ensure that the platform are working properly.
@@ -22,7 +39,7 @@ class Initialize(initialization.Initialize):
         Initialize the constructor and set the _log.
         """
 
-        self._log = log_manager.LogManager("metatrader5")
+        self._log = get_log_manager()
         self._log.logger.info("Logger Initialized in Initialize")
 
         self.symbol_initialized = []
@@ -100,16 +117,96 @@ class Initialize(initialization.Initialize):
         self._log.logger.info("Initializing symbols.")
         for symbol in symbols:
             symbol = symbol.upper()
-            self._log.logger.info(f"Initializing {symbol}.")
+            self._log.logger.debug("Initializing %s.", symbol)
             Mt5.symbol_select(symbol, True)
 
             # Prepare the symbol to open positions
-            symbol_info = Mt5.symbol_info(symbol)
+            symbol_info = symbol_cache.get(symbol)
             if symbol_info is None:
-                self._log.logger.error(f"It was not possible to initialize {symbol}, symbol not found or not visible.")
+                self._log.logger.error("It was not possible to initialize %s, symbol not found or not visible.", symbol)
                 raise SymbolNotFound
 
             else:
                 self.symbol_initialized.append(symbol)
-                self._log.logger.info(f"{symbol} successfully initialized.")
-                return True
+                self._log.logger.info("%s successfully initialized.", symbol)
+
+        return True
+
+    def initialize_symbols(self, *symbols: str, group: str = None) -> Dict[str, SymbolInitialization]:
+        """
+        This function initializes many symbols at once, it is faster than initialize_symbol() for hundreds of symbols.
+
+        All the symbols are resolved with a single symbols_get() call, only the symbols that are not visible yet are
+        selected, one symbol_select() each because Metatrader5 has no bulk selection, and the information of every
+        symbol found is stored in the symbol cache (metatrader5EasyT.symbol_info). It does not raise when a symbol is
+        missing, it reports it.
+
+        Args:
+            symbols:
+                It receives strings as parameters containing the symbol names to be initialized, a symbol given twice
+                is initialized once. When no symbol is given, all the symbols of the group are initialized.
+
+            group:
+                It is the group filter of symbols_get(), like "*USD*", it reduces the amount of symbols returned by
+                Metatrader5.
+
+        Returns:
+            It returns a dict from the symbol name to a SymbolInitialization with the status and latency of each
+            symbol, and it updates the list self.symbol_initialized with the symbols correctly initialized.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.initialization import Initialize
+            >>> initialize = Initialize()
+            >>> initialize.initialize_platform()
+            >>> report = initialize.initialize_symbols('EURUSD', 'GBPUSD', 'EUR USD')
+            >>> report['EURUSD'].status
+            'ok'
+            >>> report['EUR USD'].status
+            'not found'
+            >>> # Or all the symbols of a group:
+            >>> report = initialize.initialize_symbols(group='*USD*')
+
+        """
+        self._log.logger.info("Initializing symbols in bulk.")
+        available = Mt5.symbols_get(group) if group is not None else Mt5.symbols_get()
+        if available is None:
+            self._log.logger.error("It was not possible to retrieve the symbols: %s", Mt5.last_error())
+            available = ()
+
+        available = {symbol_info.name.upper(): symbol_info for symbol_info in available}
+
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols)) if symbols else list(available)
+        report = {}
+        for symbol in symbols:
+            symbol_info = available.get(symbol)
+            if symbol_info is None:
+                report[symbol] = SymbolInitialization(symbol, SYMBOL_NOT_FOUND, 0.0)
+
+            elif symbol_info.visible:
+                symbol_cache.put(symbol, symbol_info)
+                report[symbol] = SymbolInitialization(symbol, SYMBOL_OK, 0.0)
+
+            else:
+                start = time.perf_counter()
+                selected = Mt5.symbol_select(symbol_info.name, True)
+                latency = time.perf_counter() - start
+                if selected:
+                    symbol_cache.put(symbol, symbol_info)
+                    report[symbol] = SymbolInitialization(symbol, SYMBOL_OK, latency)
+
+                else:
+                    report[symbol] = SymbolInitialization(symbol, SYMBOL_NOT_SELECTED, latency)
+
+        failed = [symbol for symbol, result in report.items() if result.status != SYMBOL_OK]
+        if failed:
+            self._log.logger.error("It was not possible to initialize %s symbols: %s.", len(failed), ", ".join(failed))
+
+        initialized = set(self.symbol_initialized)
+        for symbol, result in report.items():
+            if result.status == SYMBOL_OK and symbol not in initialized:
+                self.symbol_initialized.append(symbol)
+                initialized.add(symbol)
+
+        self._log.logger.info("%s symbols successfully initialized.", len(report) - len(failed))
+        return report
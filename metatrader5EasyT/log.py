@@ -0,0 +1,130 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+
+from supportLibEasyT import log_manager
+
+_lock = threading.RLock()
+_log_manager = None
+_listener = None
+_exit_registered = False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    It puts the records in the queue as they are, the message is formatted by the background thread, not by the
+    thread that logged it. The arguments of the records must not be changed after they are logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def get_log_manager() -> log_manager.LogManager:
+    """
+    This function replaces the LogManager created by each object, the LogManager configures the root logger and adds a
+    console handler everytime it is created, so it is created only once and shared by all the classes of this package.
+
+    Returns:
+        It returns the shared LogManager, the first call creates it.
+
+    Examples:
+        >>> # All the code you need to execute the function:
+        >>> from metatrader5EasyT.log import get_log_manager
+        >>> log = get_log_manager()
+        >>> log.logger.info("Lazy %s formatting, done only when the record is written.", "%-style")
+
+    """
+    global _log_manager
+    with _lock:
+        if _log_manager is None:
+            _log_manager = log_manager.LogManager("metatrader5")
+
+        return _log_manager
+
+
+def start_queue_logging() -> None:
+    """
+    This function moves the handlers of the root logger, like the log file and the console, to a background thread, the
+    threads that log only put the records in a queue, so the trading loop does not wait for the formatting and the file
+    I/O. The records left in the queue are written when the program exits.
+
+    It is not started by this package, the handlers of the root logger can belong to the application, so the
+    application decides when to call it, usually once after its logging is configured.
+
+    Examples:
+        >>> # All the code you need to execute the function:
+        >>> from metatrader5EasyT.log import get_log_manager, start_queue_logging
+        >>> get_log_manager()
+        >>> start_queue_logging()
+        >>> get_log_manager().logger.info("Lazy %s formatting, done by the background thread.", "%-style")
+
+    """
+    global _listener, _exit_registered
+    with _lock:
+        if _listener is not None:
+            return
+
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        records = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+
+        root.addHandler(_DeferredQueueHandler(records))
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        if not _exit_registered:
+            atexit.register(stop_queue_logging)
+            _exit_registered = True
+
+
+def _log_directly_after_fork() -> None:
+    """
+    The thread of the listener does not exist in a forked process, like the workers of metatrader5EasyT.sweep, and these
+    processes exit with os._exit(), without atexit, so a listener of the child would drop the records left in its queue.
+    The child gives the handlers back to the root logger and writes its records as they are logged. The records that
+    the parent did not write yet are copied with the memory, they stay in the copied queue and are not written twice.
+    """
+    global _lock, _listener
+    _lock = threading.RLock()
+    if _listener is not None:
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                root.removeHandler(handler)
+
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+
+        _listener = None
+
+
+def stop_queue_logging() -> None:
+    """
+    This function writes the records left in the queue, stops the background thread and gives the handlers back to the
+    root logger, so the records are written by the threads that log them again.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                root.removeHandler(handler)
+
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+
+        _listener = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_log_directly_after_fork)
@@ -0,0 +1,363 @@
+"""
+Latency and throughput metrics of the calls to Metatrader5.
+
+The instrumentation is disabled by default and then it costs nothing, the classes of this package call the MetaTrader5
+module directly. When it is enabled the module is replaced, in the modules of this package, by a proxy that counts and
+times every call, so you can see how much time goes to the terminal:
+
+    >>> from metatrader5EasyT import metrics
+    >>> metrics.enable()
+    >>> # Use Tick, Rates, Trade and Initialize as usual, then:
+    >>> metrics.registry.snapshot()["order_send"]
+    {'count': 20, 'errors': {}, 'sum': 0.0123, 'max': 0.00143, 'p50': 0.00051, 'p90': 0.00087, 'p99': 0.00141}
+    >>> print(metrics.registry.prometheus())
+    >>> metrics.disable()
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from itertools import accumulate
+from typing import Dict
+from typing import Sequence
+
+SUB_BUCKET_BITS = 7
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+# The functions of Metatrader5 that return None when they fail, shutdown for instance always returns None.
+FAILS_WITH_NONE = frozenset(
+    (
+        "account_info",
+        "copy_rates_from",
+        "copy_rates_from_pos",
+        "copy_rates_range",
+        "copy_ticks_from",
+        "copy_ticks_range",
+        "history_deals_get",
+        "history_deals_total",
+        "history_orders_get",
+        "history_orders_total",
+        "market_book_get",
+        "order_calc_margin",
+        "order_calc_profit",
+        "order_check",
+        "order_send",
+        "orders_get",
+        "orders_total",
+        "positions_get",
+        "positions_total",
+        "symbol_info",
+        "symbol_info_tick",
+        "symbols_get",
+        "symbols_total",
+        "terminal_info",
+        "version",
+    )
+)
+
+
+class LatencyHistogram:
+    """
+    This class is a histogram of latencies in nanoseconds with logarithmic buckets, like HdrHistogram, every power of two
+    is split in 64 linear sub-buckets, so the percentiles have less than 1% of error from one nanosecond to hours
+    using a fixed amount of memory, and recording a value is O(1).
+    """
+
+    def __init__(self, highest: int = 2**42):
+        """
+        Args:
+            highest:
+                It is the highest value recorded in nanoseconds, higher values are recorded as the highest.
+        """
+        self.highest = highest
+        self.counts = [0] * (self._index(highest) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """
+        It returns the middle of the values recorded in the bucket.
+        """
+        half = 1 << (SUB_BUCKET_BITS - 1)
+        if index < 2 * half:
+            return index
+
+        shift = index // half - 1
+        low = (index - shift * half) << shift
+        return low + (1 << shift) // 2
+
+    def record(self, value: int) -> None:
+        """
+        It records one latency in nanoseconds.
+        """
+        value = min(max(value, 0), self.highest)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, quantile: float) -> int:
+        """
+        Args:
+            quantile:
+                It is the quantile between 0 and 1, like 0.99.
+
+        Returns:
+            It returns the value in nanoseconds below which there are the quantile of the recorded values, or 0 when
+            nothing was recorded.
+        """
+        if self.count == 0:
+            return 0
+
+        rank = max(1, int(quantile * self.count + 0.5))
+        for index, total in enumerate(accumulate(self.counts)):
+            if total >= rank:
+                return min(self._value(index), self.max)
+
+        return self.max
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+
+class CallMetrics:
+    """
+    The metrics of one function of Metatrader5.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = {}
+        self.latency = LatencyHistogram()
+
+
+class MetricsRegistry:
+    """
+    This class keeps the metrics of every function of Metatrader5 and exports them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def record(self, function: str, elapsed: int, error: int or None = None) -> None:
+        """
+        It records one call.
+
+        Args:
+            function:
+                It is the name of the function of Metatrader5.
+
+            elapsed:
+                It is the duration of the call in nanoseconds.
+
+            error:
+                It is the error code of the call, or None when the call succeeded.
+        """
+        with self._lock:
+            metrics = self._calls.get(function)
+            if metrics is None:
+                metrics = self._calls[function] = CallMetrics()
+
+            metrics.count += 1
+            metrics.latency.record(elapsed)
+            if error is not None:
+                metrics.errors[error] = metrics.errors.get(error, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+
+    def snapshot(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, dict]:
+        """
+        Returns:
+            It returns a dict from the function name to its count, errors by code, and the sum, max and percentiles of
+            the latency in seconds.
+        """
+        with self._lock:
+            snapshot = {}
+            for function, metrics in sorted(self._calls.items()):
+                snapshot[function] = {
+                    "count": metrics.count,
+                    "errors": dict(metrics.errors),
+                    "sum": metrics.latency.sum / 1e9,
+                    "max": metrics.latency.max / 1e9,
+                }
+                for quantile in quantiles:
+                    snapshot[function][f"p{quantile * 100:g}"] = metrics.latency.percentile(quantile) / 1e9
+
+            return snapshot
+
+    def prometheus(self, prefix: str = "metatrader5") -> str:
+        """
+        Returns:
+            It returns the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_calls_total Calls to the Metatrader5 terminal.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for function, metrics in snapshot.items():
+            lines.append(f'{prefix}_calls_total{{function="{function}"}} {metrics["count"]}')
+
+        lines += [
+            f"# HELP {prefix}_errors_total Calls to the Metatrader5 terminal that failed, by error code.",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        for function, metrics in snapshot.items():
+            for code, count in sorted(metrics["errors"].items()):
+                lines.append(f'{prefix}_errors_total{{function="{function}",code="{code}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_call_latency_seconds Latency of the calls to the Metatrader5 terminal.",
+            f"# TYPE {prefix}_call_latency_seconds summary",
+        ]
+        for function, metrics in snapshot.items():
+            for quantile in QUANTILES:
+                value = metrics[f"p{quantile * 100:g}"]
+                lines.append(f'{prefix}_call_latency_seconds{{function="{function}",quantile="{quantile}"}} {value}')
+
+            lines.append(f'{prefix}_call_latency_seconds_sum{{function="{function}"}} {metrics["sum"]}')
+            lines.append(f'{prefix}_call_latency_seconds_count{{function="{function}"}} {metrics["count"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedTerminal:
+    """
+    This class is a proxy of the MetaTrader5 module, the constants are returned as they are, and the functions are
+    wrapped to record their latency and errors in the registry.
+
+    A call fails when it returns False, when a function of FAILS_WITH_NONE returns None, or when order_send returns a
+    retcode different of done, the error code is the retcode or the code of Metatrader5 last_error(). That last_error()
+    call is recorded as a call of its own, so the calls recorded are all the calls made to the terminal.
+    """
+
+    def __init__(self, terminal, registry: MetricsRegistry):
+        self._terminal = terminal
+        self._registry = registry
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._terminal, name)
+        if not callable(attribute):
+            return attribute
+
+        terminal = self._terminal
+        record = self._registry.record
+
+        def instrumented(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                result = getattr(terminal, name)(*args, **kwargs)
+
+            except BaseException:
+                record(name, time.perf_counter_ns() - start, -1)
+                raise
+
+            elapsed = time.perf_counter_ns() - start
+            if result is False or result is None and name in FAILS_WITH_NONE:
+                # The code of the failure is one more call to the terminal, it is recorded like the others.
+                start = time.perf_counter_ns()
+                error = terminal.last_error()[0]
+                record("last_error", time.perf_counter_ns() - start)
+                record(name, elapsed, error)
+
+            elif name == "order_send" and result.retcode != terminal.TRADE_RETCODE_DONE:
+                record(name, elapsed, result.retcode)
+
+            else:
+                record(name, elapsed)
+
+            return result
+
+        # The wrapper is cached, the function itself is looked up in every call, so it can still be patched.
+        setattr(self, name, instrumented)
+        return instrumented
+
+
+# The registry shared by all the classes of this package.
+registry = MetricsRegistry()
+
+
+def enable(metrics: MetricsRegistry = None) -> None:
+    """
+    This function starts recording the calls to Metatrader5 made by the modules of this package. Only the modules
+    already imported are instrumented, a module imported later calls Metatrader5 directly, so import the classes you
+    use before enabling it, or enable it again after the import.
+
+    Args:
+        metrics:
+            It is the registry where the calls are recorded, the shared registry is used when it is None.
+    """
+    proxies = {}
+    for name, module in list(sys.modules.items()):
+        terminal = getattr(module, "Mt5", None)
+        if name.startswith("metatrader5EasyT.") and terminal is not None:
+            if isinstance(terminal, InstrumentedTerminal):
+                terminal = terminal._terminal
+
+            if id(terminal) not in proxies:
+                proxies[id(terminal)] = InstrumentedTerminal(terminal, registry if metrics is None else metrics)
+
+            module.Mt5 = proxies[id(terminal)]
+
+
+def disable() -> None:
+    """
+    This function stops recording the calls, the modules of this package call Metatrader5 directly again.
+    """
+    for name, module in list(sys.modules.items()):
+        if name.startswith("metatrader5EasyT.") and isinstance(getattr(module, "Mt5", None), InstrumentedTerminal):
+            module.Mt5 = module.Mt5._terminal
+
+
+def start_http_server(port: int, address: str = "", metrics: MetricsRegistry = None) -> ThreadingHTTPServer:
+    """
+    This function serves the metrics in the Prometheus text format in a daemon thread, at any path.
+
+    Args:
+        port:
+            It is the port of the server.
+
+        address:
+            It is the address of the server, all the interfaces when it is empty.
+
+        metrics:
+            It is the registry served, the shared registry is used when it is None.
+
+    Returns:
+        It returns the server, call shutdown() to stop it.
+    """
+    metrics = registry if metrics is None else metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metatrader5-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,272 @@
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+
+import MetaTrader5 as Mt5
+import numpy as np
+
+from metatrader5EasyT.log import get_log_manager
+
+# One row per open position, the symbol is an index of PositionBook.symbols.
+POSITIONS_DTYPE = np.dtype(
+    [
+        ("ticket", "<u8"),
+        ("symbol", "<u4"),
+        ("type", "u1"),
+        ("magic", "<i8"),
+        ("volume", "<f8"),
+        ("price_open", "<f8"),
+        ("sl", "<f8"),
+        ("tp", "<f8"),
+        ("price_current", "<f8"),
+        ("profit", "<f8"),
+        ("swap", "<f8"),
+        ("time_msc", "<i8"),
+        ("time_update_msc", "<i8"),
+    ]
+)
+
+# The profit and the current price change with every tick, they are not a change of the position.
+_MODIFICATION_FIELDS = ("time_update_msc", "volume", "sl", "tp")
+
+
+class PositionDelta(NamedTuple):
+    """
+    The positions that changed between two refreshes of a PositionBook, every field is an array with POSITIONS_DTYPE.
+    """
+
+    opened: np.ndarray
+    closed: np.ndarray
+    # The new rows of the positions whose volume, stop loss or take profit changed.
+    modified: np.ndarray
+
+    def __bool__(self) -> bool:
+        return bool(len(self.opened) or len(self.closed) or len(self.modified))
+
+
+_EMPTY = np.empty(0, dtype=POSITIONS_DTYPE)
+_NO_CHANGE = PositionDelta(_EMPTY, _EMPTY, _EMPTY)
+
+
+def compare(old: np.ndarray, new: np.ndarray) -> PositionDelta:
+    """
+    This function compares two tables of positions by ticket, like PositionBook.table in two cycles. A reader that does
+    not refresh the book itself keeps the last table it saw and compares it, so it does not miss the changes read by
+    others.
+
+    Returns:
+        It returns the positions opened, closed and modified from old to new.
+    """
+    if len(old) == 0 and len(new) == 0:
+        return _NO_CHANGE
+
+    still_open = np.isin(new["ticket"], old["ticket"])
+    was_open = np.isin(old["ticket"], new["ticket"])
+    # The same tickets in the same order, so the rows of both arrays can be compared.
+    before = old[was_open][np.argsort(old["ticket"][was_open], kind="stable")]
+    after = new[still_open][np.argsort(new["ticket"][still_open], kind="stable")]
+    changed = np.zeros(len(after), dtype=bool)
+    for field in _MODIFICATION_FIELDS:
+        changed |= before[field] != after[field]
+
+    return PositionDelta(opened=new[~still_open], closed=old[~was_open], modified=after[changed])
+
+
+class PositionBook:
+    """
+    This class reads the positions of all the symbols with one call to Metatrader5 per cycle, instead of one call per
+    symbol, and indexes them by symbol and by ticket. All the positions of a symbol are kept, hedged accounts can have
+    many positions of the same symbol.
+
+    The positions are read again by refresh(), or by the readers when they are older than max_age or when invalidate()
+    was called, like after an order is sent.
+    """
+
+    def __init__(self, max_age: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_age:
+                It is the time in seconds that the positions are used before the readers ask Metatrader5 again. Call
+                refresh() at the start of each cycle to read them exactly once per cycle.
+
+            clock:
+                It is the function that returns the time in seconds, like the simulated time in the tests.
+        """
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in PositionBook")
+
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refreshed = None
+
+        # The names of the symbols as the terminal returns them, the symbol of self.table is an index of this list.
+        self.symbols = []
+        self._symbol_ids = {}
+        # The result of the last positions_get and its rows.
+        self.snapshot = ()
+        self.table = _EMPTY
+        self.delta = _NO_CHANGE
+        self._by_symbol = {}
+        self._by_ticket = {}
+
+    def refresh(self) -> PositionDelta:
+        """
+        This function reads all the positions with one call to Metatrader5 and compares them with the previous ones.
+
+        Returns:
+            It returns the PositionDelta since the previous refresh, by any reader, when Metatrader5 does not return the positions
+            nothing changes and the delta is empty.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.positions import get_position_book
+            >>> book = get_position_book()
+            >>> delta = book.refresh()
+            >>> delta.opened['ticket']
+            array([50904562, 50904563], dtype=uint64)
+            >>> [position.type for position in book.positions('EURUSD')]
+            [0, 1]
+            >>> # After the stop loss of a position was hit:
+            >>> book.refresh().closed['ticket']
+            array([50904563], dtype=uint64)
+
+        """
+        with self._lock:
+            positions = Mt5.positions_get()
+            if positions is None:
+                self._log.logger.error("It was not possible to retrieve the positions: %s", Mt5.last_error())
+                return _NO_CHANGE
+
+            by_symbol = {}
+            by_ticket = {}
+            rows = []
+            for position in positions:
+                # The readers look the symbols up in upper case, like Trade, self.symbols keeps the terminal names.
+                key = position.symbol.upper()
+                symbol_id = self._symbol_ids.get(key)
+                if symbol_id is None:
+                    symbol_id = self._symbol_ids[key] = len(self.symbols)
+                    self.symbols.append(position.symbol)
+
+                by_symbol.setdefault(key, []).append(position)
+                by_ticket[position.ticket] = position
+                rows.append(
+                    (
+                        position.ticket,
+                        symbol_id,
+                        position.type,
+                        position.magic,
+                        position.volume,
+                        position.price_open,
+                        position.sl,
+                        position.tp,
+                        position.price_current,
+                        position.profit,
+                        position.swap,
+                        position.time_msc,
+                        position.time_update_msc,
+                    )
+                )
+
+            table = np.array(rows, dtype=POSITIONS_DTYPE) if rows else _EMPTY
+            self.delta = compare(self.table, table)
+            self.snapshot = positions
+            self.table = table
+            self._by_symbol = {symbol: tuple(symbol_positions) for symbol, symbol_positions in by_symbol.items()}
+            self._by_ticket = by_ticket
+            self._refreshed = self._clock()
+
+        if self.delta:
+            self._log.logger.debug(
+                "Positions opened: %s, closed: %s, modified: %s",
+                len(self.delta.opened),
+                len(self.delta.closed),
+                len(self.delta.modified),
+            )
+
+        return self.delta
+
+    def invalidate(self) -> None:
+        """
+        This function makes the next reader read the positions again, like after an order was sent.
+        """
+        self._refreshed = None
+
+    def ensure_fresh(self) -> None:
+        """
+        This function refreshes the positions when they are older than max_age or were invalidated, the readers call
+        it before reading.
+        """
+        refreshed = self._refreshed
+        if refreshed is None or self._clock() - refreshed >= self.max_age:
+            self.refresh()
+
+    def positions(self, symbol: str = None) -> tuple:
+        """
+        Args:
+            symbol:
+                It is the symbol of the positions, in any case, when it is None the positions of all the symbols are
+                returned.
+
+        Returns:
+            It returns the positions of the symbol like positions_get(symbol=symbol), an empty tuple when there is no
+            position.
+        """
+        self.ensure_fresh()
+        if symbol is None:
+            return self.snapshot
+
+        return self._by_symbol.get(symbol.upper(), ())
+
+    def position(self, ticket: int) -> Optional[tuple]:
+        """
+        Returns:
+            It returns the position with the ticket, or None when it is not open.
+        """
+        self.ensure_fresh()
+        return self._by_ticket.get(ticket)
+
+    def rows(self, symbol: str) -> np.ndarray:
+        """
+        Returns:
+            It returns the rows of self.table of the symbol.
+        """
+        self.ensure_fresh()
+        symbol_id = self._symbol_ids.get(symbol.upper())
+        if symbol_id is None:
+            return _EMPTY
+
+        return self.table[self.table["symbol"] == symbol_id]
+
+    def net_volume(self) -> Dict[str, float]:
+        """
+        Returns:
+            It returns a dict from the symbol to the volume of its buy positions minus the volume of the sell ones.
+        """
+        self.ensure_fresh()
+        table = self.table
+        signed = np.where(table["type"] == Mt5.POSITION_TYPE_BUY, table["volume"], -table["volume"])
+        totals = np.bincount(table["symbol"], weights=signed, minlength=len(self.symbols))
+        present = np.unique(table["symbol"])
+        return {self.symbols[index]: float(totals[index]) for index in present}
+
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def get_position_book() -> PositionBook:
+    """
+    Returns:
+        It returns the PositionBook shared by all the classes of this package, it is created in the first call.
+    """
+    global _book
+    with _book_lock:
+        if _book is None:
+            _book = PositionBook()
+
+        return _book
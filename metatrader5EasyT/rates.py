@@ -1,16 +1,41 @@
+from typing import TYPE_CHECKING
+
 import MetaTrader5 as Mt5
+import numpy as np
 from abstractEasyT import rates
-from supportLibEasyT import log_manager
 
+from metatrader5EasyT.buffer import RingBuffer
+from metatrader5EasyT.indicators import IndicatorSet
+from metatrader5EasyT.indicators import get_indicators
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.resample import Period
+from metatrader5EasyT.resample import resample
+from metatrader5EasyT.resample import timeframe_seconds
 from metatrader5EasyT.timeframe import TimeFrame
+from metatrader5EasyT.worker import get_worker
+
+if TYPE_CHECKING:
+    from metatrader5EasyT.history import HistoryCache
 
 
 class Rates(rates.Rates):
     """
     This class is responsible to retrieve a certain amount of previous data.
+
+    The structured array returned by Metatrader5 is kept as it is, and the attributes time, open, high, low, close,
+    tick_volume, spread and real_volume are zero-copy views of its fields. They can still be assigned, the assigned
+    value is returned instead of the view until the next update_rates().
     """
 
-    def __init__(self, symbol: str, timeframe: TimeFrame, count: int):
+    def __init__(
+        self,
+        symbol: str,
+        timeframe: TimeFrame,
+        count: int,
+        incremental: bool = False,
+        history: "HistoryCache" = None,
+    ):
         """
         Args:
             symbol:
@@ -24,21 +49,180 @@ class Rates(rates.Rates):
                 It is the amount of information in the past you want. If your time frame is 5 minutes and your count is 4,
                 it will return 4 values containing time, open, high, low, close, tick_volume information of this past 4
                 candlesticks.
+
+            incremental:
+                When it is True, the rates are kept in preallocated buffers and every update fetches only the bars
+                after the last stored time, plus the bar that is still forming, instead of the whole history again.
+                The attributes are zero-copy views of this buffer, so they are overwritten in place by the next
+                update, copy them if you need to keep the values.
+
+            history:
+                It is a HistoryCache (metatrader5EasyT.history), when it is given the candlesticks are stored on disk
+                and every update, including the first one after a restart, fetches only the bars after the last
+                stored one. The attributes are views of the memory-mapped file. It takes precedence over incremental.
         """
 
-        self._log = log_manager.LogManager("metatrader5")
+        self._log = get_log_manager()
         self._log.logger.info("Logger Initialized in Rates")
 
         self._timeframe = timeframe
         self._symbol = symbol.upper()
         self._count = count
+        self._incremental = incremental
+        self._history = history
+        self._buffer = None
+
+        self._rates = None
+        self._assigned = {}
+        self._frame = None
+        self._indicators = None
+
+    @property
+    def rates(self) -> np.ndarray or None:
+        """
+        It is the structured array with all the candlesticks, it is None until the first update.
+        """
+        return self._rates
+
+    def _field(self, name: str) -> np.ndarray or None:
+        if name in self._assigned:
+            return self._assigned[name]
+
+        return None if self._rates is None else self._rates[name]
+
+    def _assign(self, name: str, value) -> None:
+        # The attributes could be assigned before they were views, the value is kept until the next update_rates().
+        self._assigned[name] = value
+        self._frame = None
+
+    @property
+    def time(self) -> np.ndarray or None:
+        return self._field("time")
+
+    @time.setter
+    def time(self, value) -> None:
+        self._assign("time", value)
+
+    @property
+    def open(self) -> np.ndarray or None:
+        return self._field("open")
+
+    @open.setter
+    def open(self, value) -> None:
+        self._assign("open", value)
+
+    @property
+    def high(self) -> np.ndarray or None:
+        return self._field("high")
+
+    @high.setter
+    def high(self, value) -> None:
+        self._assign("high", value)
+
+    @property
+    def low(self) -> np.ndarray or None:
+        return self._field("low")
+
+    @low.setter
+    def low(self, value) -> None:
+        self._assign("low", value)
+
+    @property
+    def close(self) -> np.ndarray or None:
+        return self._field("close")
+
+    @close.setter
+    def close(self, value) -> None:
+        self._assign("close", value)
+
+    @property
+    def tick_volume(self) -> np.ndarray or None:
+        return self._field("tick_volume")
+
+    @tick_volume.setter
+    def tick_volume(self, value) -> None:
+        self._assign("tick_volume", value)
+
+    @property
+    def spread(self) -> np.ndarray or None:
+        return self._field("spread")
+
+    @spread.setter
+    def spread(self, value) -> None:
+        self._assign("spread", value)
+
+    @property
+    def real_volume(self) -> np.ndarray or None:
+        return self._field("real_volume")
+
+    @real_volume.setter
+    def real_volume(self, value) -> None:
+        self._assign("real_volume", value)
+
+    @property
+    def indicators(self) -> IndicatorSet:
+        """
+        It is the IndicatorSet shared by all the Rates of the same symbol, timeframe and count, see
+        metatrader5EasyT.indicators.
+        Once it is asked, every update_rates() updates the indicators with the new closed bars and the forming one.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> from metatrader5EasyT.rates import Rates
+            >>> timeframe = TimeFrame()
+            >>> eurusd_rates = Rates(symbol='EURUSD', timeframe=timeframe.ONE_MINUTE, count=500, incremental=True)
+            >>> rsi = eurusd_rates.indicators.rsi(14)
+            >>> eurusd_rates.update_rates()
+            >>> rsi.value
+            48.61
+
+        """
+        if self._indicators is None:
+            self._indicators = get_indicators(self._symbol, self._timeframe, count=self._count)
+            self._indicators.update(self._rates)
+
+        return self._indicators
+
+    def as_frame(self):
+        """
+        This function builds a pandas DataFrame with the candlesticks, it is built only when it is asked and it is
+        reused until the next update. Pandas is not a dependency of this package, install it to use this function.
+
+        Raises:
+            ImportError: If pandas is not installed.
+
+        Returns:
+            It returns a DataFrame with one column per field, or None if the rates were not updated yet.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.initialization import Initialize
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> from metatrader5EasyT.rates import Rates
+            >>> initialize = Initialize()
+            >>> initialize.initialize_platform()
+            >>> initialize.initialize_symbol('EURUSD')
+            >>> timeframe = TimeFrame()
+            >>> eurusd_rates = Rates(symbol='EURUSD', timeframe=timeframe.ONE_MINUTE, count=20)
+            >>> eurusd_rates.update_rates()
+            >>> eurusd_rates.as_frame().columns.tolist()
+            ['time', 'open', 'high', 'low', 'close', 'tick_volume', 'spread', 'real_volume']
+
+        """
+        if self._rates is None:
+            return None
+
+        if self._frame is None:
+            try:
+                import pandas as pd
+
+            except ImportError as error:
+                raise ImportError("as_frame() requires pandas, install it with: pip install pandas") from error
 
-        self.time = None
-        self.open = None
-        self.high = None
-        self.low = None
-        self.close = None
-        self.tick_volume = None
+            self._frame = pd.DataFrame(self._rates)
+
+        return self._frame
 
     def change_symbol(self, new_symbol: str) -> None:
         """
@@ -53,6 +237,8 @@ class Rates(rates.Rates):
 
         """
         self._symbol = new_symbol.upper()
+        self._buffer = None
+        self._indicators = None
 
     def change_timeframe(self, new_timeframe: TimeFrame) -> None:
         """
@@ -67,6 +253,8 @@ class Rates(rates.Rates):
 
         """
         self._timeframe = new_timeframe
+        self._buffer = None
+        self._indicators = None
 
     def change_count(self, new_count: int) -> None:
         """
@@ -103,6 +291,8 @@ class Rates(rates.Rates):
 
         """
         self._count = new_count
+        self._buffer = None
+        self._indicators = None
 
     def update_rates(self) -> None:
         """
@@ -135,16 +325,173 @@ class Rates(rates.Rates):
             1.10186, 1.10221, 1.10172, 1.1013 , 1.10069, 1.10097, 1.10104,
             1.10081, 1.1003 , 1.10036, 1.10147, 1.10068, 1.10072])
 
-            You can ask for this information: time, open, high, low, close, tick_volume.
+            You can ask for this information: time, open, high, low, close, tick_volume, spread, real_volume.
+
+        """
+
+        self._log.logger.debug("Rates updated")
+        self._frame = None
+        if isinstance(self._timeframe, Period):
+            updated = self._update_rates_resampled()
+
+        elif self._history is not None:
+            updated = self._update_rates_history()
+
+        elif self._incremental:
+            updated = self._update_rates_incremental()
+
+        else:
+            updated = self._update_rates_window()
+
+        # The values assigned are kept when the fetch failed, like the rates.
+        if updated:
+            self._assigned = {}
+
+        if self._indicators is not None:
+            self._indicators.update(self._rates)
+
+    async def update_rates_async(self) -> None:
+        """
+        This function is the asyncio version of update_rates(), it runs in the terminal thread, see
+        metatrader5EasyT.worker, and identical calls in flight at the same time are executed once.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> from metatrader5EasyT.rates import Rates
+            >>> timeframe = TimeFrame()
+            >>> eurusd_rates = Rates(symbol='EURUSD', timeframe=timeframe.ONE_MINUTE, count=20)
+            >>> await eurusd_rates.update_rates_async()
+            >>> len(eurusd_rates.close)
+            20
 
         """
+        await get_worker().run(self.update_rates, key=(self, "update_rates"))
 
-        self._log.logger.info("Rates updated")
+    def _update_rates_window(self) -> bool:
+        """
+        It fetches the last count bars, when Metatrader5 does not return them the previous ones are kept.
+        """
         result = Mt5.copy_rates_from_pos(self._symbol, self._timeframe, 0, self._count)
+        if result is None:
+            self._log.logger.error("It was not possible to retrieve rates for %s: %s", self._symbol, Mt5.last_error())
+            return False
+
+        self._rates = result
+        return True
+
+    def _fetch_since(self, last_time: int, limit: int or None) -> np.ndarray or None:
+        """
+        It fetches the bars from last_time, included because it can be the one still forming, up to the most recent.
+
+        The amount of requested bars starts at two and doubles until the first returned bar is already stored, until
+        the platform has no more bars, or until the limit is reached, in this case the bars after last_time are not
+        all returned.
+        """
+        fetch = 2 if limit is None else min(2, limit)
+        while True:
+            result = Mt5.copy_rates_from_pos(self._symbol, self._timeframe, 0, fetch)
+            if result is None:
+                self._log.logger.error(
+                    "It was not possible to retrieve rates for %s: %s", self._symbol, Mt5.last_error()
+                )
+                return None
+
+            if len(result) < fetch or result["time"][0] <= last_time or (limit is not None and fetch >= limit):
+                return result[result["time"] >= last_time]
+
+            fetch = 2 * fetch if limit is None else min(2 * fetch, limit)
+
+    def _update_rates_incremental(self) -> bool:
+        """
+        It fetches only the bars that are not stored yet and writes them in place in the buffer. When more than count
+        bars are missing, the whole window is replaced.
+        """
+        if self._buffer is None or len(self._buffer) == 0:
+            result = Mt5.copy_rates_from_pos(self._symbol, self._timeframe, 0, self._count)
+            if result is None:
+                self._log.logger.error(
+                    "It was not possible to retrieve rates for %s: %s", self._symbol, Mt5.last_error()
+                )
+                return False
+
+            self._buffer = RingBuffer(self._count, result.dtype)
+
+        else:
+            result = self._fetch_since(self._buffer.view()["time"][-1], self._count)
+            if result is None:
+                return False
+
+            if len(result) > 0:
+                stored_time = self._buffer.view()["time"]
+                self._buffer.truncate(len(stored_time) - stored_time.searchsorted(result["time"][0]))
+
+        self._buffer.extend(result)
+        self._rates = self._buffer.view()
+        return True
+
+    def _update_rates_resampled(self) -> bool:
+        """
+        Metatrader5 does not have the timeframe, like TimeFrame.THREE_DAY, the bars are built from the largest timeframe
+        of Metatrader5 that divides it.
+        """
+        base, ratio = self._base_timeframe()
+        result = Mt5.copy_rates_from_pos(self._symbol, base, 0, (self._count + 1) * ratio)
+        if result is None:
+            self._log.logger.error("It was not possible to retrieve rates for %s: %s", self._symbol, Mt5.last_error())
+            return False
+
+        self._rates = resample(result, self._timeframe)[-self._count :]
+        return True
+
+    def _base_timeframe(self) -> tuple:
+        for base in (
+            Mt5.TIMEFRAME_D1,
+            Mt5.TIMEFRAME_H12,
+            Mt5.TIMEFRAME_H8,
+            Mt5.TIMEFRAME_H6,
+            Mt5.TIMEFRAME_H4,
+            Mt5.TIMEFRAME_H3,
+            Mt5.TIMEFRAME_H2,
+            Mt5.TIMEFRAME_H1,
+            Mt5.TIMEFRAME_M30,
+            Mt5.TIMEFRAME_M20,
+            Mt5.TIMEFRAME_M15,
+            Mt5.TIMEFRAME_M12,
+            Mt5.TIMEFRAME_M10,
+            Mt5.TIMEFRAME_M6,
+            Mt5.TIMEFRAME_M5,
+            Mt5.TIMEFRAME_M4,
+            Mt5.TIMEFRAME_M3,
+            Mt5.TIMEFRAME_M2,
+            Mt5.TIMEFRAME_M1,
+        ):
+            seconds = timeframe_seconds(base)
+            if self._timeframe.seconds % seconds == 0 and self._timeframe.origin % seconds == 0:
+                return base, self._timeframe.seconds // seconds
+
+        raise ValueError(
+            f"{self._timeframe} is not a multiple of a Metatrader5 timeframe, build it from ticks with resample_ticks()."
+        )
+
+    def _update_rates_history(self) -> bool:
+        """
+        It fetches only the bars after the last one stored on disk, all of them, so the history has no gaps, and
+        exposes the last count bars of the memory-mapped history.
+        """
+        stored = self._history.load(self._symbol, self._timeframe)
+        if len(stored) == 0:
+            result = Mt5.copy_rates_from_pos(self._symbol, self._timeframe, 0, self._count)
+            if result is None:
+                self._log.logger.error(
+                    "It was not possible to retrieve rates for %s: %s", self._symbol, Mt5.last_error()
+                )
+                return False
+
+        else:
+            result = self._fetch_since(stored["time"][-1], None)
+            if result is None:
+                return False
 
-        self.time = result["time"]
-        self.open = result["open"]
-        self.high = result["high"]
-        self.low = result["low"]
-        self.close = result["close"]
-        self.tick_volume = result["tick_volume"]
+        self._rates = self._history.append(self._symbol, self._timeframe, result)[-self._count :]
+        return True
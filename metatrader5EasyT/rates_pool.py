@@ -0,0 +1,187 @@
+import copy
+import threading
+from types import MappingProxyType
+from typing import Iterable
+from typing import Mapping
+from typing import Tuple
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.timeframe import TimeFrame
+from metatrader5EasyT.worker import TerminalWorker
+from metatrader5EasyT.worker import get_worker
+
+
+class RatesPool:
+    """
+    This class refreshes the rates of many symbols and timeframes at once.
+
+    Subscriptions with the same symbol and timeframe share a single fetch, the biggest count is requested and each
+    subscription receives its last `count` bars. The fetches are sent to the terminal worker, see
+    metatrader5EasyT.worker, because the MetaTrader5 package is not thread-safe, and, when all of them are finished, a
+    new snapshot is published at once, so a scan cycle always sees the rates of the same refresh. Called from the
+    terminal thread, the fetches run one by one in the call.
+    """
+
+    def __init__(self, subscriptions: Iterable[Tuple[str, TimeFrame, int]] = (), worker: TerminalWorker = None):
+        """
+        Args:
+            subscriptions:
+                It is an iterable of (symbol, timeframe, count), each item works like the arguments of the Rates class.
+
+            worker:
+                It is the TerminalWorker that runs the fetches one by one, when it is None it is the one of
+                get_worker().
+        """
+
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in RatesPool")
+
+        self._worker = worker if worker is not None else get_worker()
+        self._lock = threading.Lock()
+
+        self._subscriptions = set()
+        self._rates = {}
+        self._snapshot = MappingProxyType({})
+
+        for symbol, timeframe, count in subscriptions:
+            self.subscribe(symbol, timeframe, count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """
+        It removes all the subscriptions, the last snapshot is still available. The terminal worker is shared, it is
+        not stopped.
+        """
+        with self._lock:
+            self._subscriptions.clear()
+            self._rates.clear()
+
+    def subscribe(self, symbol: str, timeframe: TimeFrame, count: int) -> Tuple[str, TimeFrame, int]:
+        """
+        This function adds a subscription, it will be available in the snapshot after the next update.
+
+        Args:
+            symbol:
+                The symbol you want to retrieve previous data.
+
+            timeframe:
+                The timeframe you want information, you can find all of them in the TimeFrame Class.
+
+            count:
+                It is the amount of candlesticks in the past you want.
+
+        Returns:
+            It returns the key of the subscription in the snapshot.
+        """
+        key = (symbol.upper(), timeframe, count)
+        with self._lock:
+            self._subscriptions.add(key)
+            self._resize(key[0], timeframe)
+
+        return key
+
+    def unsubscribe(self, symbol: str, timeframe: TimeFrame, count: int) -> None:
+        """
+        This function removes a subscription, it is removed from the snapshot after the next update.
+
+        Args:
+            symbol:
+                The symbol of the subscription.
+
+            timeframe:
+                The timeframe of the subscription.
+
+            count:
+                The count of the subscription.
+        """
+        with self._lock:
+            self._subscriptions.discard((symbol.upper(), timeframe, count))
+            self._resize(symbol.upper(), timeframe)
+
+    def _resize(self, symbol: str, timeframe: TimeFrame) -> None:
+        """
+        It keeps one Rates per symbol and timeframe asking for the biggest count among its subscriptions.
+        """
+        counts = [key[2] for key in self._subscriptions if key[:2] == (symbol, timeframe)]
+        if not counts:
+            self._rates.pop((symbol, timeframe), None)
+
+        elif (symbol, timeframe) not in self._rates:
+            # The pool must not be incremental, each update needs new arrays to keep old snapshots untouched.
+            self._rates[(symbol, timeframe)] = Rates(symbol=symbol, timeframe=timeframe, count=max(counts))
+
+        else:
+            self._rates[(symbol, timeframe)].change_count(max(counts))
+
+    def snapshot(self) -> Mapping[Tuple[str, TimeFrame, int], Rates]:
+        """
+        Returns:
+            It returns a read-only mapping from (symbol, timeframe, count) to the Rates of the last update. The
+            mapping is never changed, every update publishes a new one.
+        """
+        return self._snapshot
+
+    def update_rates(self) -> Mapping[Tuple[str, TimeFrame, int], Rates]:
+        """
+        Everytime this function is called it refreshes all the subscriptions and publishes a new snapshot.
+
+        When a fetch fails, the error is logged and the subscription keeps the rates of the previous snapshot.
+
+        Returns:
+            It returns the new snapshot.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.initialization import Initialize
+            >>> from metatrader5EasyT.timeframe import TimeFrame
+            >>> from metatrader5EasyT.rates_pool import RatesPool
+            >>> initialize = Initialize()
+            >>> initialize.initialize_platform()
+            >>> initialize.initialize_symbol('EURUSD', 'GBPUSD')
+            >>> timeframe = TimeFrame()
+            >>> pool = RatesPool([('EURUSD', timeframe.ONE_MINUTE, 20), ('GBPUSD', timeframe.ONE_MINUTE, 5)])
+            >>> snapshot = pool.update_rates()
+            >>> len(snapshot[('GBPUSD', timeframe.ONE_MINUTE, 5)].close)
+            5
+
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            rates = dict(self._rates)
+
+        futures = {key: self._worker.submit(None, value.update_rates) for key, value in rates.items()}
+
+        previous = self._snapshot
+        snapshot = {}
+        for symbol, timeframe, count in subscriptions:
+            key = (symbol, timeframe, count)
+            try:
+                futures[(symbol, timeframe)].result()
+                snapshot[key] = self._tail(rates[(symbol, timeframe)], count)
+
+            except Exception as error:
+                self._log.logger.error("It was not possible to update %s rates: %r", symbol, error)
+                if key in previous:
+                    snapshot[key] = previous[key]
+
+        self._snapshot = MappingProxyType(snapshot)
+        self._log.logger.debug("RatesPool updated")
+        return self._snapshot
+
+    @staticmethod
+    def _tail(rates: Rates, count: int) -> Rates:
+        """
+        It returns a copy of the Rates holding zero-copy views of its last `count` candlesticks.
+        """
+        tail = copy.copy(rates)
+        tail._count = count
+        tail._rates = rates.rates[-count:]
+        tail._frame = None
+
+        return tail
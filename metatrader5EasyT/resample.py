@@ -0,0 +1,212 @@
+"""
+Vectorized resampling of candlesticks and ticks to any timeframe, so one fetch of M1 bars or ticks feeds all the
+timeframes of a symbol, including the ones that Metatrader5 does not have, like three days or 90 seconds.
+
+This module does not import MetaTrader5, the timeframes are the Metatrader5 constants, decoded from their value, or a
+Period for custom timeframes:
+
+    >>> from metatrader5EasyT.resample import Period, resample, resample_ticks
+    >>> from metatrader5EasyT.timeframe import TimeFrame
+    >>> one_hour = resample(eurusd_m1.rates, TimeFrame().ONE_HOUR)
+    >>> three_days = resample(eurusd_d1.rates, TimeFrame().THREE_DAY)
+    >>> ninety_seconds = resample_ticks(eurusd_tick.ticks, Period(90))
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+# The layout of the structured array returned by Metatrader5 copy_rates_* functions.
+RATES_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("tick_volume", "<u8"),
+        ("spread", "<i4"),
+        ("real_volume", "<u8"),
+    ]
+)
+
+_DAY = 86400
+# The weeks of Metatrader5 start on Sunday, the epoch was a Thursday.
+_SUNDAY = 3 * _DAY
+
+
+class Period(NamedTuple):
+    """
+    A custom timeframe with a fixed duration in seconds, like Period(3 * 86400) or Period(90), the bars start at origin
+    plus a multiple of seconds, see bar_starts().
+    """
+
+    seconds: int
+    origin: int = 0
+
+    def __str__(self) -> str:
+        for unit, suffix in ((_DAY, "D"), (3600, "H"), (60, "min")):
+            if self.seconds % unit == 0:
+                return f"{self.seconds // unit}{suffix}"
+
+        return f"{self.seconds}s"
+
+
+def timeframe_seconds(timeframe) -> int or None:
+    """
+    Args:
+        timeframe:
+            It is a Metatrader5 timeframe constant or a Period.
+
+    Returns:
+        It returns the duration of the timeframe in seconds, or None for months, which do not have a fixed duration.
+    """
+    if isinstance(timeframe, Period):
+        return timeframe.seconds
+
+    kind, amount = timeframe >> 14, timeframe & 0x3FFF
+    if kind == 3:
+        return None
+
+    return amount * (60, 3600, 7 * _DAY)[kind]
+
+
+def bar_starts(times: np.ndarray, timeframe, origin: int = None) -> np.ndarray:
+    """
+    This function calculates the start of the bar of every time.
+
+    Args:
+        times:
+            It is an array with the times in seconds since epoch.
+
+        timeframe:
+            It is a Metatrader5 timeframe constant or a Period.
+
+        origin:
+            It is the time in seconds where the bars are aligned. The bars start at origin plus a multiple of the
+            timeframe, so origin=17 * 3600 aligns daily bars with a session that starts at 17:00. Weeks are aligned on
+            Sunday plus origin and months on the first day plus origin. When it is None, it is the origin of the
+            Period, or 0 for the Metatrader5 timeframes.
+
+    Returns:
+        It returns an array with the start of the bar of every time.
+    """
+    if origin is None:
+        origin = timeframe.origin if isinstance(timeframe, Period) else 0
+
+    times = np.asarray(times, dtype=np.int64) - origin
+    seconds = timeframe_seconds(timeframe)
+    if seconds is None:
+        months = times.astype("datetime64[s]").astype("datetime64[M]")
+        return months.astype("datetime64[s]").astype(np.int64) + origin
+
+    if not isinstance(timeframe, Period) and timeframe >> 14 == 2:
+        return (times - _SUNDAY) // seconds * seconds + _SUNDAY + origin
+
+    return times // seconds * seconds + origin
+
+
+def _bounds(starts: np.ndarray):
+    first = np.concatenate(([0], np.flatnonzero(starts[1:] != starts[:-1]) + 1))
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+    return first, last
+
+
+def resample(rates: np.ndarray, timeframe, origin: int = None) -> np.ndarray:
+    """
+    This function groups candlesticks in candlesticks of a larger timeframe, a bar belongs to the larger bar where it
+    starts, so the timeframe should be a multiple of the timeframe of the rates.
+
+    Args:
+        rates:
+            It is the structured array returned by Metatrader5 copy_rates_* functions, sorted by time.
+
+        timeframe:
+            It is a Metatrader5 timeframe constant or a Period.
+
+        origin:
+            It is the alignment of the bars, see bar_starts().
+
+    Returns:
+        It returns a structured array with the dtype of rates, the last bar can be still forming.
+
+    Examples:
+        >>> # All the code you need to execute the function:
+        >>> from metatrader5EasyT.rates import Rates
+        >>> from metatrader5EasyT.resample import resample
+        >>> from metatrader5EasyT.timeframe import TimeFrame
+        >>> timeframe = TimeFrame()
+        >>> eurusd_rates = Rates(symbol='EURUSD', timeframe=timeframe.ONE_MINUTE, count=600)
+        >>> eurusd_rates.update_rates()
+        >>> resample(eurusd_rates.rates, timeframe.ONE_HOUR)["close"]
+        array([1.10324, 1.10342, 1.10329, 1.10338, 1.10294, 1.10238, 1.10188,
+               1.10186, 1.10221, 1.10172, 1.1013 ])
+
+    """
+    if len(rates) == 0:
+        return rates[:0].copy()
+
+    starts = bar_starts(rates["time"], timeframe, origin)
+    first, last = _bounds(starts)
+
+    bars = np.zeros(len(first), dtype=rates.dtype)
+    bars["time"] = starts[first]
+    bars["open"] = rates["open"][first]
+    bars["high"] = np.maximum.reduceat(rates["high"], first)
+    bars["low"] = np.minimum.reduceat(rates["low"], first)
+    bars["close"] = rates["close"][last]
+    for name in ("tick_volume", "real_volume"):
+        if name in rates.dtype.names:
+            bars[name] = np.add.reduceat(rates[name], first)
+
+    if "spread" in rates.dtype.names:
+        bars["spread"] = np.minimum.reduceat(rates["spread"], first)
+
+    return bars
+
+
+def resample_ticks(
+    ticks: np.ndarray, timeframe, origin: int = None, price: str = "bid", point: float = None
+) -> np.ndarray:
+    """
+    This function builds candlesticks from ticks, the timeframe can be shorter than one minute.
+
+    Args:
+        ticks:
+            It is the structured array returned by Metatrader5 copy_ticks_* functions, or Tick.ticks, sorted by time.
+
+        timeframe:
+            It is a Metatrader5 timeframe constant or a Period.
+
+        origin:
+            It is the alignment of the bars, see bar_starts().
+
+        price:
+            It is the field of the ticks used as price, Metatrader5 builds the bars of the Forex symbols from the bid.
+
+        point:
+            It is the point of the symbol, when it is given the spread of the bars is the minimum ask - bid in points.
+
+    Returns:
+        It returns a structured array with RATES_DTYPE, the tick_volume is the amount of ticks and the real_volume the
+        sum of their volume.
+    """
+    if len(ticks) == 0:
+        return np.zeros(0, dtype=RATES_DTYPE)
+
+    starts = bar_starts(ticks["time_msc"] // 1000, timeframe, origin)
+    first, last = _bounds(starts)
+    prices = ticks[price]
+
+    bars = np.zeros(len(first), dtype=RATES_DTYPE)
+    bars["time"] = starts[first]
+    bars["open"] = prices[first]
+    bars["high"] = np.maximum.reduceat(prices, first)
+    bars["low"] = np.minimum.reduceat(prices, first)
+    bars["close"] = prices[last]
+    bars["tick_volume"] = last - first + 1
+    bars["real_volume"] = np.add.reduceat(ticks["volume"], first)
+    if point is not None:
+        bars["spread"] = np.round(np.minimum.reduceat(ticks["ask"] - ticks["bid"], first) / point)
+
+    return bars
@@ -0,0 +1,270 @@
+import heapq
+import itertools
+import time
+from typing import Callable
+from typing import Dict
+from typing import NamedTuple
+
+import numpy as np
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.tick import Tick
+
+
+class SymbolStats(NamedTuple):
+    """
+    The activity of a symbol observed by the PollScheduler, see PollScheduler.report().
+    """
+
+    # The time in seconds between two polls of the symbol.
+    interval: float
+    # The smoothed amount of ticks per second.
+    tick_rate: float
+    # The smoothed fraction of the polls that returned new ticks.
+    change_rate: float
+    polls: int
+    # The time in seconds since the previous poll when new ticks were found, the oldest of them waited up to it.
+    staleness_mean: float
+    staleness_max: float
+
+
+class _SymbolState:
+    def __init__(self, symbol: str, interval: float, now: float):
+        self.tick = Tick(symbol)
+        self.interval = interval
+        self.next_due = now
+        self.last_poll = None
+        self.tick_rate = None
+        self.change_rate = 0.0
+        self.polls = 0
+        self.staleness_mean = 0.0
+        self.staleness_max = 0.0
+
+
+class PollScheduler:
+    """
+    This class polls the ticks of many symbols with an interval adapted to the activity of each one, the symbols that
+    move are polled often and the quiet ones back off, and all the polls share a maximum amount of calls per second to
+    Metatrader5.
+
+    The interval of a symbol is the inverse of its smoothed tick rate, so a poll finds about one new tick, limited to
+    min_interval and max_interval. Every poll without ticks doubles the interval. The symbols that are due are polled
+    by priority, their change rate, the fraction of their polls that found new ticks, plus the time they are overdue
+    in units of max_interval, so when the budget is short it goes to the symbols that move and the quiet ones still
+    wait at most about max_interval more.
+
+    A poll costs the calls it made to Metatrader5, see Tick.terminal_calls, the first poll of a symbol and a burst of
+    ticks larger than the fetch size take more than one call.
+    """
+
+    def __init__(
+        self,
+        max_calls_per_second: float = 50.0,
+        min_interval: float = 0.05,
+        max_interval: float = 5.0,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_calls_per_second:
+                It is the maximum amount of calls per second to Metatrader5 of all the symbols together. Up to one
+                second of unused calls can be spent at once, and a poll started with the last call of the budget can
+                borrow the calls it needs from the next second.
+
+            min_interval:
+                It is the shortest time in seconds between two polls of a symbol, it is also the first interval.
+
+            max_interval:
+                It is the longest time in seconds between two polls of a symbol.
+
+            smoothing:
+                It is the weight of the last poll in the exponentially weighted averages of the tick and change rates.
+
+            clock:
+                It is the function that returns the time in seconds, like the simulated time in the tests.
+        """
+        if max_calls_per_second <= 0:
+            raise ValueError("max_calls_per_second must be positive.")
+
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be positive and not greater than max_interval.")
+
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in PollScheduler")
+
+        self._max_calls_per_second = max_calls_per_second
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._smoothing = smoothing
+        self._clock = clock
+
+        self._symbols = {}
+        self._queue = []
+        self._order = itertools.count()
+        self._tokens = max_calls_per_second
+        self._refilled = clock()
+
+    def add(self, symbol: str) -> Tick:
+        """
+        This function adds the symbol to the scheduler, it is polled in the next call of poll().
+
+        Returns:
+            It returns the Tick of the symbol, updated by the scheduler.
+        """
+        symbol = symbol.upper()
+        if symbol not in self._symbols:
+            state = _SymbolState(symbol, self._min_interval, self._clock())
+            self._symbols[symbol] = state
+            self._push(symbol, state)
+
+        return self._symbols[symbol].tick
+
+    def remove(self, symbol: str) -> None:
+        """
+        This function stops polling the symbol.
+        """
+        self._symbols.pop(symbol.upper(), None)
+
+    def tick(self, symbol: str) -> Tick:
+        """
+        Returns:
+            It returns the Tick of the symbol, with the ticks received by the scheduler.
+        """
+        return self._symbols[symbol.upper()].tick
+
+    def _push(self, symbol: str, state: _SymbolState) -> None:
+        heapq.heappush(self._queue, (state.next_due, next(self._order), symbol))
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self._max_calls_per_second, self._tokens + (now - self._refilled) * self._max_calls_per_second
+        )
+        self._refilled = now
+
+    def poll(self) -> Dict[str, np.ndarray]:
+        """
+        This function polls the symbols that are due, while the budget of calls allows it.
+
+        Returns:
+            It returns a dict from the symbol to its new ticks, only the symbols with new ticks are in it.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.scheduler import PollScheduler
+            >>> scheduler = PollScheduler(max_calls_per_second=20)
+            >>> for symbol in ('EURUSD', 'GBPUSD', 'USDTRY'):
+            ...     scheduler.add(symbol)
+            >>> new_ticks = scheduler.poll()
+            >>> list(new_ticks)
+            ['EURUSD', 'GBPUSD', 'USDTRY']
+            >>> # Some minutes later, EURUSD is polled more often than USDTRY:
+            >>> scheduler.report()['USDTRY'].interval
+            5.0
+
+        """
+        now = self._clock()
+        self._refill(now)
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            entry = heapq.heappop(self._queue)
+            state = self._symbols.get(entry[2])
+            # The entries of the symbols removed or added again are dropped.
+            if state is not None and state.next_due == entry[0]:
+                due.append(entry)
+
+        due.sort(key=lambda entry: self._symbols[entry[2]].change_rate + (now - entry[0]) / self._max_interval)
+        received = {}
+        while due and self._tokens >= 1:
+            _, _, symbol = due.pop()
+            state = self._symbols[symbol]
+            calls = state.tick.terminal_calls
+            new_ticks = state.tick.update_ticks()
+            self._tokens -= state.tick.terminal_calls - calls
+            self._observe(state, len(new_ticks), now)
+            self._push(symbol, state)
+            if len(new_ticks) > 0:
+                received[symbol] = new_ticks
+
+        # The budget is exhausted, they keep their due time.
+        for entry in due:
+            heapq.heappush(self._queue, entry)
+
+        return received
+
+    def _observe(self, state: _SymbolState, amount: int, now: float) -> None:
+        """
+        It updates the statistics of the symbol with the result of a poll and schedules the next one.
+        """
+        state.polls += 1
+        if state.last_poll is not None:
+            elapsed = max(now - state.last_poll, 1e-9)
+            changed = 1.0 if amount > 0 else 0.0
+            if state.tick_rate is None:
+                state.tick_rate = amount / elapsed
+                state.change_rate = changed
+
+            else:
+                state.tick_rate += self._smoothing * (amount / elapsed - state.tick_rate)
+                state.change_rate += self._smoothing * (changed - state.change_rate)
+
+            if amount > 0:
+                state.staleness_mean += self._smoothing * (elapsed - state.staleness_mean)
+                state.staleness_max = max(state.staleness_max, elapsed)
+
+            # The quiet symbols back off exponentially, the active ones are polled at their tick rate.
+            interval = 1.0 / state.tick_rate if amount > 0 else 2 * state.interval
+            state.interval = min(max(interval, self._min_interval), self._max_interval)
+
+        state.last_poll = now
+        state.next_due = now + state.interval
+
+    def next_due(self) -> float:
+        """
+        Returns:
+            It returns the time in seconds until the next poll is due, it is 0 when a symbol is already due.
+        """
+        if not self._queue:
+            return self._max_interval
+
+        now = self._clock()
+        wait = self._queue[0][0] - now
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self._max_calls_per_second)
+
+        return max(wait, 0.0)
+
+    def run(self, callback: Callable[[Dict[str, np.ndarray]], None], stop: Callable[[], bool]) -> None:
+        """
+        This function polls until stop() returns True, it sleeps until the next poll is due.
+
+        Args:
+            callback:
+                It is called with the result of poll() when there are new ticks.
+
+            stop:
+                It is called after every poll, the loop ends when it returns True.
+        """
+        while not stop():
+            received = self.poll()
+            if received:
+                callback(received)
+
+            time.sleep(self.next_due())
+
+    def report(self) -> Dict[str, SymbolStats]:
+        """
+        Returns:
+            It returns a dict from the symbol to its SymbolStats.
+        """
+        return {
+            symbol: SymbolStats(
+                interval=state.interval,
+                tick_rate=state.tick_rate or 0.0,
+                change_rate=state.change_rate,
+                polls=state.polls,
+                staleness_mean=state.staleness_mean,
+                staleness_max=state.staleness_max,
+            )
+            for symbol, state in self._symbols.items()
+        }
@@ -0,0 +1,736 @@
+"""
+A pure Python and numpy stand-in for the MetaTrader5 package, it runs on any platform and it is deterministic for the
+same seed, so Initialize, Tick, Rates and Trade can be tested and load-tested without a terminal.
+
+This module does not import MetaTrader5, install the simulator before using the other modules:
+
+    >>> from metatrader5EasyT.simulator import Simulator
+    >>> simulator = Simulator(symbols=["EURUSD", "GBPUSD"], tick_rate=1000, latency=0.0002)
+    >>> simulator.install()
+    >>> from metatrader5EasyT.tick import Tick
+    >>> eurusd_tick = Tick("EURUSD")
+    >>> len(eurusd_tick.update_ticks())
+    1
+    >>> # One simulated second later:
+    >>> simulator.advance(1.0)
+    >>> len(eurusd_tick.update_ticks())
+    1010
+    >>> simulator.calls
+    Counter({'copy_ticks_from': 2, 'symbol_info_tick': 1})
+"""
+
+import calendar
+import fnmatch
+import importlib
+import sys
+import threading
+import time
+from collections import Counter
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from metatrader5EasyT.buffer import RingBuffer
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.resample import resample
+from metatrader5EasyT.resample import resample_ticks
+
+SymbolInfo = namedtuple(
+    "SymbolInfo",
+    "name path description visible select digits point trade_tick_size trade_tick_value trade_contract_size "
+    "trade_stops_level volume_min volume_max volume_step filling_mode spread bid ask",
+)
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+TerminalInfo = namedtuple("TerminalInfo", "connected trade_allowed name company path")
+TradePosition = namedtuple(
+    "TradePosition",
+    "ticket time time_msc time_update time_update_msc type magic identifier reason volume price_open sl tp "
+    "price_current swap profit symbol comment external_id",
+)
+OrderSendResult = namedtuple("OrderSendResult", "retcode deal order volume price bid ask comment request_id request")
+
+TICKS_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+        ("last", "<f8"),
+        ("volume", "<u8"),
+        ("time_msc", "<i8"),
+        ("flags", "<u4"),
+        ("volume_real", "<f8"),
+    ]
+)
+
+
+class SymbolSpec:
+    """
+    The specification of a simulated symbol.
+    """
+
+    def __init__(
+        self,
+        digits: int = 5,
+        price: float = 1.1,
+        volatility: float = 0.0002,
+        spread: int = 10,
+        contract_size: float = 100000.0,
+        tick_rate: float = None,
+    ):
+        """
+        Args:
+            digits:
+                It is the amount of digits of the price, the tick size is 10 ** -digits.
+
+            price:
+                It is the price of the symbol at the start of the simulation.
+
+            volatility:
+                It is the standard deviation of the price change in one minute.
+
+            spread:
+                It is the spread in points.
+
+            contract_size:
+                It is the contract size used to calculate the profit of the positions.
+
+            tick_rate:
+                It is the average amount of ticks per second of this symbol, when it is None the tick_rate of the
+                Simulator is used.
+        """
+        self.digits = digits
+        self.point = 10.0**-digits
+        self.price = price
+        self.volatility = volatility
+        self.spread = spread
+        self.contract_size = contract_size
+        self.tick_rate = tick_rate
+
+
+class Simulator:
+    """
+    This class implements the functions of the MetaTrader5 package used by this project over a simulated market.
+
+    The market has a random walk history of one minute bars before the start time and, every time the clock advances,
+    new ticks are generated at tick_rate per second and per symbol, they update the one minute bars, the positions
+    profit and trigger stop loss and take profit. Bars of every timeframe are built from the one minute bars.
+
+    Every call is counted in self.calls and sleeps the latency, to simulate the IPC with the terminal.
+    """
+
+    TIMEFRAME_M1 = 1
+    TIMEFRAME_M2 = 2
+    TIMEFRAME_M3 = 3
+    TIMEFRAME_M4 = 4
+    TIMEFRAME_M5 = 5
+    TIMEFRAME_M6 = 6
+    TIMEFRAME_M10 = 10
+    TIMEFRAME_M12 = 12
+    TIMEFRAME_M15 = 15
+    TIMEFRAME_M20 = 20
+    TIMEFRAME_M30 = 30
+    TIMEFRAME_H1 = 16385
+    TIMEFRAME_H2 = 16386
+    TIMEFRAME_H3 = 16387
+    TIMEFRAME_H4 = 16388
+    TIMEFRAME_H6 = 16390
+    TIMEFRAME_H8 = 16392
+    TIMEFRAME_H12 = 16396
+    TIMEFRAME_D1 = 16408
+    TIMEFRAME_W1 = 32769
+    TIMEFRAME_MN1 = 49153
+
+    COPY_TICKS_ALL = -1
+    COPY_TICKS_INFO = 1
+    COPY_TICKS_TRADE = 2
+
+    TICK_FLAG_BID = 2
+    TICK_FLAG_ASK = 4
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+
+    TRADE_ACTION_DEAL = 1
+    TRADE_ACTION_SLTP = 6
+
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    ORDER_FILLING_RETURN = 2
+
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_MARKET_CLOSED = 10018
+    TRADE_RETCODE_TRADE_DISABLED = 10017
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+
+    RES_S_OK = 1
+    RES_E_INVALID_PARAMS = -2
+    RES_E_NOT_FOUND = -4
+
+    def __init__(
+        self,
+        symbols=("EURUSD",),
+        tick_rate: float = 10.0,
+        latency: float = 0.0,
+        seed: int = 0,
+        start_time: int = 1640995200,
+        history_minutes: int = 100000,
+        tick_capacity: int = 1000000,
+        trade_allowed: bool = True,
+    ):
+        """
+        Args:
+            symbols:
+                It is a list of symbol names, or a dict from the symbol name to its SymbolSpec.
+
+            tick_rate:
+                It is the average amount of ticks per second generated for each symbol when the clock advances.
+
+            latency:
+                It is the time in seconds slept by every call, like the IPC with the terminal.
+
+            seed:
+                It is the seed of the random generator, the same seed generates the same market.
+
+            start_time:
+                It is the time, in seconds since epoch, when the simulation starts, the history ends at this time.
+
+            history_minutes:
+                It is the amount of one minute bars kept, including the ones before the start time.
+
+            tick_capacity:
+                It is the amount of ticks kept per symbol.
+
+            trade_allowed:
+                It is the value of terminal_info().trade_allowed, when it is False order_send is rejected.
+        """
+        if not isinstance(symbols, dict):
+            symbols = {symbol: SymbolSpec() for symbol in symbols}
+
+        self.specs = {symbol.upper(): spec for symbol, spec in symbols.items()}
+        self.tick_rate = tick_rate
+        self.latency = latency
+        self.trade_allowed = trade_allowed
+        self.calls = Counter()
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._time_msc = start_time * 1000
+        self._last_error = (self.RES_S_OK, "Success")
+        self._selected = set()
+        self._positions = {}
+        self._ticket = 0
+        self._previous_modules = None
+        self._previous_attributes = {}
+
+        self._minutes = {}
+        self._ticks = {}
+        for symbol, spec in self.specs.items():
+            self._minutes[symbol] = RingBuffer(history_minutes, RATES_DTYPE)
+            self._minutes[symbol].extend(self._history(spec, start_time, history_minutes))
+            self._ticks[symbol] = RingBuffer(tick_capacity, TICKS_DTYPE)
+            self._ticks[symbol].extend(self._first_tick(spec, self._minutes[symbol].view()[-1]))
+
+        self.deals = []
+
+    # ------------------------------ Simulation ------------------------------ #
+
+    @property
+    def time_msc(self) -> int:
+        """
+        It is the current time of the simulation in milliseconds since epoch.
+        """
+        return self._time_msc
+
+    def install(self) -> "Simulator":
+        """
+        This function registers the simulator as the MetaTrader5 package, the modules of this project imported before
+        or after it use the simulator until uninstall() is called.
+
+        Returns:
+            It returns the simulator itself.
+        """
+        self._previous_modules = sys.modules.get("MetaTrader5")
+        self._previous_attributes = {}
+        sys.modules["MetaTrader5"] = self
+        for name, module in list(sys.modules.items()):
+            if name.startswith("metatrader5EasyT.") and hasattr(module, "Mt5"):
+                self._previous_attributes[name] = module.Mt5
+                module.Mt5 = self
+
+        return self
+
+    def uninstall(self) -> None:
+        """
+        This function restores the MetaTrader5 package that was registered before install(), and the MetaTrader5 of
+        the modules of this project. The modules imported with the simulator get the package, or lose their reference
+        to the simulator when the package is not installed, like on Linux.
+        """
+        previous = self._previous_modules
+        if previous is None:
+            sys.modules.pop("MetaTrader5", None)
+            try:
+                previous = importlib.import_module("MetaTrader5")
+
+            except ImportError:
+                previous = None
+
+        else:
+            sys.modules["MetaTrader5"] = previous
+
+        for name, module in list(sys.modules.items()):
+            if name.startswith("metatrader5EasyT.") and getattr(module, "Mt5", None) is self:
+                if name in self._previous_attributes:
+                    module.Mt5 = self._previous_attributes[name]
+
+                elif previous is not None:
+                    module.Mt5 = previous
+
+                else:
+                    # Using the module raises a NameError, instead of an AttributeError of None.
+                    del module.Mt5
+
+    def advance(self, seconds: float) -> None:
+        """
+        This function moves the clock of the simulation, generating the ticks of every symbol in the period, updating
+        the bars and triggering the stop loss and take profit of the positions.
+
+        Args:
+            seconds:
+                It is the amount of seconds to move the clock.
+        """
+        with self._lock:
+            start = self._time_msc
+            end = start + int(round(seconds * 1000))
+            for symbol, spec in self.specs.items():
+                tick_rate = self.tick_rate if spec.tick_rate is None else spec.tick_rate
+                amount = self._rng.poisson(tick_rate * (end - start) / 1000)
+                if amount > 0:
+                    ticks = self._generate_ticks(spec, self._ticks[symbol].view()[-1], start, end, amount)
+                    self._ticks[symbol].extend(ticks)
+                    self._update_minutes(symbol, ticks)
+                    self._trigger_stops(symbol, ticks)
+
+            self._time_msc = end
+
+    def _history(self, spec: SymbolSpec, start_time: int, minutes: int) -> np.ndarray:
+        # The random walk ends at the price of the specification.
+        walk = np.cumsum(self._rng.normal(0.0, spec.volatility, minutes))
+        close = np.round(np.maximum(spec.price + walk - walk[-1], spec.point), spec.digits)
+        open_ = np.round(np.concatenate(([close[0]], close[:-1])), spec.digits)
+        wick = np.abs(self._rng.normal(0.0, spec.volatility / 2, (2, minutes)))
+
+        history = np.zeros(minutes, dtype=RATES_DTYPE)
+        history["time"] = (start_time // 60 - minutes + np.arange(minutes)) * 60
+        history["open"] = open_
+        history["close"] = close
+        history["high"] = np.round(np.maximum(open_, close) + wick[0], spec.digits)
+        history["low"] = np.round(np.minimum(open_, close) - wick[1], spec.digits)
+        history["tick_volume"] = self._rng.integers(1, 2 * max(int(self.tick_rate * 60), 1), minutes)
+        history["spread"] = spec.spread
+        return history
+
+    def _first_tick(self, spec: SymbolSpec, bar: np.void) -> np.ndarray:
+        tick = np.zeros(1, dtype=TICKS_DTYPE)
+        tick["time"] = bar["time"] + 59
+        tick["time_msc"] = tick["time"] * 1000
+        tick["bid"] = bar["close"]
+        tick["ask"] = round(bar["close"] + spec.spread * spec.point, spec.digits)
+        tick["flags"] = self.TICK_FLAG_BID | self.TICK_FLAG_ASK
+        return tick
+
+    def _generate_ticks(self, spec: SymbolSpec, last: np.void, start: int, end: int, amount: int) -> np.ndarray:
+        ticks = np.zeros(amount, dtype=TICKS_DTYPE)
+        ticks["time_msc"] = np.sort(self._rng.integers(start + 1, end + 1, amount))
+        ticks["time"] = ticks["time_msc"] // 1000
+
+        step = spec.volatility * np.sqrt(60.0 / max(self.tick_rate * 60, 1))
+        bid = last["bid"] + np.cumsum(self._rng.normal(0.0, step, amount))
+        ticks["bid"] = np.round(np.maximum(bid, spec.point), spec.digits)
+        ticks["ask"] = np.round(ticks["bid"] + spec.spread * spec.point, spec.digits)
+        ticks["flags"] = self.TICK_FLAG_BID | self.TICK_FLAG_ASK
+        return ticks
+
+    def _update_minutes(self, symbol: str, ticks: np.ndarray) -> None:
+        """
+        It merges the new ticks in the one minute bars, the last bar can be still forming.
+        """
+        minutes = self._minutes[symbol]
+        bars = resample_ticks(ticks, self.TIMEFRAME_M1)
+        bars["spread"] = self.specs[symbol].spread
+
+        forming = minutes.view()[-1]
+        if forming["time"] == bars["time"][0]:
+            bars["open"][0] = forming["open"]
+            bars["high"][0] = max(forming["high"], bars["high"][0])
+            bars["low"][0] = min(forming["low"], bars["low"][0])
+            bars["tick_volume"][0] += forming["tick_volume"]
+            minutes.truncate(1)
+
+        minutes.extend(bars)
+
+    def _trigger_stops(self, symbol: str, ticks: np.ndarray) -> None:
+        for ticket, position in list(self._positions.items()):
+            if position["symbol"] != symbol or not (position["sl"] or position["tp"]):
+                continue
+
+            if position["type"] == self.POSITION_TYPE_BUY:
+                price = ticks["bid"]
+                hit = (position["sl"] > 0) & (price <= position["sl"]) | (position["tp"] > 0) & (
+                    price >= position["tp"]
+                )
+
+            else:
+                price = ticks["ask"]
+                hit = (position["sl"] > 0) & (price >= position["sl"]) | (position["tp"] > 0) & (
+                    price <= position["tp"]
+                )
+
+            index = np.flatnonzero(hit)
+            if len(index) > 0:
+                self._close(ticket, position["volume"], float(price[index[0]]), int(ticks["time_msc"][index[0]]))
+
+    def _close(self, ticket: int, volume: float, price: float, time_msc: int) -> None:
+        position = self._positions[ticket]
+        direction = 1 if position["type"] == self.POSITION_TYPE_BUY else -1
+        spec = self.specs[position["symbol"]]
+        profit = round(direction * (price - position["price_open"]) * volume * spec.contract_size, 2)
+        self.deals.append((ticket, position["symbol"], position["type"], volume, price, time_msc, profit))
+
+        position["volume"] = round(position["volume"] - volume, 8)
+        if position["volume"] <= 0:
+            del self._positions[ticket]
+
+    # ------------------------------ Terminal ------------------------------ #
+
+    def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _symbol(self, symbol: str) -> str or None:
+        symbol = str(symbol).upper()
+        if symbol not in self.specs:
+            self._last_error = (self.RES_E_NOT_FOUND, f"Terminal: Not found {symbol}")
+            return None
+
+        self._last_error = (self.RES_S_OK, "Success")
+        return symbol
+
+    @staticmethod
+    def _seconds(value) -> int:
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                return calendar.timegm(value.timetuple())
+
+            return int(value.timestamp())
+
+        return int(value)
+
+    def initialize(self, *args, **kwargs) -> bool:
+        self._call("initialize")
+        return True
+
+    def shutdown(self) -> None:
+        self._call("shutdown")
+
+    def last_error(self) -> tuple:
+        self._call("last_error")
+        return self._last_error
+
+    def version(self) -> tuple:
+        self._call("version")
+        return 500, 3000, "simulator"
+
+    def terminal_info(self) -> TerminalInfo:
+        self._call("terminal_info")
+        return TerminalInfo(True, self.trade_allowed, "Simulator", "metatrader5EasyT", "")
+
+    def symbols_total(self) -> int:
+        self._call("symbols_total")
+        return len(self.specs)
+
+    def symbols_get(self, group: str = None) -> tuple:
+        self._call("symbols_get")
+        with self._lock:
+            return tuple(
+                self._symbol_info(symbol) for symbol in self.specs if group is None or self._in_group(symbol, group)
+            )
+
+    @staticmethod
+    def _in_group(symbol: str, group: str) -> bool:
+        patterns = [pattern.strip().upper() for pattern in group.split(",")]
+        included = any(fnmatch.fnmatchcase(symbol, pattern) for pattern in patterns if not pattern.startswith("!"))
+        excluded = any(fnmatch.fnmatchcase(symbol, pattern[1:]) for pattern in patterns if pattern.startswith("!"))
+        return included and not excluded
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        self._call("symbol_select")
+        symbol = self._symbol(symbol)
+        if symbol is None:
+            return False
+
+        if enable:
+            self._selected.add(symbol)
+
+        else:
+            self._selected.discard(symbol)
+
+        return True
+
+    def symbol_info(self, symbol: str) -> SymbolInfo or None:
+        self._call("symbol_info")
+        symbol = self._symbol(symbol)
+        with self._lock:
+            return None if symbol is None else self._symbol_info(symbol)
+
+    def _symbol_info(self, symbol: str) -> SymbolInfo:
+        spec = self.specs[symbol]
+        tick = self._ticks[symbol].view()[-1]
+        return SymbolInfo(
+            name=symbol,
+            path=f"Simulator\\{symbol}",
+            description=f"Simulated {symbol}",
+            visible=symbol in self._selected,
+            select=symbol in self._selected,
+            digits=spec.digits,
+            point=spec.point,
+            trade_tick_size=spec.point,
+            trade_tick_value=spec.point * spec.contract_size,
+            trade_contract_size=spec.contract_size,
+            trade_stops_level=0,
+            volume_min=0.01,
+            volume_max=100.0,
+            volume_step=0.01,
+            filling_mode=3,
+            spread=spec.spread,
+            bid=float(tick["bid"]),
+            ask=float(tick["ask"]),
+        )
+
+    def symbol_info_tick(self, symbol: str) -> Tick or None:
+        self._call("symbol_info_tick")
+        symbol = self._symbol(symbol)
+        if symbol is None:
+            return None
+
+        with self._lock:
+            return Tick(*self._ticks[symbol].view()[-1].tolist())
+
+    def copy_ticks_from(self, symbol: str, date_from, count: int, flags: int) -> np.ndarray or None:
+        self._call("copy_ticks_from")
+        symbol = self._symbol(symbol)
+        if symbol is None:
+            return None
+
+        with self._lock:
+            ticks = self._ticks[symbol].view()
+            first = ticks["time_msc"].searchsorted(self._seconds(date_from) * 1000)
+            return self._filter_ticks(ticks[first : first + count], flags).copy()
+
+    def copy_ticks_range(self, symbol: str, date_from, date_to, flags: int) -> np.ndarray or None:
+        self._call("copy_ticks_range")
+        symbol = self._symbol(symbol)
+        if symbol is None:
+            return None
+
+        with self._lock:
+            ticks = self._ticks[symbol].view()
+            first = ticks["time_msc"].searchsorted(self._seconds(date_from) * 1000)
+            last = ticks["time_msc"].searchsorted(self._seconds(date_to) * 1000, side="right")
+            return self._filter_ticks(ticks[first:last], flags).copy()
+
+    def _filter_ticks(self, ticks: np.ndarray, flags: int) -> np.ndarray:
+        # The simulated ticks only change bid and ask, there is no trade tick.
+        return ticks[:0] if flags == self.COPY_TICKS_TRADE else ticks
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> np.ndarray or None:
+        self._call("copy_rates_from_pos")
+        rates = self._rates(symbol, timeframe, start_pos + count)
+        if rates is None:
+            return None
+
+        return rates[max(len(rates) - start_pos - count, 0) : max(len(rates) - start_pos, 0)].copy()
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from, count: int) -> np.ndarray or None:
+        self._call("copy_rates_from")
+        rates = self._rates(symbol, timeframe, None)
+        if rates is None:
+            return None
+
+        last = rates["time"].searchsorted(self._seconds(date_from), side="right")
+        return rates[max(last - count, 0) : last].copy()
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from, date_to) -> np.ndarray or None:
+        self._call("copy_rates_range")
+        rates = self._rates(symbol, timeframe, None)
+        if rates is None:
+            return None
+
+        first = rates["time"].searchsorted(self._seconds(date_from))
+        last = rates["time"].searchsorted(self._seconds(date_to), side="right")
+        return rates[first:last].copy()
+
+    def _rates(self, symbol: str, timeframe: int, count: int or None) -> np.ndarray or None:
+        """
+        It builds the bars of the timeframe from the one minute bars, only the last minutes needed for count bars.
+        """
+        symbol = self._symbol(symbol)
+        if symbol is None:
+            return None
+
+        kind, amount = timeframe >> 14, timeframe & 0x3FFF
+        if kind not in (0, 1, 2, 3) or amount == 0:
+            self._last_error = (self.RES_E_INVALID_PARAMS, f"Invalid timeframe {timeframe}")
+            return None
+
+        with self._lock:
+            minutes = self._minutes[symbol].view()
+            if kind == 0 and amount == 1:
+                return minutes if count is None else minutes[-count:]
+
+            if count is not None and kind in (0, 1):
+                minutes = minutes[-(count + 1) * amount * (60 if kind == 1 else 1) :]
+
+            return resample(minutes, timeframe)
+
+    def positions_total(self) -> int:
+        self._call("positions_total")
+        return len(self._positions)
+
+    def positions_get(self, symbol: str = None, group: str = None, ticket: int = None) -> tuple:
+        self._call("positions_get")
+        with self._lock:
+            positions = []
+            for position_ticket, position in sorted(self._positions.items()):
+                if symbol is not None and position["symbol"] != str(symbol).upper():
+                    continue
+
+                if group is not None and not self._in_group(position["symbol"], group):
+                    continue
+
+                if ticket is not None and position_ticket != ticket:
+                    continue
+
+                positions.append(self._trade_position(position_ticket, position))
+
+            return tuple(positions)
+
+    def _trade_position(self, ticket: int, position: dict) -> TradePosition:
+        tick = self._ticks[position["symbol"]].view()[-1]
+        spec = self.specs[position["symbol"]]
+        if position["type"] == self.POSITION_TYPE_BUY:
+            price_current = float(tick["bid"])
+            profit = (price_current - position["price_open"]) * position["volume"] * spec.contract_size
+
+        else:
+            price_current = float(tick["ask"])
+            profit = (position["price_open"] - price_current) * position["volume"] * spec.contract_size
+
+        return TradePosition(
+            ticket=ticket,
+            time=position["time_msc"] // 1000,
+            time_msc=position["time_msc"],
+            time_update=position["time_update_msc"] // 1000,
+            time_update_msc=position["time_update_msc"],
+            type=position["type"],
+            magic=position["magic"],
+            identifier=ticket,
+            reason=3,
+            volume=position["volume"],
+            price_open=position["price_open"],
+            sl=position["sl"],
+            tp=position["tp"],
+            price_current=price_current,
+            swap=0.0,
+            profit=round(profit, 2),
+            symbol=position["symbol"],
+            comment=position["comment"],
+            external_id="",
+        )
+
+    def order_send(self, request: dict) -> OrderSendResult or None:
+        self._call("order_send")
+        with self._lock:
+            symbol = self._symbol(request.get("symbol", ""))
+            if symbol is None:
+                return None
+
+            action = request.get("action")
+            if action == self.TRADE_ACTION_DEAL:
+                return self._deal(symbol, request)
+
+            if action == self.TRADE_ACTION_SLTP:
+                return self._modify(symbol, request)
+
+            return self._result(self.TRADE_RETCODE_INVALID, request, comment="Invalid request")
+
+    def _result(self, retcode: int, request: dict, deal: int = 0, volume: float = 0.0, price: float = 0.0, comment=""):
+        tick = self._ticks[request["symbol"].upper()].view()[-1]
+        return OrderSendResult(
+            retcode=retcode,
+            deal=deal,
+            order=deal,
+            volume=volume,
+            price=price,
+            bid=float(tick["bid"]),
+            ask=float(tick["ask"]),
+            comment=comment or ("Request executed" if retcode == self.TRADE_RETCODE_DONE else "Request rejected"),
+            request_id=self._ticket,
+            request=request,
+        )
+
+    def _deal(self, symbol: str, request: dict) -> OrderSendResult:
+        if not self.trade_allowed:
+            return self._result(self.TRADE_RETCODE_TRADE_DISABLED, request)
+
+        volume = float(request.get("volume", 0.0))
+        if volume <= 0:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request)
+
+        order_type = request.get("type")
+        if order_type not in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL):
+            return self._result(self.TRADE_RETCODE_INVALID, request)
+
+        tick = self._ticks[symbol].view()[-1]
+        price = float(tick["ask"] if order_type == self.ORDER_TYPE_BUY else tick["bid"])
+        self._ticket += 1
+
+        ticket = request.get("position", 0)
+        if ticket:
+            position = self._positions.get(ticket)
+            if position is None or position["symbol"] != symbol or position["type"] == order_type:
+                return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request)
+
+            self._close(ticket, min(volume, position["volume"]), price, self._time_msc)
+
+        else:
+            self._positions[self._ticket] = {
+                "symbol": symbol,
+                "type": order_type,
+                "volume": volume,
+                "price_open": price,
+                "sl": float(request.get("sl", 0.0)),
+                "tp": float(request.get("tp", 0.0)),
+                "magic": request.get("magic", 0),
+                "comment": request.get("comment", ""),
+                "time_msc": self._time_msc,
+                "time_update_msc": self._time_msc,
+            }
+
+        return self._result(self.TRADE_RETCODE_DONE, request, deal=self._ticket, volume=volume, price=price)
+
+    def _modify(self, symbol: str, request: dict) -> OrderSendResult:
+        position = self._positions.get(request.get("position", 0))
+        if position is None or position["symbol"] != symbol:
+            return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request)
+
+        position["sl"] = float(request.get("sl", position["sl"]))
+        position["tp"] = float(request.get("tp", position["tp"]))
+        position["time_update_msc"] = self._time_msc
+        return self._result(self.TRADE_RETCODE_DONE, request)
@@ -0,0 +1,343 @@
+"""
+Parameter sweeps and walk-forward analysis of a strategy over the history of many symbols, in a process pool.
+
+The workers receive only the indexes of their jobs, the history is read from the files of a HistoryCache, which are
+mapped in memory by every worker, so all the processes share the same pages of the operating system cache instead of
+each one receiving a copy of the arrays:
+
+    >>> from metatrader5EasyT.sweep import grid, run_sweep, walk_forward
+    >>> params = grid(fast=[10, 20], slow=[50, 100], stop_loss=[0.001, 0.002], take_profit=[0.002, 0.004])
+    >>> windows = walk_forward(1577836800, 1672531200, train=365 * 86400, test=90 * 86400)
+    >>> result = run_sweep(history, {'EURUSD': 0.00001, 'USDJPY': 0.001}, timeframe.ONE_MINUTE, ma_cross, params,
+    ...                    windows)
+    >>> result.walk_forward()['profit'].sum()
+    0.0421
+
+The strategy is a function defined at the top level of a module, so it can be sent to the workers, that receives the
+bars and the parameters that are not lot, stop_loss and take_profit, and returns the buy and sell signals, or buy, sell
+and close, for Backtest.run_signals().
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+
+from metatrader5EasyT.backtest import Backtest
+from metatrader5EasyT.history import HistoryCache
+from metatrader5EasyT.log import get_log_manager
+
+IN_SAMPLE = 0
+OUT_OF_SAMPLE = 1
+
+# One row per symbol, parameter set, window and segment, the symbol and the parameters are indexes of SweepResult.
+RESULTS_DTYPE = np.dtype(
+    [
+        ("symbol", "<u4"),
+        ("params", "<u4"),
+        ("window", "<u4"),
+        ("segment", "u1"),
+        ("trades", "<u4"),
+        ("profit", "<f8"),
+        ("win_rate", "<f4"),
+        ("profit_factor", "<f4"),
+        ("max_drawdown", "<f8"),
+    ]
+)
+
+# The parameters of the Trade constructor, they go to the backtest, the others go to the strategy.
+TRADE_PARAMS = ("lot", "stop_loss", "take_profit")
+
+
+class Window(NamedTuple):
+    """
+    A walk-forward window, the times are in seconds since epoch, the start is included and the end is not.
+    """
+
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward(start: int, end: int, train: int, test: int, step: int = None) -> List[Window]:
+    """
+    This function splits the period in windows where the parameters are chosen in train and evaluated in the test that
+    follows it.
+
+    Args:
+        start:
+            It is the start of the history, in seconds since epoch.
+
+        end:
+            It is the end of the history, in seconds since epoch.
+
+        train:
+            It is the duration of the in-sample period in seconds.
+
+        test:
+            It is the duration of the out-of-sample period in seconds.
+
+        step:
+            It is the time between the start of two windows, when it is None it is test, so the tests do not overlap.
+
+    Returns:
+        It returns the windows whose test ends until the end.
+    """
+    step = test if step is None else step
+    windows = []
+    train_start = start
+    while train_start + train + test <= end:
+        train_end = train_start + train
+        windows.append(Window(train_start, train_end, train_end, train_end + test))
+        train_start += step
+
+    return windows
+
+
+def grid(**values: Sequence) -> List[dict]:
+    """
+    Returns:
+        It returns a parameter set for every combination of the values, like
+        grid(stop_loss=[0.001, 0.002], take_profit=[0.002]) returns
+        [{'stop_loss': 0.001, 'take_profit': 0.002}, {'stop_loss': 0.002, 'take_profit': 0.002}].
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+
+class SweepResult:
+    """
+    The results of a sweep, self.table is a structured array with RESULTS_DTYPE.
+    """
+
+    def __init__(self, symbols: Sequence[str], params: Sequence[dict], windows: Sequence[Window], table: np.ndarray):
+        self.symbols = tuple(symbols)
+        self.params = tuple(params)
+        self.windows = tuple(windows)
+        self.table = table
+
+    def best(self, metric: str = "profit", segment: int = IN_SAMPLE) -> np.ndarray:
+        """
+        Returns:
+            It returns the row with the highest metric of every symbol and window in the segment.
+        """
+        rows = self.table[self.table["segment"] == segment]
+        # Sorted by symbol, window and metric, the last row of every group is the best.
+        rows = rows[np.lexsort((rows[metric], rows["window"], rows["symbol"]))]
+        group = rows["symbol"].astype(np.int64) * (len(self.windows) + 1) + rows["window"]
+        last = np.flatnonzero(np.diff(group, append=-1) != 0)
+        return rows[last]
+
+    def walk_forward(self, metric: str = "profit") -> np.ndarray:
+        """
+        Returns:
+            It returns, for every symbol and window, the out-of-sample row of the parameters with the highest in-sample
+            metric.
+        """
+        chosen = self.best(metric, IN_SAMPLE)
+        rows = self.table[self.table["segment"] == OUT_OF_SAMPLE]
+        keys = set(zip(chosen["symbol"].tolist(), chosen["params"].tolist(), chosen["window"].tolist()))
+        mask = [key in keys for key in zip(rows["symbol"].tolist(), rows["params"].tolist(), rows["window"].tolist())]
+        return rows[np.array(mask, dtype=bool)]
+
+    def as_frame(self):
+        """
+        This function builds a pandas DataFrame with the symbol names and one column per parameter. Pandas is not a
+        dependency of this package, install it to use this function.
+
+        Raises:
+            ImportError: If pandas is not installed.
+        """
+        try:
+            import pandas as pd
+
+        except ImportError as error:
+            raise ImportError("as_frame() requires pandas, install it with: pip install pandas") from error
+
+        frame = pd.DataFrame(self.table)
+        frame["symbol"] = np.array(self.symbols, dtype=object)[self.table["symbol"]]
+        params = pd.DataFrame(list(self.params))
+        return frame.join(params, on="params")
+
+
+# The state of a worker, set once by _initialize, the history of every symbol is mapped once per process.
+_worker = {}
+
+
+def _initialize(directory: str, timeframe, strategy: Callable, symbols, params, windows) -> None:
+    _worker.update(
+        history=HistoryCache(directory),
+        timeframe=timeframe,
+        strategy=strategy,
+        symbols=symbols,
+        params=params,
+        windows=windows,
+        bars={},
+    )
+
+
+def _segments(times: np.ndarray, windows: Sequence[Window]):
+    if not windows:
+        yield 0, IN_SAMPLE, 0, len(times)
+        return
+
+    for index, window in enumerate(windows):
+        for segment, start, end in (
+            (IN_SAMPLE, window.train_start, window.train_end),
+            (OUT_OF_SAMPLE, window.test_start, window.test_end),
+        ):
+            yield index, segment, times.searchsorted(start), times.searchsorted(end)
+
+
+def _run_jobs(jobs: Sequence[tuple]) -> np.ndarray:
+    """
+    It runs the jobs, pairs of symbol and parameter indexes, in the worker and returns their rows.
+    """
+    rows = []
+    for symbol_index, params_index in jobs:
+        symbol, point = _worker["symbols"][symbol_index]
+        bars = _worker["bars"].get(symbol)
+        if bars is None:
+            bars = _worker["history"].load(symbol, _worker["timeframe"])
+            _worker["bars"][symbol] = bars
+
+        params = _worker["params"][params_index]
+        trade_params = {name: params[name] for name in TRADE_PARAMS if name in params}
+        signals = _worker["strategy"](
+            bars, **{name: value for name, value in params.items() if name not in trade_params}
+        )
+        buy, sell = signals[0], signals[1]
+        close = signals[2] if len(signals) > 2 else None
+
+        for window, segment, start, end in _segments(bars["time"], _worker["windows"]):
+            summary = {"trades": 0, "profit": 0.0, "win_rate": 0.0, "profit_factor": 0.0, "max_drawdown": 0.0}
+            if end > start:
+                backtest = Backtest(symbol, bars[start:end], point)
+                summary = backtest.run_signals(
+                    buy[start:end],
+                    sell[start:end],
+                    trade_params["stop_loss"],
+                    trade_params["take_profit"],
+                    close=None if close is None else close[start:end],
+                    lot=trade_params.get("lot", 1.0),
+                ).summary()
+
+            rows.append(
+                (
+                    symbol_index,
+                    params_index,
+                    window,
+                    segment,
+                    summary["trades"],
+                    summary["profit"],
+                    summary["win_rate"],
+                    summary["profit_factor"],
+                    summary["max_drawdown"],
+                )
+            )
+
+    return np.array(rows, dtype=RESULTS_DTYPE)
+
+
+def run_sweep(
+    history: HistoryCache,
+    symbols: Dict[str, float],
+    timeframe,
+    strategy: Callable,
+    params: Sequence[dict],
+    windows: Sequence[Window] = (),
+    processes: int = None,
+    chunk_size: int = 16,
+    path: str = None,
+) -> SweepResult:
+    """
+    This function backtests every parameter set in every symbol, in a process pool.
+
+    Args:
+        history:
+            It is the HistoryCache with the bars of the symbols, the workers map its files.
+
+        symbols:
+            It is a dict from the symbol to its point, the tick size.
+
+        timeframe:
+            It is the timeframe of the history.
+
+        strategy:
+            It is a function defined at the top level of a module, strategy(bars, **params) returns (buy, sell) or
+            (buy, sell, close), see Backtest.run_signals().
+
+        params:
+            It is a list of parameter sets, see grid(). The lot, stop_loss and take_profit are the ones of Trade, the
+            other parameters are given to the strategy.
+
+        windows:
+            It is the walk-forward windows, see walk_forward(). When it is empty, the whole history is one in-sample
+            segment.
+
+        processes:
+            It is the amount of worker processes, when it is None it is the amount of CPUs, when it is 1 the jobs run
+            in this process.
+
+        chunk_size:
+            It is the amount of jobs sent to a worker at once, larger chunks have less overhead and smaller ones
+            balance the load better.
+
+        path:
+            When it is given the rows are written to this file as they arrive, without header, so a long sweep can be
+            read while it runs with numpy.fromfile(path, dtype=RESULTS_DTYPE). The file must not exist, so the results
+            of another sweep are never mixed with these ones.
+
+    Returns:
+        It returns the SweepResult, the rows are in the order they finished.
+
+    Raises:
+        ValueError: If a parameter set does not have stop_loss and take_profit.
+        FileExistsError: If the file of path already exists.
+    """
+    for values in params:
+        if "stop_loss" not in values or "take_profit" not in values:
+            raise ValueError(f"The parameters {values} must have stop_loss and take_profit, like Trade.")
+
+    log = get_log_manager()
+    symbol_points = list(symbols.items())
+    jobs = [(symbol, index) for symbol in range(len(symbol_points)) for index in range(len(params))]
+    chunks = [jobs[start : start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+    arguments = (history.directory, timeframe, strategy, symbol_points, list(params), list(windows))
+    processes = os.cpu_count() if processes is None else processes
+    log.logger.info("Sweep of %s jobs in %s processes", len(jobs), processes)
+
+    tables = []
+    output = open(path, "xb") if path is not None else None
+    try:
+
+        def collect(rows: np.ndarray) -> None:
+            tables.append(rows)
+            if output is not None:
+                output.write(rows.tobytes())
+                output.flush()
+
+        if processes == 1:
+            _initialize(*arguments)
+            for chunk in chunks:
+                collect(_run_jobs(chunk))
+
+        else:
+            with ProcessPoolExecutor(processes, initializer=_initialize, initargs=arguments) as executor:
+                for future in as_completed([executor.submit(_run_jobs, chunk) for chunk in chunks]):
+                    collect(future.result())
+
+    finally:
+        if output is not None:
+            output.close()
+
+    table = np.concatenate(tables) if tables else np.empty(0, dtype=RESULTS_DTYPE)
+    return SweepResult(symbols, params, windows, table)
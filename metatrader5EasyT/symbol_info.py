@@ -0,0 +1,135 @@
+import threading
+import time
+
+import MetaTrader5 as Mt5
+
+
+class SymbolInfoCache:
+    """
+    This class keeps the symbol information returned by Metatrader5, like tick size, digits, volume step and filling
+    modes, these values do not change during a session, so there is no need to ask the platform for them everytime.
+
+    The information expires after the ttl, and it can be invalidated at any time.
+    """
+
+    def __init__(self, ttl: float = 3600.0):
+        """
+        Args:
+            ttl:
+                It is the time in seconds that the information of a symbol is kept before asking Metatrader5 again.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def get(self, symbol: str):
+        """
+        This function returns the information of the symbol, it calls Metatrader5 only when the symbol is not cached or
+        when the information is expired.
+
+        Args:
+            symbol:
+                It is the symbol you want information about.
+
+        Returns:
+            It returns the SymbolInfo of Metatrader5, or None if the symbol is not found. None is never cached.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.symbol_info import symbol_cache
+            >>> symbol_cache.get('EURUSD').digits
+            5
+            >>> # The second time the information comes from the cache:
+            >>> symbol_cache.get('EURUSD').trade_tick_size
+            1e-05
+
+        """
+        symbol = symbol.upper()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(symbol)
+
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        symbol_info = Mt5.symbol_info(symbol)
+        if symbol_info is not None:
+            self.put(symbol, symbol_info)
+
+        return symbol_info
+
+    def put(self, symbol: str, symbol_info) -> None:
+        """
+        This function stores the information of a symbol that was retrieved in another way, like symbols_get().
+
+        Args:
+            symbol:
+                It is the symbol name.
+
+            symbol_info:
+                It is the SymbolInfo of Metatrader5.
+        """
+        with self._lock:
+            self._cache[symbol.upper()] = (time.monotonic(), symbol_info)
+
+    def invalidate(self, symbol: str = None) -> None:
+        """
+        This function removes the information of a symbol from the cache, or of all symbols when it is None.
+
+        Args:
+            symbol:
+                It is the symbol to be removed, or None to remove all of them.
+        """
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+
+            else:
+                self._cache.pop(symbol.upper(), None)
+
+    def tick_size(self, symbol: str) -> float:
+        """
+        Returns:
+            It returns the tick size of the symbol, the smallest change of its price.
+        """
+        return self.get(symbol).trade_tick_size
+
+    def digits(self, symbol: str) -> int:
+        """
+        Returns:
+            It returns the amount of digits after the decimal point of the price of the symbol.
+        """
+        return self.get(symbol).digits
+
+    def stops_level(self, symbol: str) -> float:
+        """
+        Returns:
+            It returns the minimum distance between the price and the stop loss or take profit of the symbol, in price.
+        """
+        symbol_info = self.get(symbol)
+        return symbol_info.trade_stops_level * symbol_info.point
+
+    def volume_min(self, symbol: str) -> float:
+        """
+        Returns:
+            It returns the minimum volume of an order of the symbol, in lots.
+        """
+        return self.get(symbol).volume_min
+
+    def volume_step(self, symbol: str) -> float:
+        """
+        Returns:
+            It returns the step of the volume of an order of the symbol, in lots.
+        """
+        return self.get(symbol).volume_step
+
+    def filling_mode(self, symbol: str) -> int:
+        """
+        Returns:
+            It returns the filling modes allowed for the symbol, a combination of the SYMBOL_FILLING flags.
+        """
+        return self.get(symbol).filling_mode
+
+
+# The cache shared by all the classes of this package.
+symbol_cache = SymbolInfoCache()
@@ -1,8 +1,28 @@
+import asyncio
 from datetime import datetime
+from typing import AsyncIterator
+from typing import Iterator
 
 import MetaTrader5 as Mt5
+import numpy as np
 from abstractEasyT import tick
-from supportLibEasyT import log_manager
+
+from metatrader5EasyT import tracing
+from metatrader5EasyT.buffer import RingBuffer
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.worker import get_worker
+
+# The fields kept in the tick buffer, the time is kept as milliseconds since epoch.
+TICK_DTYPE = np.dtype(
+    [
+        ("time_msc", "<i8"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+        ("last", "<f8"),
+        ("volume", "<u8"),
+        ("flags", "<u4"),
+    ]
+)
 
 
 class Tick(tick.Tick):
@@ -10,19 +30,36 @@ class Tick(tick.Tick):
     Tick class is the responsible to retrieve every tick information.
     """
 
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, capacity: int = 10000, fetch_size: int = 10000):
         """
         Args:
             symbol:
                 It is the symbol you want information about. You can have information about time, bid, ask, last, volume.
+
+            capacity:
+                It is the amount of ticks kept in the buffer filled by update_ticks(), older ticks are discarded.
+
+            fetch_size:
+                It is the maximum amount of ticks requested to Metatrader5 at once by update_ticks().
         """
 
-        self._log = log_manager.LogManager("metatrader5")
+        self._log = get_log_manager()
         self._log.logger.info("Logger Initialized in Tick")
 
         self._symbol = symbol.upper()
+        self._capacity = capacity
+        self._fetch_size = fetch_size
+
+        self._buffer = RingBuffer(capacity, TICK_DTYPE)
+        self._cursor_msc = None
+        self._cursor_seen = 0
+        self._trace = None
+        # The amount of calls to Metatrader5 made by this instance, like the budget of PollScheduler.
+        self.terminal_calls = 0
 
-        self.time = None
+        self._time = None
+        self._assigned = {}
+        self.time_msc = None
         self.bid = None
         self.ask = None
         self.last = None
@@ -41,6 +78,46 @@ class Tick(tick.Tick):
 
         """
         self._symbol = new_symbol.upper()
+        self._buffer.clear()
+        self._cursor_msc = None
+        self._cursor_seen = 0
+
+    @property
+    def time(self) -> datetime or None:
+        """
+        It is the time of the last tick, the datetime is only built when it is asked.
+        """
+        if "time" in self._assigned:
+            return self._assigned["time"]
+
+        return None if self._time is None else datetime.fromtimestamp(self._time)
+
+    @time.setter
+    def time(self, value) -> None:
+        # Like the fields of Rates, the value assigned is kept until the next tick.
+        self._assigned["time"] = value
+
+    @property
+    def ticks(self) -> np.ndarray:
+        """
+        It is a zero-copy view of the ticks stored by update_ticks(), from the oldest to the most recent, with the
+        fields time_msc, bid, ask, last, volume and flags.
+        """
+        return self._buffer.view()
+
+    @staticmethod
+    def to_datetime(time_msc: int) -> datetime:
+        """
+        This function converts a time in milliseconds, like the time_msc of the ticks, to datetime.
+
+        Args:
+            time_msc:
+                It is the time in milliseconds since epoch.
+
+        Returns:
+            It returns the datetime of the time received.
+        """
+        return datetime.fromtimestamp(time_msc / 1000)
 
     def get_new_tick(self) -> None:
         """
@@ -77,11 +154,190 @@ class Tick(tick.Tick):
             You can ask for this information: time, bid, ask, last, volume.
 
         """
-        self._log.logger.info("Tick updated")
+        self._log.logger.debug("Tick updated")
+        self.terminal_calls += 1
         result = Mt5.symbol_info_tick(self._symbol)
 
-        self.time = datetime.fromtimestamp(result.time)
+        self._time = result.time
+        self._assigned = {}
+        self.time_msc = result.time_msc
         self.bid = result.bid
         self.ask = result.ask
         self.last = result.last
         self.volume = result.volume
+        self._trace = tracing.tracer.start("tick", result.time_msc)
+
+    async def get_new_tick_async(self) -> None:
+        """
+        This function is the asyncio version of get_new_tick(), it runs in the terminal thread, see
+        metatrader5EasyT.worker, and identical calls in flight at the same time are executed once.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.tick import Tick
+            >>> eurusd_tick = Tick(symbol='EURUSD')
+            >>> await eurusd_tick.get_new_tick_async()
+            >>> eurusd_tick.ask
+            1.09975
+
+        """
+        await get_worker().run(self.get_new_tick, key=(self, "get_new_tick"))
+        tracing.resume(self._trace)
+
+    def update_ticks(self) -> np.ndarray:
+        """
+        This function retrieves every tick that arrived since the last call, so no tick is lost between two calls.
+        The ticks are appended in the buffer that you can access in self.ticks and the attributes are updated with the
+        most recent tick.
+
+        The time_msc of the last tick received is used as a cursor, the first call starts at the current tick. The ticks
+        are requested fetch_size at a time, a second with more ticks than fetch_size is requested with larger counts.
+
+        Returns:
+            It returns an array with the new ticks, it is empty when there is no new tick.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.initialization import Initialize
+            >>> from metatrader5EasyT.tick import Tick
+            >>> initialize = Initialize()
+            >>> initialize.initialize_platform()
+            >>> initialize.initialize_symbol('EURUSD')
+            >>> eurusd_tick = Tick(symbol='EURUSD')
+            >>> eurusd_tick.update_ticks()
+            array([(1647006489207, 1.09975, 1.09978, 0., 0, 6)],
+                  dtype=[('time_msc', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+                  ('flags', '<u4')])
+            >>> # Some seconds later, all the ticks since the last call:
+            >>> len(eurusd_tick.update_ticks())
+            12
+            >>> len(eurusd_tick.ticks)
+            13
+
+        """
+        if self._cursor_msc is None:
+            self.terminal_calls += 1
+            result = Mt5.symbol_info_tick(self._symbol)
+            if result is None:
+                self._log.logger.error(
+                    "It was not possible to retrieve the tick of %s: %s", self._symbol, Mt5.last_error()
+                )
+                return np.empty(0, dtype=TICK_DTYPE)
+
+            self._cursor_msc = result.time_msc
+            self._cursor_seen = 0
+
+        new_ticks = []
+        fetch_size = self._fetch_size
+        while True:
+            self.terminal_calls += 1
+            result = Mt5.copy_ticks_from(self._symbol, self._cursor_msc // 1000, fetch_size, Mt5.COPY_TICKS_ALL)
+            if result is None:
+                self._log.logger.error(
+                    "It was not possible to retrieve ticks of %s: %s", self._symbol, Mt5.last_error()
+                )
+                break
+
+            ticks = self._after_cursor(result)
+            # A full response means that there can be more ticks after it.
+            if len(result) < fetch_size:
+                if len(ticks) > 0:
+                    new_ticks.append(ticks)
+
+                break
+
+            if len(ticks) > 0:
+                new_ticks.append(ticks)
+
+            else:
+                # Metatrader5 starts at the second of the cursor, when that second has more ticks than the response
+                # the cursor does not move, the response grows until it reaches the ticks after the cursor.
+                fetch_size *= 2
+
+        if not new_ticks:
+            return np.empty(0, dtype=TICK_DTYPE)
+
+        received = np.concatenate(new_ticks) if len(new_ticks) > 1 else new_ticks[0]
+        self._buffer.extend(received)
+
+        self._time = received["time_msc"][-1] // 1000
+        self._assigned = {}
+        self.time_msc = received["time_msc"][-1]
+        self.bid = received["bid"][-1]
+        self.ask = received["ask"][-1]
+        self.last = received["last"][-1]
+        self.volume = received["volume"][-1]
+        self._trace = tracing.tracer.start("tick", int(self.time_msc))
+        return received
+
+    def _after_cursor(self, result: np.ndarray) -> np.ndarray:
+        """
+        It keeps only the ticks after the cursor and moves the cursor. Ticks with the same time_msc of the cursor that
+        were already received are skipped, the remaining ones arrived after the last call.
+        """
+        times = result["time_msc"]
+        first = times.searchsorted(self._cursor_msc, side="left")
+        same = times.searchsorted(self._cursor_msc, side="right") - first
+        result = result[first + min(same, self._cursor_seen) :]
+        if len(result) == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+
+        ticks = np.empty(len(result), dtype=TICK_DTYPE)
+        for name in TICK_DTYPE.names:
+            ticks[name] = result[name]
+
+        last = ticks["time_msc"][-1]
+        seen = len(ticks) - ticks["time_msc"].searchsorted(last, side="left")
+        self._cursor_seen = self._cursor_seen + seen if last == self._cursor_msc else seen
+        self._cursor_msc = last
+        return ticks
+
+    def iter_new_ticks(self) -> Iterator[np.void]:
+        """
+        This function is a generator over the ticks that arrived since the last call, see update_ticks().
+
+        Returns:
+            It yields one tick at time, with the fields time_msc, bid, ask, last, volume and flags.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.tick import Tick
+            >>> eurusd_tick = Tick(symbol='EURUSD')
+            >>> for new_tick in eurusd_tick.iter_new_ticks():
+            ...     print(Tick.to_datetime(new_tick["time_msc"]), new_tick["bid"])
+            2022-03-11 04:48:09.207000 1.09975
+
+        """
+        yield from self.update_ticks()
+
+    async def stream(self, interval: float = 0.1) -> AsyncIterator[np.void]:
+        """
+        This function is an asynchronous generator over all the new ticks, see update_ticks(). The ticks are retrieved
+        in the terminal thread and, when there is no new tick, it waits the interval before asking again.
+
+        Args:
+            interval:
+                It is the time in seconds to wait when there is no new tick.
+
+        Returns:
+            It yields one tick at time, with the fields time_msc, bid, ask, last, volume and flags.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.tick import Tick
+            >>> eurusd_tick = Tick(symbol='EURUSD')
+            >>> async for new_tick in eurusd_tick.stream():
+            ...     print(new_tick["time_msc"], new_tick["bid"])
+            1647006489207 1.09975
+
+        """
+        while True:
+            new_ticks = await get_worker().run(self.update_ticks, key=(self, "update_ticks"))
+            if len(new_ticks) > 0:
+                tracing.resume(self._trace)
+
+            for new_tick in new_ticks:
+                yield new_tick
+
+            if len(new_ticks) == 0:
+                await asyncio.sleep(interval)
@@ -1,6 +1,8 @@
 import MetaTrader5 as Mt5
 from abstractEasyT import timeframe
-from supportLibEasyT import log_manager
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.resample import Period
 
 
 class TimeFrame(timeframe.TimeFrame):
@@ -13,7 +15,7 @@ class TimeFrame(timeframe.TimeFrame):
     """
 
     def __init__(self):
-        self._log = log_manager.LogManager("metatrader5")
+        self._log = get_log_manager()
         self._log.logger.info("Logger Initialized in TimeFrame")
 
         self.ONE_MINUTE = Mt5.TIMEFRAME_M1  # 1 minute
@@ -35,6 +37,6 @@ class TimeFrame(timeframe.TimeFrame):
         self.EIGHT_HOURS = Mt5.TIMEFRAME_H8  # 8 hour
         self.TWELVE_HOURS = Mt5.TIMEFRAME_H12  # 12 hour
         self.ONE_DAY = Mt5.TIMEFRAME_D1  # 1 Day
-        self.THREE_DAY = None  # 3 Days
+        self.THREE_DAY = Period(3 * 86400)  # 3 Days, built from the 1 Day bars
         self.ONE_WEEK = Mt5.TIMEFRAME_W1  # 1 Week
         self.ONE_MONTH = Mt5.TIMEFRAME_MN1  # 1 Month
@@ -0,0 +1,208 @@
+"""
+Tick-to-trade tracing, it follows one decision from the tick read by Tick to the result of order_send in Trade, every
+step gets a monotonic timestamp, so the report shows where the milliseconds go.
+
+The trace is kept in a context variable, it starts in Tick.get_new_tick() or Tick.update_ticks() and it is finished by
+the order_send result. The steps recorded by the package are tick, position_open, open_buy or open_sell, order_send and
+order_result, you can add your own steps, like the signal:
+
+    >>> from metatrader5EasyT import tracing
+    >>> tracing.tracer.enabled = True
+    >>> eurusd_tick.get_new_tick()
+    >>> buy, sell = my_strategy(eurusd_tick)
+    >>> tracing.mark("signal")
+    >>> eurusd_trade.position_open(buy, sell)
+    >>> tracing.tracer.report()["tick -> order_result"]
+    {'count': 12, 'p50': 0.00231, 'p90': 0.00305, 'p99': 0.00412, 'max': 0.00418}
+    >>> tracing.tracer.dump("trace.npz")
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict
+from typing import Sequence
+
+import numpy as np
+
+TRACES_DTYPE = np.dtype([("trace", "<u4"), ("time_msc", "<i8"), ("received_msc", "<i8")])
+EVENTS_DTYPE = np.dtype([("trace", "<u4"), ("step", "u1"), ("time_ns", "<i8")])
+
+_current = ContextVar("metatrader5EasyT_trace", default=None)
+
+
+class Tracer:
+    """
+    This class keeps the last finished traces and aggregates them in percentile reports.
+    """
+
+    def __init__(self, capacity: int = 100000, enabled: bool = False):
+        """
+        Args:
+            capacity:
+                It is the amount of finished traces kept, the oldest ones are discarded.
+
+            enabled:
+                When it is False no trace is started, and the cost of the tracing is one context variable lookup per
+                step.
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=capacity)
+
+    def start(self, step: str, time_msc: int) -> list or None:
+        """
+        It starts a new trace in the current context, discarding the trace that was not finished.
+
+        Args:
+            step:
+                It is the name of the first step.
+
+            time_msc:
+                It is the time of the tick in milliseconds, it is compared with the clock of the computer to
+                calculate the age of the tick when it was received.
+
+        Returns:
+            It returns the trace started, or None when the tracer is disabled, see resume().
+        """
+        if not self.enabled:
+            return None
+
+        # The time of the tick, the time it was received, the steps, and if it is finished.
+        trace = [time_msc, time.time_ns() // 1000000, [(step, time.perf_counter_ns())], False]
+        _current.set(trace)
+        return trace
+
+    def finish(self, step: str) -> None:
+        """
+        It records the last step and stores the trace of the current context, the trace is finished only once, even
+        when it is shared with other contexts.
+        """
+        trace = _current.get()
+        if trace is not None and not trace[3]:
+            trace[2].append((step, time.perf_counter_ns()))
+            trace[3] = True
+            _current.set(None)
+            if not self.enabled:
+                return
+
+            with self._lock:
+                self._traces.append(trace)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def arrays(self):
+        """
+        Returns:
+            It returns the names of the steps, and two structured arrays, the traces with TRACES_DTYPE and their steps
+            with EVENTS_DTYPE.
+        """
+        with self._lock:
+            finished = list(self._traces)
+
+        names = {}
+        traces = np.zeros(len(finished), dtype=TRACES_DTYPE)
+        events = np.zeros(sum(len(trace[2]) for trace in finished), dtype=EVENTS_DTYPE)
+        position = 0
+        for index, (time_msc, received_msc, steps, _) in enumerate(finished):
+            traces[index] = (index, time_msc, received_msc)
+            for step, time_ns in steps:
+                events[position] = (index, names.setdefault(step, len(names)), time_ns)
+                position += 1
+
+        return list(names), traces, events
+
+    def report(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> Dict[str, dict]:
+        """
+        This function aggregates the finished traces, the durations are in seconds.
+
+        Returns:
+            It returns a dict with the percentiles of the duration between each step and the next one, like
+            "position_open -> open_buy", of the whole trace, like "tick -> order_result", and of the age of the tick
+            when it was received, "tick_age", which depends on the clocks of the server and the computer being in sync.
+        """
+        names, traces, events = self.arrays()
+        durations = {}
+        if len(traces) > 0:
+            durations["tick_age"] = (traces["received_msc"] - traces["time_msc"]) / 1000
+
+        boundaries = np.flatnonzero(np.diff(events["trace"])) + 1
+        for trace in np.split(events, boundaries) if len(events) > 0 else []:
+            steps = [names[step] for step in trace["step"]]
+            seconds = trace["time_ns"] / 1e9
+            for index in range(1, len(trace)):
+                durations.setdefault(f"{steps[index - 1]} -> {steps[index]}", []).append(
+                    seconds[index] - seconds[index - 1]
+                )
+
+            durations.setdefault(f"{steps[0]} -> {steps[-1]}", []).append(seconds[-1] - seconds[0])
+
+        report = {}
+        for name, values in durations.items():
+            values = np.asarray(values)
+            report[name] = {"count": len(values), "max": float(values.max())}
+            for quantile in quantiles:
+                report[name][f"p{quantile * 100:g}"] = float(np.quantile(values, quantile))
+
+        return report
+
+    def dump(self, path: str) -> None:
+        """
+        This function saves the finished traces in a compressed numpy file, see load().
+
+        Args:
+            path:
+                It is the path of the file.
+        """
+        names, traces, events = self.arrays()
+        with open(path, "wb") as file:
+            np.savez_compressed(file, names=np.array(names), traces=traces, events=events)
+
+    @staticmethod
+    def load(path: str):
+        """
+        Returns:
+            It returns the names of the steps and the traces and events arrays saved by dump().
+        """
+        with np.load(path) as data:
+            return data["names"].tolist(), data["traces"], data["events"]
+
+
+def mark(step: str) -> None:
+    """
+    This function records a step in the trace of the current context, it does nothing when there is no trace.
+
+    Args:
+        step:
+            It is the name of the step, like "signal".
+    """
+    trace = _current.get()
+    if trace is not None and not trace[3]:
+        trace[2].append((step, time.perf_counter_ns()))
+
+
+def resume(trace: list or None) -> None:
+    """
+    This function makes a trace started in another context the trace of the current context, like a trace started in
+    the terminal thread by an asyncio method.
+
+    Args:
+        trace:
+            It is the trace returned by Tracer.start().
+    """
+    if trace is not None:
+        _current.set(trace)
+
+
+def discard() -> None:
+    """
+    This function discards the trace of the current context, like when the signal does not open a position.
+    """
+    _current.set(None)
+
+
+# The tracer shared by all the classes of this package.
+tracer = Tracer()
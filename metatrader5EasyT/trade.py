@@ -1,8 +1,12 @@
-import math
-
 import MetaTrader5 as Mt5
+import numpy as np
 from abstractEasyT import trade
-from supportLibEasyT import log_manager
+
+from metatrader5EasyT import tracing
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.symbol_info import symbol_cache
+from metatrader5EasyT.worker import get_worker
 
 
 class Trade(trade.Trade):
@@ -10,7 +14,7 @@ class Trade(trade.Trade):
     This class is responsible to handle all the trade requests.
     """
 
-    def __init__(self, symbol: str, lot: float, stop_loss: float, take_profit: float):
+    def __init__(self, symbol: str, lot: float, stop_loss: float, take_profit: float, book: PositionBook = None):
         """
         It is allowed to have only one position at time per symbol, right now it is not possible to open a position and
         increase the size of it or to open opposite position. Open an open position will close the other direction one.
@@ -35,33 +39,46 @@ class Trade(trade.Trade):
                 the US$11.00 is the trigger). Keep in mind that some symbols has different points metrics, US$1.00 sometimes
                 can be 1000 points.
 
+            book:
+                It is the PositionBook the positions are read from, many Trade instances sharing one book read the
+                positions of all their symbols with one call to Metatrader5 per cycle, see
+                metatrader5EasyT.positions.get_position_book(). When it is None, each check asks Metatrader5 for the
+                positions of the symbol.
+
         """
 
-        self._log = log_manager.LogManager("metatrader5")
+        self._log = get_log_manager()
         self._log.logger.info("Logger Initialized in Trade")
 
         self.symbol = symbol.upper()
         self.lot = lot
         self.stop_loss = stop_loss
         self.take_profit = take_profit
+        self.book = book
         self.ticket = None
-        self.points = Mt5.symbol_info(self.symbol).trade_tick_size
+        # The result of the last order_send, None when it was not possible to send it.
+        self.last_result = None
+        self.points = float(symbol_cache.tick_size(self.symbol))
+        self.digits = int(symbol_cache.digits(self.symbol))
 
         self._trade_allowed = False
 
         self.trade_direction = None  # 'buy', 'sell', or None for no position
         self.position_check()
 
-    def normalize(self, price: float) -> float:
+    def normalize(self, price: float or np.ndarray) -> float or np.ndarray:
         """
-        This function normalize the price to ensure a precision that is required by the platform
+        This function normalize the price to ensure a precision that is required by the platform, the price is rounded
+        to the tick size and to the digits of the symbol.
 
         Args:
             price:
                 It is the price that you want to be normalized, usually is the last price to open a market position.
+                It can also be an array of prices, like a ladder of limit orders, they are normalized at once.
 
         Returns:
-            It returns the float price normalized under a precision that is accepted by the platform.
+            It returns the float price normalized under a precision that is accepted by the platform, or an array when
+            an array is received.
 
         Examples:
 
@@ -75,12 +92,15 @@ class Trade(trade.Trade):
             >>> # The normalize function is used inside other functions, but the idea is to normalize the value to
             >>> # be accepted in the trade request. If you want to see this function in action you can look at
             >>> # open_buy() and open_sell()
-            >>> eurusd_trade.normalize(12.3456789)
-            12.34
+            >>> eurusd_trade.normalize(1.123456789)
+            1.12346
+            >>> eurusd_trade.normalize([1.123456789, 1.1, 1.099999])
+            array([1.12346, 1.1    , 1.1    ])
 
         """
-        self._log.logger.info("Normalizing the price")
-        return math.floor(float(self.points * round(price / self.points)) * 100) / 100
+        self._log.logger.debug("Normalizing the price")
+        normalized = np.round(np.round(np.asarray(price, dtype=np.float64) / self.points) * self.points, self.digits)
+        return float(normalized) if normalized.ndim == 0 else normalized
 
     def open_buy(self) -> None:
         """
@@ -118,50 +138,7 @@ class Trade(trade.Trade):
             None
 
         """
-        price = Mt5.symbol_info_tick(self.symbol).ask
-
-        self.ticket = (
-            Mt5.positions_get(symbol=self.symbol)[0].ticket if len(Mt5.positions_get(symbol=self.symbol)) == 1 else 0
-        )
-
-        self._log.logger.info(
-            f"BUY Order sent: {self.symbol},"
-            f" {self.lot} lot(s),"
-            f" at {price},"
-            f" stoploss:{self.normalize(price - self.stop_loss)},"
-            f" takeprofit: {self.normalize(price + self.take_profit)}."
-        )
-
-        request = {
-            "action": Mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
-            "volume": self.lot,
-            "type": Mt5.ORDER_TYPE_BUY,
-            "price": price,
-            "sl": self.normalize(price - self.stop_loss),
-            "tp": self.normalize(price + self.take_profit),
-            "deviation": 5,
-            "magic": 7777,
-            "comment": "easyT!",
-            "type_time": Mt5.ORDER_TIME_GTC,
-            "type_filling": Mt5.ORDER_FILLING_RETURN,
-            "position": (
-                Mt5.positions_get(symbol=self.symbol)[0].ticket
-                if len(Mt5.positions_get(symbol=self.symbol)) == 1
-                else 0
-            ),
-        }
-
-        result = Mt5.order_send(request)
-
-        if result is None or result.retcode != Mt5.TRADE_RETCODE_DONE:
-            self._log.logger.error(
-                f"Something went wrong: Position Not Found for symbol {self.symbol}!" f" Last Error: {Mt5.last_error()}"
-            )
-
-        else:
-            self._log.logger.info("Change trade direction to BUY.")
-            self.trade_direction = "buy"
+        self._open(Mt5.ORDER_TYPE_BUY)
 
     def open_sell(self):
         """
@@ -199,49 +176,89 @@ class Trade(trade.Trade):
             None
 
         """
-        price = Mt5.symbol_info_tick(self.symbol).bid
+        self._open(Mt5.ORDER_TYPE_SELL)
 
-        self.ticket = (
-            Mt5.positions_get(symbol=self.symbol)[0].ticket if len(Mt5.positions_get(symbol=self.symbol)) == 1 else 0
-        )
+    def _open(self, order_type: int, positions=None) -> None:
+        """
+        It sends a market order to Metatrader5 and updates the trade direction from the order_send result.
+
+        Args:
+            order_type:
+                It is Mt5.ORDER_TYPE_BUY or Mt5.ORDER_TYPE_SELL.
+
+            positions:
+                It is the result of positions_get for the symbol, when it was already read in the same request it is
+                reused instead of calling Metatrader5 again.
+        """
+        if positions is None:
+            positions = self._positions_get()
+            if positions is None:
+                self._log.logger.error(
+                    "The order of %s was not sent, the positions are unknown: %s", self.symbol, Mt5.last_error()
+                )
+                return
+
+        tick = Mt5.symbol_info_tick(self.symbol)
+        if order_type == Mt5.ORDER_TYPE_BUY:
+            tracing.mark("open_buy")
+            side, comment, price = "BUY", "easyT!", tick.ask
+            stop_loss = self.normalize(price - self.stop_loss)
+            take_profit = self.normalize(price + self.take_profit)
+
+        else:
+            tracing.mark("open_sell")
+            side, comment, price = "SELL", "easyT", tick.bid
+            stop_loss = self.normalize(price + self.stop_loss)
+            take_profit = self.normalize(price - self.take_profit)
+
+        self.ticket = positions[0].ticket if len(positions) == 1 else 0
 
         self._log.logger.info(
-            f"SELL Order sent: {self.symbol},"
-            f" {self.lot} lot(s),"
-            f" at {price},"
-            f" stoploss:{self.normalize(price - self.stop_loss)},"
-            f" takeprofit: {self.normalize(price + self.take_profit)}."
+            "%s Order sent: %s, %s lot(s), at %s, stoploss:%s, takeprofit: %s.",
+            side,
+            self.symbol,
+            self.lot,
+            price,
+            stop_loss,
+            take_profit,
         )
 
         request = {
             "action": Mt5.TRADE_ACTION_DEAL,
             "symbol": self.symbol,
             "volume": self.lot,
-            "type": Mt5.ORDER_TYPE_SELL,
+            "type": order_type,
             "price": price,
-            "sl": self.normalize(price + self.stop_loss),
-            "tp": self.normalize(price - self.take_profit),
+            "sl": stop_loss,
+            "tp": take_profit,
             "deviation": 5,
             "magic": 7777,
-            "comment": "easyT",
+            "comment": comment,
             "type_time": Mt5.ORDER_TIME_GTC,
             "type_filling": Mt5.ORDER_FILLING_RETURN,
-            "position": (
-                Mt5.positions_get(symbol=self.symbol)[0].ticket
-                if len(Mt5.positions_get(symbol=self.symbol)) == 1
-                else 0
-            ),
+            "position": self.ticket,
         }
 
+        tracing.mark("order_send")
         result = Mt5.order_send(request)
+        tracing.tracer.finish("order_result")
+        self.last_result = result
+        if self.book is not None:
+            self.book.invalidate()
+
         if result is None or result.retcode != Mt5.TRADE_RETCODE_DONE:
             self._log.logger.error(
-                f"Something went wrong: Position Not Found for symbol {self.symbol}!" f" Last Error: {Mt5.last_error()}"
+                "Something went wrong: Position Not Found for symbol %s! Last Error: %s", self.symbol, Mt5.last_error()
             )
 
+        elif self.ticket and positions[0].type != order_type:
+            # An order in the opposite direction of the position closes it.
+            self._log.logger.info("Position closed, change trade direction to None.")
+            self.trade_direction = None
+
         else:
-            self._log.logger.info("Change trade direction to SELL.")
-            self.trade_direction = "sell"
+            self._log.logger.info("Change trade direction to %s.", side)
+            self.trade_direction = side.lower()
 
     def position_open(self, buy: bool, sell: bool) -> str or None:
         """
@@ -314,29 +331,55 @@ class Trade(trade.Trade):
             >>> # Nothing happens
 
         """
-        self._log.logger.info(
-            f"Open position called. Buy is {str(buy)}, and sell is {str(sell)}. Trade allowed is "
-            f"{self._trade_allowed}."
+        self._log.logger.debug(
+            "Open position called. Buy is %s, and sell is %s. Trade allowed is %s.", buy, sell, self._trade_allowed
         )
 
-        self.position_check()
-        if self._trade_allowed and self.trade_direction is None:
+        tracing.mark("position_open")
+        positions = self._read_positions()
+        if positions is not None and self._trade_allowed and self.trade_direction is None:
             if buy and not sell:
                 self._log.logger.info("BUY is true, SELL is false")
-                self.open_buy()
-                self.position_check()
+                self._open(Mt5.ORDER_TYPE_BUY, positions)
 
             if sell and not buy:
                 self._log.logger.info("BUY is false, SELL is true")
-                self.open_sell()
-                self.position_check()
+                self._open(Mt5.ORDER_TYPE_SELL, positions)
 
         return self.trade_direction
 
+    async def position_open_async(self, buy: bool, sell: bool) -> str or None:
+        """
+        This function is the asyncio version of position_open(), it runs in the terminal thread, see
+        metatrader5EasyT.worker, and identical calls in flight at the same time are executed once, so the same signal
+        sent twice does not send two orders.
+
+        Args:
+            buy:
+                When buy is TRUE it receives a positive signal to open a position. When false, it is ignored.
+
+            sell:
+                When sell is TRUE it receives a positive signal to open a position. When false, it is ignored.
+
+        Returns:
+            It returns the trade direction, like position_open().
+
+        """
+        return await get_worker().run(self.position_open, buy, sell, key=(self, "position_open", buy, sell))
+
+    async def position_close_async(self) -> None:
+        """
+        This function is the asyncio version of position_close(), it runs in the terminal thread, see
+        metatrader5EasyT.worker.
+
+        """
+        await get_worker().run(self.position_close, key=(self, "position_close"))
+
     def position_close(self) -> None:
         """
         This functions checks the trade direction, and it opens an opposite position to the current one to close it.
-        If there is no position nothing happens.
+        If there is no position nothing happens. When there are many positions of the symbol, like in a hedging account,
+        each one is closed by its own ticket.
 
         Returns:
             Close the current position by opening an opposite one.
@@ -379,17 +422,21 @@ class Trade(trade.Trade):
 
 
         """
-        self._log.logger.info("Close position called.")
-        self.position_check()
-        if self.trade_direction == "buy":
+        self._log.logger.debug("Close position called.")
+        positions = self._read_positions()
+        if positions is None:
+            return
+
+        if len(positions) > 1:
+            self._close_positions(positions)
+
+        elif self.trade_direction == "buy":
             self._log.logger.info("Close BUY position.")
-            self.open_sell()
-            self.position_check()
+            self._open(Mt5.ORDER_TYPE_SELL, positions)
 
         elif self.trade_direction == "sell":
             self._log.logger.info("Close SELL position")
-            self.open_buy()
-            self.position_check()
+            self._open(Mt5.ORDER_TYPE_BUY, positions)
 
     def position_check(self) -> None:
         """
@@ -441,18 +488,93 @@ class Trade(trade.Trade):
 
 
         """
-        self._log.logger.info("Calls Metatrader5 to check if there is a position opened.")
-        result = Mt5.positions_get(symbol=self.symbol)
-        if len(result) > 0:
-            self._log.logger.info("There is a position opened.")
-            if result[0].type == 0:  # if buy
-                self._log.logger.info("Set the trade direction to BUY")
+        self._read_positions()
+
+    def _read_positions(self):
+        """
+        It reads the positions of the symbol once and updates self.trade_direction. When there are many positions of
+        the symbol, like in a hedging account, the direction is the one of their net volume, and None when the buys and
+        the sells have the same volume.
+
+        Returns:
+            It returns the result of positions_get, so it can be reused by the order sent in the same request, or None
+            when Metatrader5 did not return the positions, the trade direction is not changed then.
+        """
+        self._log.logger.debug("Calls Metatrader5 to check if there is a position opened.")
+        result = self._positions_get()
+        if result is None:
+            self._log.logger.error(
+                "It was not possible to retrieve the positions of %s: %s", self.symbol, Mt5.last_error()
+            )
+
+        elif len(result) > 0:
+            self._log.logger.debug("There is a position opened.")
+            # The volume of the buys (type 0) minus the volume of the sells (type 1).
+            volume = round(sum(position.volume if position.type == 0 else -position.volume for position in result), 8)
+            if volume > 0:  # if buy
+                self._log.logger.debug("Set the trade direction to BUY")
                 self.trade_direction = "buy"
 
-            elif result[0].type == 1:  # if sell
-                self._log.logger.info("Set the trade direction to SELL")
+            elif volume < 0:  # if sell
+                self._log.logger.debug("Set the trade direction to SELL")
                 self.trade_direction = "sell"
+
+            else:
+                self._log.logger.warning("The positions of %s are hedged, set the trade direction to None", self.symbol)
+                self.trade_direction = None
         else:
-            self._log.logger.info("There are no position opened.")
-            self._log.logger.info("Set the trade direction to None")
+            self._log.logger.debug("There are no position opened.")
+            self._log.logger.debug("Set the trade direction to None")
             self.trade_direction = None
+
+        return result
+
+    def _close_positions(self, positions: tuple) -> None:
+        """
+        It closes every position by its ticket with an opposite order of the same volume, an order without the ticket
+        would open one more position in a hedging account.
+        """
+        tick = Mt5.symbol_info_tick(self.symbol)
+        closed = True
+        for position in positions:
+            buy = position.type == Mt5.POSITION_TYPE_BUY
+            request = {
+                "action": Mt5.TRADE_ACTION_DEAL,
+                "symbol": self.symbol,
+                "volume": position.volume,
+                "type": Mt5.ORDER_TYPE_SELL if buy else Mt5.ORDER_TYPE_BUY,
+                "price": tick.bid if buy else tick.ask,
+                "deviation": 5,
+                "magic": 7777,
+                "comment": "easyT",
+                "type_time": Mt5.ORDER_TIME_GTC,
+                "type_filling": Mt5.ORDER_FILLING_RETURN,
+                "position": position.ticket,
+            }
+            tracing.mark("order_send")
+            result = Mt5.order_send(request)
+            tracing.tracer.finish("order_result")
+            self.last_result = result
+            if result is None or result.retcode != Mt5.TRADE_RETCODE_DONE:
+                closed = False
+                self._log.logger.error(
+                    "It was not possible to close the position %s of %s: %s",
+                    position.ticket,
+                    self.symbol,
+                    Mt5.last_error() if result is None else result.retcode,
+                )
+
+        if self.book is not None:
+            self.book.invalidate()
+
+        if closed:
+            self._log.logger.info(
+                "%s positions of %s closed, change trade direction to None.", len(positions), self.symbol
+            )
+            self.trade_direction = None
+
+    def _positions_get(self) -> tuple:
+        if self.book is not None:
+            return self.book.positions(self.symbol)
+
+        return Mt5.positions_get(symbol=self.symbol)
@@ -0,0 +1,257 @@
+from typing import Dict
+from typing import Tuple
+from typing import Union
+
+import MetaTrader5 as Mt5
+import numpy as np
+
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.positions import get_position_book
+from metatrader5EasyT.symbol_info import symbol_cache
+from metatrader5EasyT.tick import Tick
+
+# One row per stop loss sent to Metatrader5, the symbol is an index of PositionBook.symbols.
+MODIFICATIONS_DTYPE = np.dtype(
+    [
+        ("ticket", "<u8"),
+        ("symbol", "<u4"),
+        ("sl_before", "<f8"),
+        ("sl", "<f8"),
+        ("retcode", "<i4"),
+    ]
+)
+
+# The stops are compared in ticks, a price a little below a tick because of the float representation is that tick.
+_EPSILON = 1e-6
+
+
+def trail_levels(
+    position_type: np.ndarray,
+    price: np.ndarray,
+    stop_loss: np.ndarray,
+    distance: np.ndarray,
+    tick_size: np.ndarray,
+    step: int = 1,
+    stops_level: np.ndarray = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    This function computes the trailing stop loss of many positions at once, the stop of a buy follows the price below
+    it and the stop of a sell above it, and they never move back. A position without stop loss gets one right away,
+    whatever the step, the step is the minimum move of a stop that exists.
+
+    Args:
+        position_type:
+            It is the type of the positions, Mt5.POSITION_TYPE_BUY or Mt5.POSITION_TYPE_SELL.
+
+        price:
+            It is the price the positions are closed at, the bid for the buys and the ask for the sells.
+
+        stop_loss:
+            It is the current stop loss of the positions, 0.0 when they do not have one.
+
+        distance:
+            It is the distance between the price and the stop loss, in price like Trade.stop_loss.
+
+        tick_size:
+            It is the tick size of the symbol of each position.
+
+        step:
+            It is the minimum move of the stop loss, in ticks.
+
+        stops_level:
+            It is the minimum distance between the price and the stop loss allowed by the broker, trade_stops_level *
+            point of the symbol of each position, the stops closer to the price are moved away to it.
+
+    Returns:
+        It returns the new stop loss of every position, a multiple of its tick size, and a mask of the positions whose
+        stop loss moves by at least step ticks.
+
+    Examples:
+        >>> # All the code you need to execute the function:
+        >>> import numpy as np
+        >>> from metatrader5EasyT.trailing import trail_levels
+        >>> stop_loss, moved = trail_levels(
+        ...     np.array([0, 0, 1]), np.array([1.1005, 1.10002, 1.0990]), np.array([1.0990, 1.0999, 0.0]),
+        ...     np.full(3, 0.001), np.full(3, 0.00001))
+        >>> stop_loss
+        array([1.0995, 1.0999, 1.1   ])
+        >>> moved
+        array([ True, False,  True])
+
+    """
+    buy = np.asarray(position_type) == Mt5.POSITION_TYPE_BUY
+    tick_size = np.asarray(tick_size, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    current = np.rint(np.asarray(stop_loss, dtype=np.float64) / tick_size)
+
+    # The stops are rounded away from the price, so the distance is never shorter than asked.
+    candidate = np.where(
+        buy,
+        np.floor((price - distance) / tick_size + _EPSILON),
+        np.ceil((price + distance) / tick_size - _EPSILON),
+    )
+    if stops_level is not None:
+        stops_level = np.asarray(stops_level, dtype=np.float64)
+        candidate = np.where(
+            buy,
+            np.minimum(candidate, np.floor((price - stops_level) / tick_size + _EPSILON)),
+            np.maximum(candidate, np.ceil((price + stops_level) / tick_size - _EPSILON)),
+        )
+
+    gain = np.where(buy, candidate - current, current - candidate)
+    moved = (current == 0) | (gain >= step)
+    moved &= candidate > 0
+    return np.where(moved, candidate, current) * tick_size, moved
+
+
+class TrailingStop:
+    """
+    This class trails the stop loss of all the open positions at once, the levels are computed with numpy from the
+    PositionBook and only the stops that move by at least step ticks are sent to Metatrader5, with one
+    TRADE_ACTION_SLTP request per position. The take profit is kept.
+
+    The prices are the price_current of the positions, refresh the book at the start of each cycle, or give update()
+    the ticks already polled.
+    """
+
+    def __init__(
+        self,
+        distance: Union[float, Dict[str, float]],
+        book: PositionBook = None,
+        step: int = 1,
+        magic: int = None,
+    ):
+        """
+        Args:
+            distance:
+                It is the distance between the price and the stop loss, like Trade.stop_loss, or a dict from the symbol
+                to its distance, the positions of the symbols that are not in it are not trailed.
+
+            book:
+                It is the PositionBook the positions are read from, when it is None it is the one of
+                get_position_book().
+
+            step:
+                It is the minimum move of the stop loss in ticks, the smaller moves are not sent.
+
+            magic:
+                When it is given, only the positions with this magic number are trailed, like the 7777 of Trade.
+        """
+        if step < 1:
+            raise ValueError("step must be at least one tick.")
+
+        self._log = get_log_manager()
+        self._log.logger.info("Logger Initialized in TrailingStop")
+
+        self.distance = distance
+        self.step = step
+        self.magic = magic
+        self._book = book if book is not None else get_position_book()
+
+    def _per_symbol(self, symbols: list, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        It returns the distance, the tick size, the digits and the stops level of every symbol of the book, the distance
+        is NaN when the symbol is not trailed or has no position.
+        """
+        distance = np.full(len(symbols), np.nan)
+        tick_size = np.ones(len(symbols))
+        digits = np.zeros(len(symbols), dtype=np.int64)
+        stops_level = np.zeros(len(symbols))
+        for index in present.tolist():
+            symbol = symbols[index]
+            value = self.distance.get(symbol) if isinstance(self.distance, dict) else self.distance
+            if value is None:
+                continue
+
+            distance[index] = value
+            tick_size[index] = symbol_cache.tick_size(symbol)
+            digits[index] = symbol_cache.digits(symbol)
+            stops_level[index] = symbol_cache.stops_level(symbol)
+
+        return distance, tick_size, digits, stops_level
+
+    def update(self, ticks: Dict[str, Tick] = None) -> np.ndarray:
+        """
+        This function computes the stop loss of every position and sends the ones that moved.
+
+        Args:
+            ticks:
+                It is a dict from the symbol to its Tick, like the ones of PollScheduler, the buys use the bid and the
+                sells the ask. The positions of the other symbols use their price_current.
+
+        Returns:
+            It returns the modifications sent, a structured array with MODIFICATIONS_DTYPE.
+
+        Examples:
+            >>> # All the code you need to execute the function:
+            >>> from metatrader5EasyT.trailing import TrailingStop
+            >>> trailing = TrailingStop(distance={'EURUSD': 0.001, 'USDJPY': 0.1})
+            >>> modifications = trailing.update()
+            >>> modifications[['ticket', 'sl_before', 'sl']]
+            array([(50904562, 1.0981, 1.0987)], dtype=[('ticket', '<u8'), ('sl_before', '<f8'), ('sl', '<f8')])
+            >>> # The price did not move one tick, nothing is sent:
+            >>> len(trailing.update())
+            0
+
+        """
+        self._book.ensure_fresh()
+        table = self._book.table
+        symbols = list(self._book.symbols)
+        if self.magic is not None:
+            table = table[table["magic"] == self.magic]
+
+        distance, tick_size, digits, stops_level = self._per_symbol(symbols, np.unique(table["symbol"]))
+        table = table[~np.isnan(distance[table["symbol"]])]
+        if len(table) == 0:
+            return np.empty(0, dtype=MODIFICATIONS_DTYPE)
+
+        price = table["price_current"].copy()
+        if ticks:
+            bid = np.full(len(symbols), np.nan)
+            ask = np.full(len(symbols), np.nan)
+            for index, symbol in enumerate(symbols):
+                tick = ticks.get(symbol)
+                if tick is not None and tick.bid is not None:
+                    bid[index], ask[index] = tick.bid, tick.ask
+
+            latest = np.where(table["type"] == Mt5.POSITION_TYPE_BUY, bid[table["symbol"]], ask[table["symbol"]])
+            price = np.where(np.isnan(latest), price, latest)
+
+        position_symbol = table["symbol"]
+        levels, moved = trail_levels(
+            table["type"],
+            price,
+            table["sl"],
+            distance[position_symbol],
+            tick_size[position_symbol],
+            self.step,
+            stops_level[position_symbol],
+        )
+        table, levels = table[moved], levels[moved]
+        modifications = np.empty(len(table), dtype=MODIFICATIONS_DTYPE)
+        for index, row in enumerate(table):
+            symbol = symbols[row["symbol"]]
+            stop_loss = round(float(levels[index]), int(digits[row["symbol"]]))
+            request = {
+                "action": Mt5.TRADE_ACTION_SLTP,
+                "symbol": symbol,
+                "position": int(row["ticket"]),
+                "sl": stop_loss,
+                "tp": float(row["tp"]),
+            }
+            result = Mt5.order_send(request)
+            retcode = -1 if result is None else result.retcode
+            if retcode != Mt5.TRADE_RETCODE_DONE:
+                self._log.logger.error(
+                    "It was not possible to trail the position %s of %s: %s", row["ticket"], symbol, Mt5.last_error()
+                )
+
+            modifications[index] = (row["ticket"], row["symbol"], row["sl"], stop_loss, retcode)
+
+        if len(modifications):
+            self._log.logger.info("Trailed %s stop losses", len(modifications))
+            self._book.invalidate()
+
+        return modifications
@@ -0,0 +1,122 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import Hashable
+
+
+class TerminalWorker:
+    """
+    This class runs the calls to Metatrader5 in a single dedicated thread, the MetaTrader5 package is not thread-safe,
+    so the calls from different threads or from asyncio tasks are executed one by one.
+
+    Identical requests, the ones submitted with the same key while the first is still running or waiting, are coalesced
+    and share the same result.
+
+    A request submitted from the terminal thread itself is run right away, a function running there, like
+    RatesPool.update_rates() called from a request, would otherwise wait forever for requests queued behind it.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metatrader5", initializer=self._set_thread
+        )
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _set_thread(self) -> None:
+        self._thread = threading.current_thread()
+
+    def submit(self, key: Hashable or None, function: Callable, *args, **kwargs) -> Future:
+        """
+        This function schedules the function in the terminal thread.
+
+        Args:
+            key:
+                It identifies the request, while a request with the same key is in flight its future is returned
+                instead of scheduling the function again. When it is None the request is never coalesced.
+
+            function:
+                It is the function to be called in the terminal thread with args and kwargs.
+
+        Returns:
+            It returns a concurrent.futures.Future with the result of the function.
+        """
+        if threading.current_thread() is self._thread:
+            return self._run_now(function, *args, **kwargs)
+
+        # The context of the caller is copied, so context variables like the trace of metatrader5EasyT.tracing follow
+        # the request to the terminal thread.
+        context = contextvars.copy_context()
+
+        if key is None:
+            return self._executor.submit(context.run, function, *args, **kwargs)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+
+            future = self._executor.submit(context.run, function, *args, **kwargs)
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    @staticmethod
+    def _run_now(function: Callable, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+
+        except BaseException as error:
+            future.set_exception(error)
+
+        return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def run(self, function: Callable, *args, key: Hashable or None = None, **kwargs):
+        """
+        This function is the asyncio version of submit(), it waits for the result without blocking the event loop.
+
+        Args:
+            function:
+                It is the function to be called in the terminal thread with args and kwargs.
+
+            key:
+                It identifies the request to coalesce identical requests, see submit().
+
+        Returns:
+            It returns the result of the function.
+        """
+        return await asyncio.wrap_future(self.submit(key, function, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        It stops the terminal thread after the scheduled requests are finished.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> TerminalWorker:
+    """
+    Returns:
+        It returns the TerminalWorker shared by all the classes of this package, it is created in the first call.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TerminalWorker()
+
+        return _worker
@@ -1,10 +1,47 @@
+import sys
+
 import pytest
 
+from metatrader5EasyT.simulator import Simulator
+
 
 def pytest_addoption(parser):
     parser.addoption("--environment", action="store", choices=("local", "actions"), default="actions")
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "simulator(**kwargs): the arguments of the Simulator of the simulator fixture")
+
+
 @pytest.fixture(scope="session")
 def get_environment(pytestconfig):
     return pytestconfig.getoption("environment")
+
+
+def _invalidate_symbol_cache() -> None:
+    # The module imports MetaTrader5, it is not imported here, so the tests of the simulator run without the package.
+    # When it was not imported by a test nothing is cached.
+    symbol_info = sys.modules.get("metatrader5EasyT.symbol_info")
+    if symbol_info is not None:
+        symbol_info.symbol_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def clear_symbol_cache():
+    _invalidate_symbol_cache()
+    yield
+    _invalidate_symbol_cache()
+
+
+@pytest.fixture
+def simulator(request):
+    """
+    It installs a Simulator in place of Metatrader5 with the arguments of the closest simulator marker, and uninstalls
+    it after the test. A module gives its symbols once and a test can still give its own:
+
+        pytestmark = pytest.mark.simulator(symbols=["EURUSD", "GBPUSD"], history_minutes=1)
+    """
+    marker = request.node.get_closest_marker("simulator")
+    simulator = Simulator(**(marker.kwargs if marker is not None else {})).install()
+    yield simulator
+    simulator.uninstall()
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from metatrader5EasyT.aggregator import BarAggregator
+from metatrader5EasyT.resample import Period
+from metatrader5EasyT.tick import Tick
+from metatrader5EasyT.timeframe import TimeFrame
+
+pytestmark = pytest.mark.simulator(symbols=["EURUSD"], tick_rate=20, history_minutes=100, start_time=1640995200)
+
+
+class TestBarAggregator:
+    def test_bars_match_the_terminal(self, simulator):
+        timeframe = TimeFrame()
+        eurusd_tick = Tick("EURUSD", capacity=100000)
+        aggregator = BarAggregator("EURUSD", [timeframe.ONE_MINUTE, timeframe.FIVE_MINUTES, Period(90)])
+        eurusd_tick.update_ticks()
+        simulator.advance(1)
+        aggregator.update(eurusd_tick.update_ticks())
+
+        closed = []
+        for _ in range(60 * 12):
+            simulator.advance(1)
+            closed.append(aggregator.update(eurusd_tick.update_ticks()))
+
+        calls = simulator.calls["copy_rates_from_pos"]
+        terminal = simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 0, 12)
+        minutes = aggregator.bars(timeframe.ONE_MINUTE)
+        assert np.array_equal(minutes[-12:-1], terminal[:-1])
+        for name in ("time", "open", "high", "low", "close", "tick_volume"):
+            assert minutes[-1][name] == terminal[-1][name]
+
+        assert aggregator.forming(timeframe.ONE_MINUTE)["close"] == eurusd_tick.bid
+        assert aggregator.forming(timeframe.FIVE_MINUTES)["time"] == 1640995200 + 10 * 60
+        assert len(aggregator.closed(Period(90))) == 8
+
+        # The terminal is called only when a bar of Metatrader5 closes.
+        minutes_closed = sum(timeframe.ONE_MINUTE in bars for bars in closed)
+        assert minutes_closed == 12
+        assert calls == minutes_closed + sum(timeframe.FIVE_MINUTES in bars for bars in closed)
+
+    def test_reconcile_replaces_the_local_bars(self, simulator):
+        timeframe = TimeFrame()
+        aggregator = BarAggregator("EURUSD", [timeframe.ONE_MINUTE])
+        simulator.advance(130)
+        ticks = simulator.copy_ticks_from("EURUSD", 1640995200, 100000, simulator.COPY_TICKS_ALL)
+        ticks["bid"][0] = 100.0
+
+        closed = aggregator.update(ticks)
+
+        assert closed[timeframe.ONE_MINUTE]["high"].max() < 100.0
+        assert np.array_equal(
+            aggregator.closed(timeframe.ONE_MINUTE),
+            simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 1, 2),
+        )
+
+    def test_closed_bars_are_selected_by_time(self, simulator):
+        timeframe = TimeFrame()
+        aggregator = BarAggregator("EURUSD", [timeframe.ONE_MINUTE])
+        simulator.advance(190)
+        ticks = simulator.copy_ticks_from("EURUSD", 1640995200, 100000, simulator.COPY_TICKS_ALL)
+        # The ticks of the second minute were missed, the terminal has one more bar than the local ones.
+        minute = ticks["time_msc"] // 60000 - 1640995200 // 60
+        ticks = ticks[minute != 1]
+
+        closed = aggregator.update(ticks)
+
+        assert np.array_equal(
+            closed[timeframe.ONE_MINUTE], simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 1, 3)
+        )
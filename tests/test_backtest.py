@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from metatrader5EasyT.backtest import REASON_END
+from metatrader5EasyT.backtest import REASON_SIGNAL
+from metatrader5EasyT.backtest import REASON_STOP_LOSS
+from metatrader5EasyT.backtest import REASON_TAKE_PROFIT
+from metatrader5EasyT.backtest import Backtest
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.tick import TICK_DTYPE
+
+
+def random_bars(size, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0002, size)), 5)
+    bars = np.zeros(size, dtype=RATES_DTYPE)
+    bars["time"] = 1640995200 + np.arange(size) * 60
+    bars["open"] = np.concatenate(([close[0]], close[:-1]))
+    bars["high"] = np.maximum(bars["open"], close) + np.round(np.abs(rng.normal(0, 0.0001, size)), 5)
+    bars["low"] = np.minimum(bars["open"], close) - np.round(np.abs(rng.normal(0, 0.0001, size)), 5)
+    bars["close"] = close
+    bars["spread"] = rng.integers(5, 15, size)
+    return bars
+
+
+def bars_from(prices):
+    # Every row is open, high, low, close.
+    bars = np.zeros(len(prices), dtype=RATES_DTYPE)
+    bars["time"] = np.arange(len(prices)) * 60
+    for index, name in enumerate(("open", "high", "low", "close")):
+        bars[name] = [price[index] for price in prices]
+
+    return bars
+
+
+class TestBacktest:
+    def test_fills_stops_and_spread(self):
+        bars = bars_from(
+            [
+                (1.0, 1.0, 1.0, 1.0),
+                (1.0, 1.05, 0.99, 1.02),
+                (1.02, 1.09, 1.01, 1.08),
+                (1.08, 1.2, 1.08, 1.15),
+                (1.15, 1.15, 1.15, 1.15),
+                (1.3, 1.3, 1.3, 1.3),
+                (1.3, 1.3, 1.3, 1.3),
+            ]
+        )
+        backtest = Backtest("EURUSD", bars, point=0.01, spread=1)
+        buy = np.array([1, 0, 0, 1, 0, 0, 0], dtype=bool)
+        sell = np.array([0, 0, 0, 0, 0, 0, 1], dtype=bool)
+
+        trades = backtest.run_signals(buy, sell, stop_loss=0.5, take_profit=0.1).trades
+
+        # The buy is filled at the ask of the next open, the take profit is hit in the third bar.
+        assert trades[0]["price_open"] == pytest.approx(1.01)
+        assert trades[0]["tp"] == pytest.approx(1.11)
+        assert trades[0]["price_close"] == pytest.approx(1.11)
+        assert trades[0]["reason"] == REASON_TAKE_PROFIT
+        # The second buy gaps over its take profit and is closed at the open, the last sell is never filled.
+        assert trades[1]["price_close"] == pytest.approx(1.3)
+        assert trades[1]["profit"] == pytest.approx(1.3 - 1.16)
+        assert len(trades) == 2
+
+        sell = np.array([1, 0, 0, 0, 0, 0, 0], dtype=bool)
+        trades = backtest.run_signals(np.zeros(7, dtype=bool), sell, stop_loss=0.04, take_profit=1.0).trades
+        # The sell is closed at the ask, the stop loss is hit in the first bar.
+        assert trades["price_open"][0] == pytest.approx(1.0)
+        assert trades["price_close"][0] == pytest.approx(1.04)
+        assert trades["reason"].tolist() == [REASON_STOP_LOSS]
+
+        close = np.array([0, 0, 0, 0, 1, 0, 0], dtype=bool)
+        result = backtest.run_signals(buy, ~buy, stop_loss=1.0, take_profit=1.0, close=close)
+        assert result.trades["reason"].tolist() == [REASON_SIGNAL, REASON_END]
+        assert result.trades["type"].tolist() == [0, 1]
+
+    @pytest.mark.simulator(symbols=["EURUSD"], history_minutes=1)
+    def test_tick_types_match_the_live_tick(self, simulator):
+        from metatrader5EasyT.tick import Tick
+
+        live = Tick("EURUSD")
+        live.get_new_tick()
+        backtest_tick = Backtest("EURUSD", random_bars(10), point=0.00001).tick()
+        backtest_tick.get_new_tick()
+
+        for name in ("time", "time_msc", "bid", "ask", "last", "volume"):
+            assert type(getattr(backtest_tick, name)) is type(getattr(live, name)), name
+
+        assert backtest_tick.time == Tick.to_datetime(backtest_tick.time_msc)
+
+    def test_event_path_matches_signal_path(self):
+        bars = random_bars(20000)
+        close = bars["close"]
+        average = np.convolve(close, np.ones(20) / 20, "full")[: len(close)]
+        average[:19] = np.nan
+        buy, sell = close > average + 0.0002, close < average - 0.0002
+        exit_ = np.abs(close - average) < 0.00005
+
+        backtest = Backtest("EURUSD", bars, point=0.00001)
+        expected = backtest.run_signals(buy, sell, 0.0015, 0.003, close=exit_, lot=0.1)
+
+        rates = backtest.rates(count=20)
+        tick = backtest.tick()
+        trade = backtest.trade(lot=0.1, stop_loss=0.0015, take_profit=0.003)
+
+        def strategy():
+            rates.update_rates()
+            tick.get_new_tick()
+            # The same average of the signals, the mean of rates.close can differ in the last bit.
+            mean = average[(rates.time[-1] - bars["time"][0]) // 60]
+            assert len(rates.close) == 20
+            trade.position_open(tick.bid > mean + 0.0002, tick.bid < mean - 0.0002)
+            if abs(tick.bid - mean) < 0.00005:
+                trade.position_close()
+
+        result = backtest.run(strategy, start=19)
+
+        assert len(result.trades) > 100
+        assert {REASON_SIGNAL, REASON_STOP_LOSS, REASON_TAKE_PROFIT} <= set(result.trades["reason"].tolist())
+        for name in ("time_open", "time_close", "type", "reason"):
+            assert np.array_equal(result.trades[name], expected.trades[name])
+
+        np.testing.assert_allclose(result.trades["profit"], expected.trades["profit"], atol=1e-12)
+        assert result.summary()["trades"] == len(result.trades)
+        assert result.max_drawdown >= 0
+
+    def test_close_on_the_entry_bar(self):
+        bars = random_bars(2000, seed=1)
+        rng = np.random.default_rng(1)
+        buy = rng.random(len(bars)) < 0.05
+        sell = rng.random(len(bars)) < 0.05
+        close = rng.random(len(bars)) < 0.05
+        # The entry and the close of the same bar, the order is cancelled before it is filled.
+        buy[5], sell[5], close[5], close[20] = True, False, True, True
+        backtest = Backtest("EURUSD", bars, point=0.00001)
+        expected = backtest.run_signals(buy, sell, 0.01, 0.01, close=close)
+
+        rates = backtest.rates(count=1)
+        trade = backtest.trade(lot=1.0, stop_loss=0.01, take_profit=0.01)
+
+        def strategy():
+            rates.update_rates()
+            index = (rates.time[-1] - bars["time"][0]) // 60
+            trade.position_open(buy[index], sell[index])
+            if close[index]:
+                trade.position_close()
+
+        result = backtest.run(strategy)
+
+        assert ((buy != sell) & close).sum() > 5
+        assert bars["time"][6] not in expected.trades["time_open"]
+        assert len(result.trades) == len(expected.trades) > 10
+        for name in ("time_open", "time_close", "type", "reason"):
+            assert np.array_equal(result.trades[name], expected.trades[name])
+
+    def test_trade_interface(self):
+        backtest = Backtest("eurusd", random_bars(10), point=0.00001)
+        trade = backtest.trade(lot=1.0, stop_loss=1.0, take_profit=1.0)
+        steps = []
+
+        def strategy():
+            steps.append(trade.position_open(True, False))
+            steps.append(trade.position_open(False, True))
+            if len(steps) == 6:
+                trade.position_close()
+                steps.append(trade.trade_direction)
+
+        result = backtest.run(strategy)
+
+        assert trade.symbol == "EURUSD"
+        assert steps[:7] == ["buy", "buy", "buy", "buy", "buy", "buy", None]
+        assert trade.normalize(1.123456) == 1.12346
+        assert result.trades["reason"].tolist() == [REASON_SIGNAL, REASON_END]
+
+    def test_ticks(self):
+        ticks = np.zeros(4, dtype=TICK_DTYPE)
+        ticks["time_msc"] = [1000, 2000, 3000, 4000]
+        ticks["bid"] = [1.0, 1.0, 1.2, 1.2]
+        ticks["ask"] = ticks["bid"] + 0.02
+
+        result = Backtest.from_ticks("EURUSD", ticks, point=0.01).run_signals(
+            [True, False, False, False], [False] * 4, 0.5, 0.1
+        )
+
+        assert result.trades["price_open"][0] == pytest.approx(1.02)
+        assert result.trades["price_close"][0] == pytest.approx(1.2)
+        assert result.trades["reason"][0] == REASON_TAKE_PROFIT
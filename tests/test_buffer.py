@@ -0,0 +1,38 @@
+import numpy as np
+
+from metatrader5EasyT.buffer import RingBuffer
+
+
+class TestRingBuffer:
+    def test_extend_keeps_last_values(self):
+        buffer = RingBuffer(capacity=5, dtype=np.int64)
+
+        for value in range(12):
+            buffer.extend(np.array([value]))
+
+        assert len(buffer) == 5
+        assert buffer.view().tolist() == [7, 8, 9, 10, 11]
+
+    def test_view_is_contiguous_and_zero_copy(self):
+        buffer = RingBuffer(capacity=4, dtype=np.float64)
+        buffer.extend(np.arange(3, dtype=np.float64))
+
+        view = buffer.view()
+
+        assert view.flags["C_CONTIGUOUS"]
+        assert np.shares_memory(view, buffer._data)
+
+    def test_truncate_overwrites_last_values(self):
+        buffer = RingBuffer(capacity=4, dtype=np.int64)
+        buffer.extend(np.array([1, 2, 3]))
+
+        buffer.truncate(1)
+        buffer.extend(np.array([30, 4]))
+
+        assert buffer.view().tolist() == [1, 2, 30, 4]
+
+    def test_extend_bigger_than_capacity(self):
+        buffer = RingBuffer(capacity=3, dtype=np.int64)
+        buffer.extend(np.arange(10))
+
+        assert buffer.view().tolist() == [7, 8, 9]
@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from metatrader5EasyT.dispatcher import OrderDispatcher
+from metatrader5EasyT.dispatcher import PRIORITY_CLOSE
+from metatrader5EasyT.dispatcher import PRIORITY_OPEN
+from metatrader5EasyT.dispatcher import PRIORITY_STOP_OUT
+from metatrader5EasyT.trade import Trade
+from metatrader5EasyT.worker import TerminalWorker
+
+pytestmark = pytest.mark.simulator(symbols=["EURUSD", "GBPUSD", "USDJPY"], history_minutes=1, start_time=1640995200)
+
+
+@pytest.fixture
+def worker():
+    worker = TerminalWorker()
+    yield worker
+    worker.shutdown()
+
+
+class TestOrderDispatcher:
+    def test_priority_order(self, worker):
+        dispatcher = OrderDispatcher(max_orders_per_second=1000, worker=worker)
+        release = threading.Event()
+        sent = []
+        dispatcher.submit(release.wait)
+
+        futures = [
+            dispatcher.submit(sent.append, "open", priority=PRIORITY_OPEN),
+            dispatcher.submit(sent.append, "close", priority=PRIORITY_CLOSE),
+            dispatcher.submit(sent.append, "second open", priority=PRIORITY_OPEN),
+            dispatcher.submit(sent.append, "stop out", priority=PRIORITY_STOP_OUT),
+        ]
+        release.set()
+        dispatcher.shutdown()
+
+        assert sent == ["stop out", "close", "open", "second open"]
+        assert all(future.done() for future in futures)
+        stats = dispatcher.stats()
+        assert stats.depth == 0
+        assert stats.max_depth >= 4
+        assert stats.sent == 5
+
+    def test_rate_limit(self, worker):
+        dispatcher = OrderDispatcher(max_orders_per_second=50, worker=worker)
+        start = time.monotonic()
+        futures = [dispatcher.submit(time.monotonic) for _ in range(60)]
+        times = [future.result() for future in futures]
+        dispatcher.shutdown()
+
+        # The first 50 are the burst, the next 10 wait 1/50 seconds each.
+        assert times[-1] - start >= 0.18
+        assert dispatcher.stats().wait_max >= 0.18
+
+    def test_failures_and_cancel(self, worker):
+        dispatcher = OrderDispatcher(max_orders_per_second=1000, worker=worker)
+        release = threading.Event()
+        sent = []
+        dispatcher.submit(release.wait)
+        cancelled = dispatcher.submit(sent.append, "cancelled")
+        failed = dispatcher.submit(int, "not a number")
+        assert cancelled.cancel()
+        release.set()
+        dispatcher.shutdown()
+
+        assert sent == []
+        with pytest.raises(ValueError):
+            failed.result()
+
+        assert dispatcher.stats().failed == 1
+        with pytest.raises(RuntimeError):
+            dispatcher.submit(sent.append, "after shutdown")
+
+    def test_trades(self, simulator, worker):
+        dispatcher = OrderDispatcher(max_orders_per_second=1000, worker=worker)
+        trades = [Trade(symbol, lot=0.1, stop_loss=0.001, take_profit=0.001) for symbol in ("EURUSD", "GBPUSD")]
+        opens = [dispatcher.open_buy(trades[0]), dispatcher.open_sell(trades[1])]
+
+        assert [future.result().retcode for future in opens] == [simulator.TRADE_RETCODE_DONE] * 2
+        assert [trade.trade_direction for trade in trades] == ["buy", "sell"]
+        assert trades[0].last_result is opens[0].result()
+
+        closes = [dispatcher.close(trade) for trade in trades]
+        assert [future.result().retcode for future in closes] == [simulator.TRADE_RETCODE_DONE] * 2
+        assert simulator.positions_get() == ()
+        # There is nothing to close.
+        assert dispatcher.close(trades[0]).result() is None
+        dispatcher.shutdown()
+
+    def test_rejected_orders_are_failed(self, simulator, worker):
+        dispatcher = OrderDispatcher(max_orders_per_second=1000, worker=worker)
+        trade = Trade("EURUSD", lot=0.1, stop_loss=0.001, take_profit=0.001)
+        assert dispatcher.open_buy(trade).result().retcode == simulator.TRADE_RETCODE_DONE
+
+        rejected = dispatcher.open_sell(Trade("GBPUSD", lot=0.0, stop_loss=0.001, take_profit=0.001))
+        assert rejected.result().retcode == simulator.TRADE_RETCODE_INVALID_VOLUME
+
+        with patch.object(simulator, "order_send", return_value=None):
+            lost = dispatcher.open_sell(Trade("USDJPY", lot=0.1, stop_loss=0.001, take_profit=0.001))
+            with pytest.raises(RuntimeError):
+                lost.result()
+
+        dispatcher.shutdown()
+        stats = dispatcher.stats()
+        assert (stats.sent, stats.failed) == (1, 2)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            OrderDispatcher(max_orders_per_second=0)
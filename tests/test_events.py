@@ -0,0 +1,65 @@
+import pytest
+
+from metatrader5EasyT.events import EventEngine
+from metatrader5EasyT.timeframe import TimeFrame
+
+pytestmark = pytest.mark.simulator(
+    symbols=["EURUSD", "GBPUSD"], tick_rate=10, history_minutes=100, start_time=1640995200
+)
+
+
+class TestEventEngine:
+    def test_callbacks_only_when_something_changed(self, simulator):
+        timeframe = TimeFrame()
+        engine = EventEngine()
+        engine.subscribe("EURUSD", [timeframe.ONE_MINUTE])
+        engine.subscribe("GBPUSD")
+        ticks, bars = [], []
+        engine.on_tick(lambda symbol, tick: ticks.append((symbol, tick.time_msc)))
+        engine.on_bar_close(lambda symbol, tf, rates: bars.append((symbol, tf, int(rates.time[-2]))))
+
+        assert engine.poll() == 2
+        assert engine.poll() == 0
+        # The history ends one second before the start, the first tick closes its last bar.
+        simulator.advance(1)
+        assert engine.poll() == 3
+        calls = simulator.calls["copy_rates_from_pos"]
+
+        for _ in range(58):
+            simulator.advance(1)
+            engine.poll()
+
+        # No bar closed, Rates was not updated.
+        assert simulator.calls["copy_rates_from_pos"] == calls
+        assert len(bars) == 1
+
+        simulator.advance(2)
+        assert engine.poll() == 3
+        assert bars == [("EURUSD", timeframe.ONE_MINUTE, 1640995140), ("EURUSD", timeframe.ONE_MINUTE, 1640995200)]
+        assert len(ticks) == 2 * 61
+
+    def test_position_change(self, simulator):
+        engine = EventEngine()
+        changes = []
+        engine.on_position_change(changes.append)
+        request = {"action": simulator.TRADE_ACTION_DEAL, "symbol": "EURUSD", "volume": 0.1, "type": 0}
+
+        assert engine.poll() == 0
+        simulator.order_send(request)
+        assert engine.poll() == 1
+        simulator.advance(1)
+        assert engine.poll() == 0
+
+        ticket = changes[0][0].ticket
+        simulator.order_send({"action": simulator.TRADE_ACTION_SLTP, "symbol": "EURUSD", "position": ticket, "sl": 1.0})
+        simulator.advance(1)
+        # The new stop loss is a change of the position.
+        assert engine.poll() == 1
+        assert changes[1][0].ticket == ticket
+        assert changes[1][0].sl == 1.0
+
+        simulator.order_send({**request, "type": 1, "position": ticket})
+        simulator.advance(1)
+        assert engine.poll() == 1
+
+        assert [len(positions) for positions in changes] == [1, 1, 0]
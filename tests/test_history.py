@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import MetaTrader5
+import numpy as np
+
+from metatrader5EasyT.history import HistoryCache
+from metatrader5EasyT.rates import RATES_DTYPE
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+def fake_history(size):
+    history = np.zeros(size, dtype=RATES_DTYPE)
+    history["time"] = np.arange(size) * 60
+    history["close"] = np.arange(size)
+    return history
+
+
+class TestHistoryCache:
+    def test_append_overwrites_the_last_bar(self, tmp_path):
+        cache = HistoryCache(str(tmp_path))
+        history = fake_history(10)
+
+        cache.append("EURUSD", 1, history[:5])
+        forming = history[4:7].copy()
+        forming["close"][0] = -1
+        stored = cache.append("EURUSD", 1, forming)
+
+        assert isinstance(stored, np.memmap)
+        assert stored["time"].tolist() == history["time"][:7].tolist()
+        assert stored["close"].tolist() == [0, 1, 2, 3, -1, 5, 6]
+        assert len(HistoryCache(str(tmp_path)).load("eurusd", 1)) == 7
+
+    def test_the_mapped_file_never_shrinks(self, tmp_path):
+        cache = HistoryCache(str(tmp_path))
+        history = fake_history(10)
+        cache.append("EURUSD", 1, history)
+        mapped = cache.load("EURUSD", 1)
+
+        # The bars after the new ones are kept, the file is overwritten in place.
+        update = history[3:5].copy()
+        update["close"] = -1
+        stored = cache.append("EURUSD", 1, update)
+        assert stored["close"].tolist() == [0, 1, 2, -1, -1, 5, 6, 7, 8, 9]
+        assert mapped["close"][3] == -1
+
+        # A bar that no longer exists makes the history shorter, it is written in a new file.
+        update = history[[3, 5]].copy()
+        stored = cache.append("EURUSD", 1, update)
+        assert stored["time"].tolist() == [0, 60, 120, 180, 300, 360, 420, 480, 540]
+        assert len(mapped) == 10
+        assert mapped["close"].tolist() == [0, 1, 2, -1, -1, 5, 6, 7, 8, 9]
+
+    def test_load_without_history(self, tmp_path):
+        assert len(HistoryCache(str(tmp_path)).load("EURUSD", 1)) == 0
+
+    def test_rates_fetch_only_new_bars_after_restart(self, tmp_path):
+        history = fake_history(100)
+        available = {"bars": 50}
+
+        def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+            end = available["bars"] - start_pos
+            return history[max(0, end - count) : end].copy()
+
+        timeframe = TimeFrame()
+        with patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos) as mock:
+            rates = Rates("EURUSD", timeframe.ONE_MINUTE, 20, history=HistoryCache(str(tmp_path)))
+            rates.update_rates()
+            assert mock.call_args.args[3] == 20
+
+            available["bars"] = 90
+            restarted = Rates("EURUSD", timeframe.ONE_MINUTE, 20, history=HistoryCache(str(tmp_path)))
+            restarted.update_rates()
+
+        assert restarted.close.tolist() == list(range(70, 90))
+        assert len(HistoryCache(str(tmp_path)).load("EURUSD", timeframe.ONE_MINUTE)) == 60
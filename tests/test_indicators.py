@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from metatrader5EasyT.indicators import ATR
+from metatrader5EasyT.indicators import EMA
+from metatrader5EasyT.indicators import RSI
+from metatrader5EasyT.indicators import SMA
+from metatrader5EasyT.indicators import Bollinger
+from metatrader5EasyT.indicators import Indicator
+from metatrader5EasyT.indicators import IndicatorSet
+from metatrader5EasyT.indicators import get_indicators
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+def random_bars(size, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, size))
+    bars = np.zeros(size, dtype=RATES_DTYPE)
+    bars["time"] = 1640995200 + np.arange(size) * 60
+    bars["open"] = np.concatenate(([close[0]], close[:-1]))
+    bars["high"] = np.maximum(bars["open"], close) + np.abs(rng.normal(0, 0.0001, size))
+    bars["low"] = np.minimum(bars["open"], close) - np.abs(rng.normal(0, 0.0001, size))
+    bars["close"] = close
+    return bars
+
+
+def reference_ema(values, alpha, period):
+    result = np.full(len(values), np.nan)
+    result[period - 1] = values[:period].mean()
+    for i in range(period, len(values)):
+        result[i] = result[i - 1] + alpha * (values[i] - result[i - 1])
+    return result
+
+
+def make_set():
+    indicators = IndicatorSet("EURUSD", 1)
+    return indicators, [
+        indicators.sma(20),
+        indicators.ema(10),
+        indicators.rsi(14),
+        indicators.atr(14),
+        indicators.bollinger(20, 2),
+    ]
+
+
+def as_float(values):
+    return values.view(np.float64) if values.dtype.names else values
+
+
+class TestIndicators:
+    def test_incremental_matches_warm_up(self):
+        bars = random_bars(400)
+        incremental, indicators = make_set()
+        incremental.update(bars[:100])
+        for end in range(101, 401):
+            incremental.update(bars[:end])
+
+        warm, expected = make_set()
+        warm.update(bars)
+
+        for indicator, reference in zip(indicators, expected):
+            np.testing.assert_allclose(as_float(indicator.values), as_float(reference.values), rtol=1e-9)
+            assert len(indicator.values) == 399
+
+        # The value with the forming bar is the value of the bar once it is closed.
+        closing, closed = make_set()
+        closing.update(np.concatenate((bars, bars[-1:])))
+        for indicator, reference in zip(indicators, closed):
+            np.testing.assert_allclose(
+                as_float(np.array([indicator.value])), as_float(reference.values[-1:]), rtol=1e-9
+            )
+
+    def test_against_reference(self):
+        bars = random_bars(3000)
+        close = bars["close"]
+        indicators = IndicatorSet("EURUSD", 1, capacity=5000)
+        sma, ema, rsi, atr, bands = (
+            indicators.sma(20),
+            indicators.ema(200),
+            indicators.rsi(14),
+            indicators.atr(3),
+            indicators.bollinger(20),
+        )
+        indicators.update(np.concatenate((bars, bars[-1:])))
+
+        np.testing.assert_allclose(sma.values[19:], np.convolve(close, np.ones(20) / 20, "valid"))
+        np.testing.assert_allclose(ema.values, reference_ema(close, 2 / 201, 200), rtol=1e-12)
+        np.testing.assert_allclose(bands.values["upper"][-1], close[-20:].mean() + 2 * close[-20:].std())
+
+        change = np.diff(close)
+        gains = reference_ema(np.maximum(change, 0), 1 / 14, 14)
+        losses = reference_ema(np.maximum(-change, 0), 1 / 14, 14)
+        np.testing.assert_allclose(rsi.values[1:], 100 - 100 / (1 + gains / losses), rtol=1e-9)
+        assert np.all((rsi.values[15:] > 0) & (rsi.values[15:] < 100))
+
+        previous = np.concatenate((close[:1], close[:-1]))
+        true_range = np.maximum(bars["high"], previous) - np.minimum(bars["low"], previous)
+        np.testing.assert_allclose(atr.values, reference_ema(true_range, 1 / 3, 3), rtol=1e-9)
+
+    def test_late_update_and_new_indicator(self):
+        bars = random_bars(300)
+        indicators = IndicatorSet("EURUSD", 1, capacity=100)
+        sma = indicators.sma(5)
+        indicators.update(bars[:100])
+        # More bars than the rates window closed since the last update.
+        indicators.update(bars[150:250])
+        ema = indicators.ema(5)
+        indicators.update(bars[151:251])
+
+        assert sma.values[-1] == pytest.approx(bars["close"][245:250].mean())
+        assert len(ema.values) == 99
+        assert np.isnan(sma.values[0:4]).all()
+
+    def test_indicators_implement_the_abstract_methods(self):
+        class Close(Indicator):
+            def _warm_up(self, bars):
+                return bars["close"]
+
+            def _push(self, bar):
+                return bar["close"]
+
+        with pytest.raises(TypeError):
+            Close(10)
+
+    @pytest.mark.simulator(symbols=["EURUSD"], history_minutes=1000)
+    def test_shared_by_symbol_timeframe_and_count(self, simulator):
+        timeframe = TimeFrame()
+        first = Rates("EURUSD", timeframe.ONE_MINUTE, 500, incremental=True)
+        second = Rates("eurusd", timeframe.ONE_MINUTE, 500)
+        rsi = first.indicators.rsi()
+        first.update_rates()
+
+        assert second.indicators.rsi() is rsi
+        assert get_indicators("EURUSD", timeframe.FIVE_MINUTES, count=500) is not first.indicators
+        # A shorter window would warm the indicators up with fewer bars, it has its own.
+        assert Rates("EURUSD", timeframe.ONE_MINUTE, 20).indicators is not first.indicators
+        assert len(rsi.values) == 499
+
+        simulator.advance(120)
+        first.update_rates()
+        assert len(rsi.values) == 501
+        assert rsi.values[-1] == pytest.approx(reference_rsi(first.close[:-1]))
+
+
+def reference_rsi(close, period=14):
+    change = np.diff(close)
+    gains = reference_ema(np.maximum(change, 0), 1 / period, period)
+    losses = reference_ema(np.maximum(-change, 0), 1 / period, period)
+    return 100 - 100 / (1 + gains[-1] / losses[-1])
@@ -1,3 +1,4 @@
+from unittest.mock import MagicMock
 from unittest.mock import patch
 from unittest.mock import PropertyMock
 
@@ -6,6 +7,9 @@ import pytest
 
 from metatrader5EasyT.initialization import Initialize
 from metatrader5EasyT.initialization import PlatformNotInitialized
+from metatrader5EasyT.initialization import SYMBOL_NOT_FOUND
+from metatrader5EasyT.initialization import SYMBOL_NOT_SELECTED
+from metatrader5EasyT.initialization import SYMBOL_OK
 from metatrader5EasyT.initialization import SymbolNotFound
 
 
@@ -43,9 +47,61 @@ class TestInitialization:
         result = Initialize().initialize_symbol(symbol)
         assert result is True
 
+    @patch.object(MetaTrader5, "symbol_select")
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_initialize_symbol_many(self, mock_symbol_info, mock_symbol_select):
+        initialize = Initialize()
+
+        # Every symbol is initialized, not only the first one.
+        assert initialize.initialize_symbol("EURUSD", "gbpusd", "USDJPY") is True
+        assert [call.args[0] for call in mock_symbol_select.call_args_list] == ["EURUSD", "GBPUSD", "USDJPY"]
+        assert initialize.symbol_initialized == ["EURUSD", "GBPUSD", "USDJPY"]
+
     @patch("tests.test_initialization.Initialize", side_effect=SymbolNotFound)
     def test_initialize_symbol_fail(self, mock):
         symbol = "eur usd"
 
         with pytest.raises(SymbolNotFound):
             Initialize().initialize_symbol(symbol)
+
+    # ------------------------------ Symbols in bulk ------------------------------ #
+
+    @patch.object(MetaTrader5, "symbol_select")
+    @patch.object(MetaTrader5, "symbols_get")
+    def test_initialize_symbols_report(self, mock_symbols_get, mock_symbol_select):
+        eurusd = MagicMock(visible=True)
+        eurusd.name = "EURUSD"
+        gbpusd = MagicMock(visible=False)
+        gbpusd.name = "GBPUSD"
+        usdjpy = MagicMock(visible=False)
+        usdjpy.name = "USDJPY"
+        mock_symbols_get.return_value = (eurusd, gbpusd, usdjpy)
+        mock_symbol_select.side_effect = lambda symbol, enable: symbol == "GBPUSD"
+
+        initialize = Initialize()
+        report = initialize.initialize_symbols("eurusd", "GBPUSD", "USDJPY", "gbpusd", "EUR USD")
+
+        assert mock_symbols_get.call_count == 1
+        # GBPUSD is given twice, it is selected once.
+        assert [call.args[0] for call in mock_symbol_select.call_args_list] == ["GBPUSD", "USDJPY"]
+        assert list(report) == ["EURUSD", "GBPUSD", "USDJPY", "EUR USD"]
+        assert report["EURUSD"].status == SYMBOL_OK
+        assert report["GBPUSD"].status == SYMBOL_OK
+        assert report["USDJPY"].status == SYMBOL_NOT_SELECTED
+        assert report["EUR USD"].status == SYMBOL_NOT_FOUND
+        assert report["EURUSD"].latency == 0.0
+        assert report["EUR USD"].latency == 0.0
+        assert report["GBPUSD"].latency >= 0.0
+        assert initialize.symbol_initialized == ["EURUSD", "GBPUSD"]
+
+    @patch.object(MetaTrader5, "symbol_select")
+    @patch.object(MetaTrader5, "symbols_get")
+    def test_initialize_symbols_group(self, mock_symbols_get, mock_symbol_select):
+        eurusd = MagicMock(visible=True)
+        eurusd.name = "EURUSD"
+        mock_symbols_get.return_value = (eurusd,)
+
+        report = Initialize().initialize_symbols(group="*USD*")
+
+        mock_symbols_get.assert_called_once_with("*USD*")
+        assert report["EURUSD"].status == SYMBOL_OK
@@ -0,0 +1,109 @@
+import atexit
+import logging
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from metatrader5EasyT import log
+from metatrader5EasyT.log import _DeferredQueueHandler
+from metatrader5EasyT.log import _log_directly_after_fork
+from metatrader5EasyT.log import get_log_manager
+from metatrader5EasyT.log import start_queue_logging
+from metatrader5EasyT.log import stop_queue_logging
+from metatrader5EasyT.tick import Tick
+
+
+class TestLog:
+    def test_log_manager_is_shared(self):
+        get_log_manager()
+        handlers = len(logging.getLogger().handlers)
+
+        Tick("EURUSD")
+        Tick("GBPUSD")
+
+        assert Tick("EURUSD")._log is get_log_manager()
+        assert len(logging.getLogger().handlers) == handlers
+
+    def test_records_are_written_by_the_background_thread(self):
+        get_log_manager()
+        records = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                records.append((record.getMessage(), threading.current_thread() is threading.main_thread()))
+
+        handler = Handler()
+        logging.getLogger().addHandler(handler)
+        start_queue_logging()
+        try:
+            assert all(isinstance(root, _DeferredQueueHandler) for root in logging.getLogger().handlers)
+            get_log_manager().logger.warning("%s lazy message", "A")
+            stop_queue_logging()
+            assert records == [("A lazy message", False)]
+            assert handler in logging.getLogger().handlers
+
+        finally:
+            stop_queue_logging()
+            logging.getLogger().removeHandler(handler)
+
+    def test_queue_logging_is_opt_in(self):
+        get_log_manager()
+        assert not any(isinstance(root, _DeferredQueueHandler) for root in logging.getLogger().handlers)
+
+        with patch.object(atexit, "register") as register:
+            for _ in range(3):
+                start_queue_logging()
+                stop_queue_logging()
+
+        assert register.call_count <= 1
+
+    def test_forked_child_does_not_write_the_records_of_the_parent(self):
+        get_log_manager()
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        handler = Handler()
+        logging.getLogger().addHandler(handler)
+        start_queue_logging()
+        try:
+            # The thread of the parent does not exist in the child, the record is still in the copied queue.
+            parent = log._listener
+            parent.stop()
+            parent.queue.put(logging.makeLogRecord({"msg": "written by the parent"}))
+
+            _log_directly_after_fork()
+            # The child writes its records as they are logged, it exits without atexit.
+            get_log_manager().logger.warning("written by the child")
+
+            assert log._listener is None
+            assert messages == ["written by the child"]
+
+        finally:
+            stop_queue_logging()
+            logging.getLogger().removeHandler(handler)
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="The processes are not forked on this platform.")
+    def test_forked_child_writes_its_records_before_os_exit(self, tmp_path):
+        get_log_manager()
+        handler = logging.FileHandler(tmp_path / "child.log")
+        logging.getLogger().addHandler(handler)
+        start_queue_logging()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                get_log_manager().logger.warning("written by the child")
+                os._exit(0)
+
+            os.waitpid(pid, 0)
+
+        finally:
+            stop_queue_logging()
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+
+        assert "written by the child" in (tmp_path / "child.log").read_text()
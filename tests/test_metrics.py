@@ -0,0 +1,75 @@
+import urllib.request
+
+import numpy as np
+import pytest
+
+from metatrader5EasyT import metrics
+from metatrader5EasyT.metrics import LatencyHistogram
+from metatrader5EasyT.metrics import MetricsRegistry
+
+
+class TestLatencyHistogram:
+    def test_percentiles_error_is_below_one_percent(self):
+        values = np.random.default_rng(0).lognormal(11, 2, 100000).astype(np.int64)
+        histogram = LatencyHistogram()
+        for value in values.tolist():
+            histogram.record(value)
+
+        for quantile in (0.5, 0.9, 0.99, 0.999):
+            expected = np.quantile(values, quantile)
+            assert abs(histogram.percentile(quantile) - expected) <= expected * 0.01 + 1
+
+        assert histogram.count == len(values)
+        assert histogram.max == values.max()
+
+
+class TestMetrics:
+    @pytest.mark.simulator(symbols=["EURUSD"], history_minutes=10)
+    def test_enable_records_calls_and_errors(self, simulator):
+        from metatrader5EasyT import symbol_info
+        from metatrader5EasyT import tick
+        from metatrader5EasyT.tick import Tick
+
+        registry = MetricsRegistry()
+        try:
+            metrics.enable(registry)
+            Tick("EURUSD").get_new_tick()
+            Tick("EURUSD").get_new_tick()
+            assert symbol_info.Mt5.symbol_info("XXXXXX") is None
+            assert symbol_info.Mt5.shutdown() is None
+            metrics.disable()
+            Tick("EURUSD").get_new_tick()
+
+        finally:
+            metrics.disable()
+
+        snapshot = registry.snapshot()
+        assert snapshot["symbol_info_tick"]["count"] == 2
+        assert snapshot["symbol_info_tick"]["errors"] == {}
+        assert 0 < snapshot["symbol_info_tick"]["p50"] <= snapshot["symbol_info_tick"]["max"]
+        assert snapshot["symbol_info"]["errors"] == {simulator.RES_E_NOT_FOUND: 1}
+        # The code of the failure was read with one more call, it is recorded too.
+        assert snapshot["last_error"]["count"] == simulator.calls["last_error"] == 1
+        assert simulator.calls["symbol_info_tick"] == 3
+        # shutdown always returns None, it is not a failure.
+        assert snapshot["shutdown"] == {**snapshot["shutdown"], "count": 1, "errors": {}}
+        # disable() gives the modules their Metatrader5 back.
+        assert tick.Mt5 is simulator
+
+    def test_prometheus_endpoint(self):
+        registry = MetricsRegistry()
+        registry.record("order_send", 1500000)
+        registry.record("order_send", 2500000, 10013)
+
+        server = metrics.start_http_server(0, "127.0.0.1", registry)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+                body = response.read().decode()
+
+        finally:
+            server.shutdown()
+
+        assert 'metatrader5_calls_total{function="order_send"} 2' in body
+        assert 'metatrader5_errors_total{function="order_send",code="10013"} 1' in body
+        assert 'metatrader5_call_latency_seconds_count{function="order_send"} 2' in body
+        assert 'metatrader5_call_latency_seconds{function="order_send",quantile="0.99"}' in body
@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+import pytest
+
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.trade import Trade
+
+SYMBOLS = [f"SYMBOL{index}" for index in range(150)]
+
+
+pytestmark = pytest.mark.simulator(symbols=["EURUSD", "GBPUSD"] + SYMBOLS, history_minutes=1, start_time=1640995200)
+
+
+def deal(simulator, symbol: str, order_type: int, volume: float = 0.1, position: int = 0):
+    request = {"action": simulator.TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume, "type": order_type}
+    if position:
+        request["position"] = position
+
+    return simulator.order_send(request)
+
+
+class TestPositionBook:
+    def test_deltas(self, simulator):
+        book = PositionBook()
+        deal(simulator, "EURUSD", 0)
+        deal(simulator, "EURUSD", 1)
+        deal(simulator, "GBPUSD", 0, volume=0.3)
+
+        delta = book.refresh()
+        assert len(delta.opened) == 3
+        assert len(delta.closed) == 0 and len(delta.modified) == 0
+        # The hedged positions of a symbol are all kept.
+        assert [position.type for position in book.positions("eurusd")] == [0, 1]
+        assert book.net_volume() == {"EURUSD": 0.0, "GBPUSD": 0.3}
+
+        assert not book.refresh()
+        simulator.advance(1)
+        # The profit changed, but the positions did not.
+        assert not book.refresh()
+
+        buy, sell = book.positions("EURUSD")
+        simulator.order_send(
+            {"action": simulator.TRADE_ACTION_SLTP, "symbol": "EURUSD", "position": buy.ticket, "sl": 1.0}
+        )
+        deal(simulator, "EURUSD", 0, position=sell.ticket)
+
+        delta = book.refresh()
+        assert delta.closed["ticket"].tolist() == [sell.ticket]
+        assert delta.modified["ticket"].tolist() == [buy.ticket]
+        assert delta.modified["sl"].tolist() == [1.0]
+        assert len(delta.opened) == 0
+        assert book.position(sell.ticket) is None
+        assert book.rows("EURUSD")["ticket"].tolist() == [buy.ticket]
+        assert len(book.rows("USDJPY")) == 0
+
+    def test_symbols_in_any_case(self, simulator):
+        deal(simulator, "EURUSD", 1)
+        broker_position = simulator.positions_get()[0]._replace(symbol="EURUSDm")
+        symbol_info = simulator.symbol_info("EURUSD")
+        with patch.object(simulator, "positions_get", return_value=(broker_position,)), patch.object(
+            simulator, "symbol_info", return_value=symbol_info
+        ):
+            book = PositionBook()
+            trade = Trade("EURUSDm", lot=0.1, stop_loss=0.001, take_profit=0.001, book=book)
+
+        assert trade.trade_direction == "sell"
+        assert book.positions("eurusdm") == (broker_position,)
+        assert len(book.rows("EURUSDM")) == 1
+        # The terminal name is kept, it is the one sent in the orders.
+        assert book.symbols == ["EURUSDm"]
+        assert book.net_volume() == {"EURUSDm": -0.1}
+
+    def test_readers_refresh_when_stale(self, simulator):
+        now = [0.0]
+        book = PositionBook(max_age=1.0, clock=lambda: now[0])
+        assert book.positions() == ()
+        deal(simulator, "EURUSD", 0)
+
+        # The positions are read once per max_age, or after invalidate().
+        assert book.positions() == ()
+        now[0] = 1.0
+        assert len(book.positions()) == 1
+        deal(simulator, "GBPUSD", 0)
+        book.invalidate()
+        assert len(book.positions()) == 2
+        assert simulator.calls["positions_get"] == 3
+
+    def test_one_call_per_cycle_for_all_trades(self, simulator):
+        book = PositionBook()
+        trades = [Trade(symbol, lot=0.1, stop_loss=0.001, take_profit=0.001, book=book) for symbol in SYMBOLS]
+        deal(simulator, SYMBOLS[0], 1)
+        deal(simulator, SYMBOLS[1], 0)
+        calls = simulator.calls["positions_get"]
+
+        book.refresh()
+        for trade in trades:
+            trade.position_check()
+
+        assert simulator.calls["positions_get"] == calls + 1
+        assert [trade.trade_direction for trade in trades[:3]] == ["sell", "buy", None]
+
+    def test_trade_sees_its_own_order(self, simulator):
+        book = PositionBook()
+        trade = Trade("EURUSD", lot=0.1, stop_loss=0.001, take_profit=0.001, book=book)
+        trade._trade_allowed = True
+
+        assert trade.position_open(True, False) == "buy"
+        # The order invalidated the book, the position is read before it is closed.
+        trade.position_close()
+        assert trade.trade_direction is None
+        assert simulator.positions_get() == ()
+        book.refresh()
+        assert book.positions("EURUSD") == ()
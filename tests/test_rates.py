@@ -1,11 +1,30 @@
 from unittest.mock import patch
 
 import MetaTrader5
+import numpy as np
+import pytest
 
 from metatrader5EasyT.rates import Rates
 from metatrader5EasyT.timeframe import TimeFrame
 
 
+def fake_history(size):
+    dtype = [
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("tick_volume", "<u8"),
+        ("spread", "<i4"),
+        ("real_volume", "<u8"),
+    ]
+    history = np.zeros(size, dtype=dtype)
+    history["time"] = np.arange(size) * 60
+    history["close"] = np.arange(size)
+    return history
+
+
 class TestRates:
     def test_rates_created_but_not_updated(self):
         symbol = "EURUSD"
@@ -48,3 +67,102 @@ class TestRates:
         assert len(rates.low) == 20
         assert len(rates.close) == 20
         assert len(rates.tick_volume) == 20
+
+    def test_incremental_fetches_only_new_bars(self):
+        history = fake_history(100)
+        available = {"bars": 50}
+
+        def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+            end = available["bars"] - start_pos
+            return history[max(0, end - count) : end].copy()
+
+        timeframe = TimeFrame()
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20, incremental=True)
+
+        with patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos) as mock:
+            rates.update_rates()
+            close = rates.close
+
+            available["bars"] = 53
+            rates.update_rates()
+
+            assert mock.call_args.args[3] < 20
+            assert rates.close.tolist() == list(range(33, 53))
+            assert rates.time.tolist() == (history["time"][33:53]).tolist()
+            assert np.shares_memory(close, rates.close)
+
+    def test_fields_are_views_of_the_rates(self):
+        history = fake_history(20)
+        timeframe = TimeFrame()
+
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20)
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=history):
+            rates.update_rates()
+
+        assert rates.rates is history
+        assert len(rates.spread) == 20
+        assert len(rates.real_volume) == 20
+        assert np.shares_memory(rates.close, history)
+
+    def test_fields_can_be_assigned(self):
+        history = fake_history(20)
+        timeframe = TimeFrame()
+
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20)
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=history):
+            rates.update_rates()
+            rates.close = [1.0, 2.0]
+            assert rates.close == [1.0, 2.0]
+            assert len(rates.open) == 20
+
+            # The next update replaces the assigned value.
+            rates.update_rates()
+            assert np.shares_memory(rates.close, history)
+
+    def test_failed_update_keeps_the_assigned_fields(self):
+        timeframe = TimeFrame()
+
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20)
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=fake_history(20)):
+            rates.update_rates()
+
+        rates.close = [1.0, 2.0]
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=None), patch.object(
+            MetaTrader5, "last_error", return_value=(-1, "Terminal: Call failed")
+        ):
+            rates.update_rates()
+
+        assert rates.close == [1.0, 2.0]
+
+    def test_failed_update_keeps_the_rates(self):
+        history = fake_history(20)
+        timeframe = TimeFrame()
+
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20)
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=history):
+            rates.update_rates()
+
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=None), patch.object(
+            MetaTrader5, "last_error", return_value=(-10004, "No IPC connection")
+        ) as mock_last_error:
+            rates.update_rates()
+
+        assert mock_last_error.call_count == 1
+        assert rates.rates is history
+
+    def test_as_frame_is_built_once_per_update(self):
+        pytest.importorskip("pandas")
+        timeframe = TimeFrame()
+
+        rates = Rates(symbol="EURUSD", timeframe=timeframe.ONE_MINUTE, count=20)
+        assert rates.as_frame() is None
+
+        with patch.object(MetaTrader5, "copy_rates_from_pos", return_value=fake_history(20)):
+            rates.update_rates()
+            frame = rates.as_frame()
+
+            assert rates.as_frame() is frame
+            assert frame["close"].tolist() == list(range(20))
+
+            rates.update_rates()
+            assert rates.as_frame() is not frame
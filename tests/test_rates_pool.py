@@ -0,0 +1,96 @@
+import threading
+from unittest.mock import patch
+
+import MetaTrader5
+import numpy as np
+
+from metatrader5EasyT.rates_pool import RatesPool
+from metatrader5EasyT.timeframe import TimeFrame
+from metatrader5EasyT.worker import TerminalWorker
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    rates = np.zeros(count, dtype=[(field, "<f8") for field in ("time", "open", "high", "low", "close", "tick_volume")])
+    rates["time"] = np.arange(count)
+    rates["close"] = np.arange(count)
+    return rates
+
+
+class TestRatesPool:
+    @patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos)
+    def test_duplicate_subscriptions_share_one_fetch(self, mock):
+        timeframe = TimeFrame()
+
+        with RatesPool(
+            [
+                ("EURUSD", timeframe.ONE_MINUTE, 20),
+                ("eurusd", timeframe.ONE_MINUTE, 5),
+                ("GBPUSD", timeframe.ONE_MINUTE, 10),
+            ]
+        ) as pool:
+            snapshot = pool.update_rates()
+
+        assert mock.call_count == 2
+        assert len(snapshot[("EURUSD", timeframe.ONE_MINUTE, 20)].close) == 20
+        assert len(snapshot[("EURUSD", timeframe.ONE_MINUTE, 5)].close) == 5
+        assert snapshot[("EURUSD", timeframe.ONE_MINUTE, 5)].close[-1] == 19
+        assert len(snapshot[("GBPUSD", timeframe.ONE_MINUTE, 10)].close) == 10
+
+    @patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos)
+    def test_old_snapshot_is_not_changed(self, mock):
+        timeframe = TimeFrame()
+
+        with RatesPool([("EURUSD", timeframe.ONE_MINUTE, 20)]) as pool:
+            first = pool.update_rates()
+            second = pool.update_rates()
+
+        assert pool.snapshot() is second
+        key = ("EURUSD", timeframe.ONE_MINUTE, 20)
+        assert not np.shares_memory(first[key].rates, second[key].rates)
+
+    @patch.object(MetaTrader5, "last_error", return_value=(-1, "Terminal call failed"))
+    @patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos)
+    def test_failed_fetch_keeps_previous_rates(self, mock, mock_last_error):
+        timeframe = TimeFrame()
+
+        with RatesPool([("EURUSD", timeframe.ONE_MINUTE, 20)]) as pool:
+            first = pool.update_rates()
+            mock.side_effect = RuntimeError
+            second = pool.update_rates()
+
+        key = ("EURUSD", timeframe.ONE_MINUTE, 20)
+        assert second[key] is first[key]
+
+    def test_fetches_run_one_by_one_in_the_terminal_thread(self):
+        timeframe = TimeFrame()
+        worker = TerminalWorker()
+        running = []
+        threads = set()
+
+        def fetch(symbol, timeframe, start_pos, count):
+            running.append(symbol)
+            assert len(running) == 1
+            threads.add(threading.get_ident())
+            running.remove(symbol)
+            return copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+        with patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=fetch):
+            with RatesPool([(f"SYMBOL{index}", timeframe.ONE_MINUTE, 10) for index in range(20)], worker) as pool:
+                snapshot = pool.update_rates()
+
+        worker.shutdown()
+        assert len(snapshot) == 20
+        assert len(threads) == 1
+        assert threading.get_ident() not in threads
+
+    @patch.object(MetaTrader5, "copy_rates_from_pos", side_effect=copy_rates_from_pos)
+    def test_update_from_the_terminal_thread(self, mock):
+        timeframe = TimeFrame()
+        worker = TerminalWorker()
+
+        with RatesPool([("EURUSD", timeframe.ONE_MINUTE, 20)], worker) as pool:
+            # The fetches cannot wait in the queue of the thread running the update, they are run right away.
+            snapshot = worker.submit(None, pool.update_rates).result(timeout=5)
+
+        worker.shutdown()
+        assert len(snapshot[("EURUSD", timeframe.ONE_MINUTE, 20)].close) == 20
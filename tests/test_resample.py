@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+import MetaTrader5
+import numpy as np
+import pytest
+
+from metatrader5EasyT.rates import RATES_DTYPE
+from metatrader5EasyT.rates import Rates
+from metatrader5EasyT.resample import Period
+from metatrader5EasyT.resample import bar_starts
+from metatrader5EasyT.resample import resample
+from metatrader5EasyT.resample import resample_ticks
+from metatrader5EasyT.tick import TICK_DTYPE
+from metatrader5EasyT.timeframe import TimeFrame
+
+
+def fake_bars(size, seconds=60, start=1640995200):
+    bars = np.zeros(size, dtype=RATES_DTYPE)
+    bars["time"] = start + np.arange(size) * seconds
+    bars["open"] = np.arange(size)
+    bars["high"] = np.arange(size) + 2
+    bars["low"] = np.arange(size) - 1
+    bars["close"] = np.arange(size) + 1
+    bars["tick_volume"] = 1
+    return bars
+
+
+class TestResample:
+    def test_minutes_to_hours(self):
+        timeframe = TimeFrame()
+        minutes = fake_bars(150)
+
+        hours = resample(minutes, timeframe.ONE_HOUR)
+
+        assert hours["time"].tolist() == [1640995200, 1640998800, 1641002400]
+        assert hours["open"].tolist() == [0, 60, 120]
+        assert hours["high"].tolist() == [61, 121, 151]
+        assert hours["low"].tolist() == [-1, 59, 119]
+        assert hours["close"].tolist() == [60, 120, 150]
+        assert hours["tick_volume"].tolist() == [60, 60, 30]
+
+    def test_calendar_and_session_alignment(self):
+        timeframe = TimeFrame()
+        # 2022-01-01 was a Saturday.
+        days = fake_bars(40, seconds=86400)
+
+        weeks = bar_starts(days["time"], timeframe.ONE_WEEK)
+        months = resample(days, timeframe.ONE_MONTH)
+        sessions = bar_starts([1640995200 + 16 * 3600, 1640995200 + 17 * 3600], timeframe.ONE_DAY, origin=17 * 3600)
+
+        assert np.datetime64(int(weeks[1]), "s").astype(object).weekday() == 6
+        assert months["time"].tolist() == [1640995200, 1643673600]
+        assert months["tick_volume"].tolist() == [31, 9]
+        assert (sessions - 1640995200).tolist() == [-7 * 3600, 17 * 3600]
+
+    def test_ticks_to_ninety_seconds(self):
+        ticks = np.zeros(4, dtype=TICK_DTYPE)
+        ticks["time_msc"] = [0, 89999, 90000, 200000]
+        ticks["bid"] = [1.0, 3.0, 2.0, 5.0]
+        ticks["ask"] = ticks["bid"] + 0.0002
+
+        bars = resample_ticks(ticks, Period(90), point=0.0001)
+
+        assert bars["time"].tolist() == [0, 90, 180]
+        assert bars["high"].tolist() == [3.0, 2.0, 5.0]
+        assert bars["close"].tolist() == [3.0, 2.0, 5.0]
+        assert bars["tick_volume"].tolist() == [2, 1, 1]
+        assert bars["spread"].tolist() == [2, 2, 2]
+        assert str(Period(90)) == "90s"
+
+    @patch.object(
+        MetaTrader5, "copy_rates_from_pos", side_effect=lambda symbol, tf, start, count: fake_bars(count, 86400)
+    )
+    def test_three_day_rates(self, mock):
+        timeframe = TimeFrame()
+        rates = Rates("EURUSD", timeframe.THREE_DAY, 5)
+
+        rates.update_rates()
+
+        assert mock.call_args.args[1:] == (MetaTrader5.TIMEFRAME_D1, 0, 18)
+        assert len(rates.close) == 5
+        assert np.all(np.diff(rates.time) == 3 * 86400)
+
+        with pytest.raises(ValueError):
+            Rates("EURUSD", Period(90), 5).update_rates()
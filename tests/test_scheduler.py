@@ -0,0 +1,90 @@
+import pytest
+
+from metatrader5EasyT.scheduler import PollScheduler
+from metatrader5EasyT.simulator import SymbolSpec
+
+SYMBOLS = {
+    "EURUSD": SymbolSpec(tick_rate=20),
+    "GBPUSD": SymbolSpec(tick_rate=20),
+    "USDTRY": SymbolSpec(tick_rate=0.01),
+}
+pytestmark = pytest.mark.simulator(symbols=SYMBOLS, history_minutes=100, start_time=1640995200)
+
+
+def calls(simulator):
+    return simulator.calls["copy_ticks_from"] + simulator.calls["symbol_info_tick"]
+
+
+class TestPollScheduler:
+    def test_active_symbols_are_polled_more(self, simulator):
+        scheduler = PollScheduler(max_calls_per_second=100, clock=lambda: simulator.time_msc / 1000)
+        for symbol in ("EURUSD", "GBPUSD", "USDTRY"):
+            scheduler.add(symbol)
+
+        for _ in range(1200):
+            simulator.advance(0.05)
+            scheduler.poll()
+
+        report = scheduler.report()
+        assert report["EURUSD"].interval < 0.1
+        assert report["USDTRY"].interval == 5.0
+        assert report["EURUSD"].polls > 10 * report["USDTRY"].polls
+        assert 15 < report["EURUSD"].tick_rate < 25
+        assert report["EURUSD"].staleness_mean < 0.15
+        assert report["USDTRY"].tick_rate < 1
+        assert scheduler.tick("EURUSD").time_msc == simulator.symbol_info_tick("EURUSD").time_msc
+
+    def test_calls_per_second_cap(self, simulator):
+        scheduler = PollScheduler(max_calls_per_second=10, min_interval=0.01, clock=lambda: simulator.time_msc / 1000)
+        for symbol in ("EURUSD", "GBPUSD", "USDTRY"):
+            scheduler.add(symbol)
+
+        scheduler.poll()
+        first = calls(simulator)
+        for _ in range(600):
+            simulator.advance(0.01)
+            scheduler.poll()
+
+        # Up to one second of calls can be spent at once.
+        assert calls(simulator) - first <= 10 * 6 + 10
+        report = scheduler.report()
+        # The budget is spent on the symbols that move, they wait longer than they want to.
+        assert report["EURUSD"].staleness_mean > 0.05
+        assert report["EURUSD"].polls + report["GBPUSD"].polls > 5 * report["USDTRY"].polls
+
+    @pytest.mark.simulator(symbols=[f"SYMBOL{index}" for index in range(10)], history_minutes=1)
+    def test_every_terminal_call_is_charged(self, simulator):
+        symbols = list(simulator.specs)
+        scheduler = PollScheduler(max_calls_per_second=10, clock=lambda: simulator.time_msc / 1000)
+        for symbol in symbols:
+            scheduler.add(symbol)
+
+        # The first poll of a symbol is two calls, symbol_info_tick and copy_ticks_from.
+        scheduler.poll()
+        assert calls(simulator) == 10
+        assert sum(stats.polls for stats in scheduler.report().values()) == 5
+
+    def test_symbols_that_move_are_polled_first(self, simulator):
+        # Both symbols want a poll every 0.05 seconds, the budget is for three polls of four.
+        scheduler = PollScheduler(
+            max_calls_per_second=30, min_interval=0.05, max_interval=0.05, clock=lambda: simulator.time_msc / 1000
+        )
+        scheduler.add("EURUSD")
+        scheduler.add("USDTRY")
+        for _ in range(400):
+            simulator.advance(0.05)
+            scheduler.poll()
+
+        report = scheduler.report()
+        assert report["EURUSD"].change_rate > 0.5
+        assert report["USDTRY"].change_rate < 0.1
+        assert report["EURUSD"].polls > 1.3 * report["USDTRY"].polls
+        # The quiet symbol is still polled.
+        assert report["USDTRY"].polls > 50
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            PollScheduler(max_calls_per_second=0)
+
+        with pytest.raises(ValueError):
+            PollScheduler(min_interval=1, max_interval=0.5)
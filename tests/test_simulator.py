@@ -0,0 +1,128 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from metatrader5EasyT.simulator import Simulator
+from metatrader5EasyT.simulator import SymbolSpec
+
+
+class TestSimulator:
+    def test_same_seed_same_market(self):
+        first = Simulator(symbols=["EURUSD"], tick_rate=100, seed=7)
+        second = Simulator(symbols=["EURUSD"], tick_rate=100, seed=7)
+        first.advance(30)
+        second.advance(30)
+
+        assert np.array_equal(
+            first.copy_rates_from_pos("EURUSD", first.TIMEFRAME_M1, 0, 1000),
+            second.copy_rates_from_pos("EURUSD", second.TIMEFRAME_M1, 0, 1000),
+        )
+        assert np.array_equal(
+            first.copy_ticks_from("EURUSD", 0, 10000, first.COPY_TICKS_ALL),
+            second.copy_ticks_from("EURUSD", 0, 10000, second.COPY_TICKS_ALL),
+        )
+
+    def test_ticks_update_the_forming_bar(self):
+        simulator = Simulator(symbols=["EURUSD"], tick_rate=50, start_time=1640995200)
+        simulator.advance(90)
+
+        ticks = simulator.copy_ticks_range("EURUSD", 1640995260, 1640995290, simulator.COPY_TICKS_ALL)
+        bar = simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 0, 1)[0]
+
+        assert bar["time"] == 1640995260
+        assert bar["high"] == ticks["bid"].max()
+        assert bar["low"] == ticks["bid"].min()
+        assert bar["close"] == simulator.symbol_info_tick("EURUSD").bid
+        assert np.all(np.diff(ticks["time_msc"]) >= 0)
+
+    def test_timeframes_are_built_from_minutes(self):
+        simulator = Simulator(symbols=["EURUSD"], history_minutes=24 * 60, start_time=1640995200)
+
+        minutes = simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_M1, 0, 24 * 60)
+        hours = simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_H1, 0, 24)
+
+        assert hours["time"].tolist() == (1640908800 + np.arange(24) * 3600).tolist()
+        assert hours["high"].tolist() == minutes["high"].reshape(24, 60).max(axis=1).tolist()
+        assert hours["open"].tolist() == minutes["open"][::60].tolist()
+        assert hours["tick_volume"].sum() == minutes["tick_volume"].sum()
+        assert len(simulator.copy_rates_from_pos("EURUSD", simulator.TIMEFRAME_D1, 0, 10)) == 1
+
+    def test_order_send_opens_closes_and_triggers_stops(self):
+        simulator = Simulator(symbols={"EURUSD": SymbolSpec(volatility=0.001)}, tick_rate=10)
+        request = {
+            "action": simulator.TRADE_ACTION_DEAL,
+            "symbol": "EURUSD",
+            "volume": 0.1,
+            "type": simulator.ORDER_TYPE_BUY,
+        }
+
+        opened = simulator.order_send(request)
+        ticket = simulator.positions_get(symbol="EURUSD")[0].ticket
+        closed = simulator.order_send({**request, "type": simulator.ORDER_TYPE_SELL, "position": ticket})
+
+        assert opened.retcode == closed.retcode == simulator.TRADE_RETCODE_DONE
+        assert simulator.positions_get() == ()
+
+        simulator.order_send(request)
+        ask = simulator.symbol_info_tick("EURUSD").ask
+        ticket = simulator.positions_get()[0].ticket
+        modified = simulator.order_send(
+            {"action": simulator.TRADE_ACTION_SLTP, "symbol": "EURUSD", "position": ticket, "sl": ask - 0.0005}
+        )
+        simulator.advance(3600)
+
+        assert modified.retcode == simulator.TRADE_RETCODE_DONE
+        assert simulator.positions_get() == ()
+        assert simulator.deals[-1][4] <= ask - 0.0005
+
+    def test_unknown_symbol(self):
+        simulator = Simulator(symbols=["EURUSD"])
+
+        assert simulator.symbol_info("XXXXXX") is None
+        assert simulator.last_error()[0] == simulator.RES_E_NOT_FOUND
+        assert simulator.copy_rates_from_pos("XXXXXX", simulator.TIMEFRAME_M1, 0, 10) is None
+
+    def test_symbols_get_group(self):
+        simulator = Simulator(symbols=["EURUSD", "EURGBP", "GBPUSD"], history_minutes=10)
+
+        symbols = simulator.symbols_get(group="EUR*,!*GBP")
+
+        assert [symbol.name for symbol in symbols] == ["EURUSD"]
+        assert simulator.calls["symbols_get"] == 1
+
+    def test_install_replaces_metatrader5(self):
+        pytest.importorskip("MetaTrader5")
+        from metatrader5EasyT import tick
+        from metatrader5EasyT.tick import Tick
+
+        previous = sys.modules["MetaTrader5"]
+        simulator = Simulator(symbols=["EURUSD"], tick_rate=100).install()
+        try:
+            eurusd_tick = Tick("EURUSD")
+            eurusd_tick.update_ticks()
+            simulator.advance(1)
+            new_ticks = eurusd_tick.update_ticks()
+
+        finally:
+            simulator.uninstall()
+
+        assert len(new_ticks) == len(simulator.copy_ticks_from("EURUSD", 0, 10000, simulator.COPY_TICKS_ALL)) - 1
+        assert sys.modules["MetaTrader5"] is previous
+        assert tick.Mt5 is previous
+
+    def test_uninstall_without_metatrader5(self, monkeypatch):
+        monkeypatch.delitem(sys.modules, "MetaTrader5", raising=False)
+        # Like on Linux, the package cannot be imported.
+        monkeypatch.setattr(sys, "path", [])
+        module = types.ModuleType("metatrader5EasyT.example")
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+        simulator = Simulator(symbols=["EURUSD"], history_minutes=1).install()
+        # A module imported while the simulator is installed.
+        module.Mt5 = sys.modules["MetaTrader5"]
+        simulator.uninstall()
+
+        assert "MetaTrader5" not in sys.modules
+        assert not hasattr(module, "Mt5")
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from metatrader5EasyT.backtest import Backtest
+from metatrader5EasyT.history import HistoryCache
+from metatrader5EasyT.resample import RATES_DTYPE
+from metatrader5EasyT.sweep import IN_SAMPLE
+from metatrader5EasyT.sweep import OUT_OF_SAMPLE
+from metatrader5EasyT.sweep import RESULTS_DTYPE
+from metatrader5EasyT.sweep import Window
+from metatrader5EasyT.sweep import grid
+from metatrader5EasyT.sweep import run_sweep
+from metatrader5EasyT.sweep import walk_forward
+
+START = 1640995200
+
+
+def random_bars(size, seed):
+    rng = np.random.default_rng(seed)
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0002, size)), 5)
+    bars = np.zeros(size, dtype=RATES_DTYPE)
+    bars["time"] = START + np.arange(size) * 60
+    bars["open"] = np.concatenate(([close[0]], close[:-1]))
+    bars["high"] = np.maximum(bars["open"], close) + 0.0001
+    bars["low"] = np.minimum(bars["open"], close) - 0.0001
+    bars["close"] = close
+    bars["spread"] = 10
+    return bars
+
+
+def momentum(bars, lookback):
+    close = bars["close"]
+    change = np.zeros(len(close))
+    change[lookback:] = close[lookback:] - close[:-lookback]
+    return change > 0.0005, change < -0.0005
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = HistoryCache(str(tmp_path / "history"))
+    history.append("EURUSD", 1, random_bars(20000, 1))
+    history.append("GBPUSD", 1, random_bars(20000, 2))
+    return history
+
+
+def ordered(table):
+    return np.sort(table, order=["symbol", "params", "window", "segment"])
+
+
+class TestSweep:
+    def test_grid_and_windows(self):
+        assert grid(lookback=[5, 10], stop_loss=[0.001]) == [
+            {"lookback": 5, "stop_loss": 0.001},
+            {"lookback": 10, "stop_loss": 0.001},
+        ]
+        assert walk_forward(0, 100, train=40, test=20) == [
+            Window(0, 40, 40, 60),
+            Window(20, 60, 60, 80),
+            Window(40, 80, 80, 100),
+        ]
+
+    def test_processes_match_and_stream(self, history, tmp_path):
+        params = grid(lookback=[5, 20], stop_loss=[0.001, 0.003], take_profit=[0.002])
+        windows = walk_forward(START, START + 20000 * 60, train=5000 * 60, test=2500 * 60)
+        symbols = {"EURUSD": 0.00001, "GBPUSD": 0.00001}
+        path = str(tmp_path / "results.bin")
+
+        serial = run_sweep(history, symbols, 1, momentum, params, windows, processes=1)
+        parallel = run_sweep(history, symbols, 1, momentum, params, windows, processes=2, chunk_size=3, path=path)
+
+        assert len(serial.table) == 2 * 4 * len(windows) * 2
+        assert np.array_equal(ordered(serial.table), ordered(parallel.table))
+        assert np.array_equal(ordered(np.fromfile(path, dtype=RESULTS_DTYPE)), ordered(parallel.table))
+        # A second sweep does not append to the results of the first one.
+        with pytest.raises(FileExistsError):
+            run_sweep(history, symbols, 1, momentum, params, windows, processes=1, path=path)
+
+        # The out-of-sample row of a window is the backtest of its test period.
+        row = serial.table[(serial.table["segment"] == OUT_OF_SAMPLE) & (serial.table["window"] == 1)][0]
+        bars = history.load(serial.symbols[row["symbol"]], 1)
+        start, end = bars["time"].searchsorted([windows[1].test_start, windows[1].test_end])
+        params_row = serial.params[row["params"]]
+        buy, sell = momentum(bars, params_row["lookback"])
+        expected = Backtest("EURUSD", bars[start:end], 0.00001).run_signals(
+            buy[start:end], sell[start:end], params_row["stop_loss"], params_row["take_profit"]
+        )
+        assert row["profit"] == pytest.approx(expected.profit)
+        assert row["trades"] == len(expected.trades)
+
+    def test_walk_forward_takes_the_best_in_sample(self, history):
+        params = grid(lookback=[5, 10, 20], stop_loss=[0.002], take_profit=[0.002])
+        windows = walk_forward(START, START + 20000 * 60, train=8000 * 60, test=4000 * 60)
+        result = run_sweep(history, {"EURUSD": 0.00001}, 1, momentum, params, windows, processes=1)
+
+        chosen = result.walk_forward("profit")
+
+        assert len(chosen) == len(windows)
+        for row in chosen:
+            in_sample = result.table[(result.table["segment"] == IN_SAMPLE) & (result.table["window"] == row["window"])]
+            assert in_sample["profit"].max() == in_sample["profit"][in_sample["params"] == row["params"]][0]
+
+    def test_trade_params_are_required(self, history):
+        with pytest.raises(ValueError):
+            run_sweep(history, {"EURUSD": 0.00001}, 1, momentum, [{"lookback": 5}], processes=1)
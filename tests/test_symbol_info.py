@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+import MetaTrader5
+
+from metatrader5EasyT.symbol_info import SymbolInfoCache
+
+
+class TestSymbolInfoCache:
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_symbol_info_is_cached(self, mock_symbol_info):
+        mock_symbol_info.return_value.trade_tick_size = 1e-05
+        mock_symbol_info.return_value.digits = 5
+        cache = SymbolInfoCache()
+
+        assert cache.tick_size("eurusd") == 1e-05
+        assert cache.digits("EURUSD") == 5
+        assert mock_symbol_info.call_count == 1
+
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_expired_and_invalidated_symbols_are_fetched_again(self, mock_symbol_info):
+        cache = SymbolInfoCache(ttl=0)
+
+        cache.get("EURUSD")
+        cache.get("EURUSD")
+        assert mock_symbol_info.call_count == 2
+
+        cache.ttl = 60
+        cache.invalidate("EURUSD")
+        cache.get("EURUSD")
+        cache.get("EURUSD")
+        assert mock_symbol_info.call_count == 3
+
+    @patch.object(MetaTrader5, "symbol_info", return_value=None)
+    def test_symbol_not_found_is_not_cached(self, mock_symbol_info):
+        cache = SymbolInfoCache()
+
+        assert cache.get("EUR USD") is None
+        assert cache.get("EUR USD") is None
+        assert mock_symbol_info.call_count == 2
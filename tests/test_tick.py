@@ -1,9 +1,14 @@
+import asyncio
+import threading
 from datetime import datetime
 from unittest.mock import patch
 
 import MetaTrader5
+import numpy as np
+import pytest
 
 from metatrader5EasyT.tick import Tick
+from metatrader5EasyT.worker import get_worker
 
 
 class TestTick:
@@ -37,3 +42,144 @@ class TestTick:
         assert type(tick.ask) == float
         assert type(tick.last) == float
         assert type(tick.volume) == int
+
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    def test_time_assigned(self, mock_tick):
+        mock_tick.return_value.time = 1
+        tick = Tick(symbol="EURUSD")
+        tick.time = datetime(2022, 1, 1)
+        assert tick.time == datetime(2022, 1, 1)
+
+        # The next tick replaces the value assigned.
+        tick.get_new_tick()
+        assert tick.time == datetime.fromtimestamp(1)
+
+    @patch.object(MetaTrader5, "copy_ticks_from")
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    def test_update_ticks_returns_only_new_ticks(self, mock_tick, mock_copy_ticks_from):
+        dtype = [
+            ("time", "<i8"),
+            ("bid", "<f8"),
+            ("ask", "<f8"),
+            ("last", "<f8"),
+            ("volume", "<u8"),
+            ("time_msc", "<i8"),
+            ("flags", "<u4"),
+            ("volume_real", "<f8"),
+        ]
+        history = np.zeros(6, dtype=dtype)
+        history["time_msc"] = [1000, 1500, 1500, 1500, 2100, 2200]
+        history["time"] = history["time_msc"] // 1000
+        history["bid"] = np.arange(6)
+        available = {"ticks": 3}
+
+        def copy_ticks_from(symbol, date_from, count, flags):
+            ticks = history[: available["ticks"]]
+            return ticks[ticks["time"] >= date_from][:count]
+
+        mock_tick.return_value.time_msc = 1500
+        mock_copy_ticks_from.side_effect = copy_ticks_from
+
+        tick = Tick(symbol="EURUSD", capacity=4)
+
+        assert tick.update_ticks()["bid"].tolist() == [1.0, 2.0]
+        assert len(tick.update_ticks()) == 0
+
+        available["ticks"] = 6
+        new_ticks = tick.update_ticks()
+
+        assert new_ticks["bid"].tolist() == [3.0, 4.0, 5.0]
+        assert new_ticks["time_msc"].dtype == np.int64
+        assert tick.ticks["bid"].tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert tick.bid == 5.0
+        assert tick.time_msc == 2200
+
+    @pytest.mark.simulator(symbols=["EURUSD"], tick_rate=20_000, history_minutes=1)
+    def test_update_ticks_second_with_more_ticks_than_fetch_size(self, simulator):
+        tick = Tick(symbol="EURUSD", capacity=100_000, fetch_size=1000)
+        assert len(tick.update_ticks()) == 1
+        start = tick.time_msc
+
+        received = []
+        for _ in range(3):
+            simulator.advance(1)
+            received.append(tick.update_ticks())
+
+        received = np.concatenate(received)
+        expected = simulator.copy_ticks_range("EURUSD", start // 1000, tick.time_msc // 1000 + 1, 0)
+        expected = expected[expected["time_msc"] > start]
+        assert len(received) == len(expected) > 3 * 1000
+        assert received["time_msc"].tolist() == expected["time_msc"].tolist()
+        assert tick.time_msc == simulator.symbol_info_tick("EURUSD").time_msc
+
+    @patch.object(MetaTrader5, "copy_ticks_from")
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    def test_iter_new_ticks(self, mock_tick, mock_copy_ticks_from):
+        ticks = np.zeros(
+            2,
+            dtype=[
+                ("time_msc", "<i8"),
+                ("bid", "<f8"),
+                ("ask", "<f8"),
+                ("last", "<f8"),
+                ("volume", "<u8"),
+                ("flags", "<u4"),
+            ],
+        )
+        ticks["time_msc"] = [1000, 1001]
+        mock_tick.return_value.time_msc = 1000
+        mock_copy_ticks_from.return_value = ticks
+
+        tick = Tick(symbol="EURUSD")
+
+        assert [new_tick["time_msc"] for new_tick in tick.iter_new_ticks()] == [1000, 1001]
+        assert Tick.to_datetime(1001) == datetime.fromtimestamp(1.001)
+
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    def test_get_new_tick_async(self, mock_tick):
+        mock_tick.return_value.time = 1
+        mock_tick.return_value.ask = 1.0
+
+        tick = Tick(symbol="EURUSD")
+        mock_tick.reset_mock()
+        release = threading.Event()
+        # The terminal thread is busy, so both calls are in flight at the same time.
+        busy = get_worker().submit(None, release.wait)
+
+        async def main():
+            calls = [asyncio.ensure_future(tick.get_new_tick_async()) for _ in range(2)]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*calls)
+
+        asyncio.run(main())
+
+        assert busy.result()
+        assert tick.ask == 1.0
+        assert mock_tick.call_count == 1
+
+    @pytest.mark.simulator(symbols=["EURUSD"], tick_rate=100, history_minutes=1)
+    def test_stream(self, simulator):
+        waits = []
+
+        async def sleep(interval):
+            # The stream waits only when there is no new tick, the simulated time moves while it waits.
+            waits.append(interval)
+            simulator.advance(1)
+
+        async def main():
+            received = []
+            async for new_tick in tick.stream(interval=0.01):
+                received.append(new_tick)
+                if len(received) == 5:
+                    return received
+
+        tick = Tick(symbol="EURUSD")
+        with patch("metatrader5EasyT.tick.asyncio.sleep", sleep):
+            received = asyncio.run(main())
+
+        start = received[0]["time_msc"]
+        expected = simulator.copy_ticks_range("EURUSD", start // 1000, start // 1000 + 2, 0)
+        expected = expected[expected["time_msc"] > start][:4]
+        assert waits == [0.01]
+        assert [new_tick["time_msc"] for new_tick in received[1:]] == expected["time_msc"].tolist()
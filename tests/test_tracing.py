@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from metatrader5EasyT import tracing
+from metatrader5EasyT.tick import Tick
+from metatrader5EasyT.trade import Trade
+
+pytestmark = pytest.mark.simulator(symbols=["EURUSD"], history_minutes=10)
+
+
+@pytest.fixture
+def simulator(simulator):
+    tracing.tracer.enabled = True
+    tracing.tracer.clear()
+    yield simulator
+    tracing.tracer.enabled = False
+    tracing.tracer.clear()
+    tracing.discard()
+
+
+def new_trade():
+    trade = Trade(symbol="EURUSD", lot=0.1, stop_loss=0.001, take_profit=0.001)
+    trade._trade_allowed = True
+    return trade
+
+
+class TestTracing:
+    def test_tick_to_order_send(self, simulator, tmp_path):
+        eurusd_tick = Tick("EURUSD")
+        trade = new_trade()
+
+        eurusd_tick.get_new_tick()
+        tracing.mark("signal")
+        trade.position_open(True, False)
+        # Without a new tick there is no trace.
+        trade.position_close()
+
+        names, traces, events = tracing.tracer.arrays()
+        assert names == ["tick", "signal", "position_open", "open_buy", "order_send", "order_result"]
+        assert traces["time_msc"].tolist() == [eurusd_tick.time_msc]
+        assert (events["time_ns"][1:] >= events["time_ns"][:-1]).all()
+
+        report = tracing.tracer.report()
+        assert report["tick -> order_result"]["count"] == 1
+        assert report["order_send -> order_result"]["p99"] > 0
+        assert "tick_age" in report
+
+        tracing.tracer.dump(str(tmp_path / "trace.npz"))
+        loaded_names, loaded_traces, loaded_events = tracing.Tracer.load(str(tmp_path / "trace.npz"))
+        assert loaded_names == names
+        assert (loaded_events == events).all()
+
+    def test_async_methods_keep_the_trace(self, simulator):
+        eurusd_tick = Tick("EURUSD")
+        trade = new_trade()
+
+        async def decide():
+            await eurusd_tick.get_new_tick_async()
+            tracing.mark("signal")
+            await trade.position_open_async(False, True)
+
+        asyncio.run(decide())
+
+        names, traces, events = tracing.tracer.arrays()
+        assert names == ["tick", "signal", "position_open", "open_sell", "order_send", "order_result"]
+        assert len(traces) == 1
+
+    def test_disabled(self, simulator):
+        tracing.tracer.enabled = False
+
+        Tick("EURUSD").get_new_tick()
+        new_trade().position_open(True, False)
+
+        assert tracing.tracer.report() == {}
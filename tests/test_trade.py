@@ -1,9 +1,16 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import MetaTrader5
+import numpy as np
+import pytest
 
 import metatrader5EasyT
+from metatrader5EasyT.positions import PositionBook
 from metatrader5EasyT.trade import Trade
+from metatrader5EasyT.worker import get_worker
 
 
 class TestTrade:
@@ -12,6 +19,7 @@ class TestTrade:
     @patch("metatrader5EasyT.trade.Trade")
     def test_normalize(self, mock_tick_size, mock_symbol_info, mock_position_get):
         mock_symbol_info.return_value.trade_tick_size = 1e-05
+        mock_symbol_info.return_value.digits = 5
 
         symbol = "EURUSD"
         lot = 1.0
@@ -22,7 +30,19 @@ class TestTrade:
 
         value_to_normalize = 12.3456789
         result = trade.normalize(value_to_normalize)
-        assert result == 12.34
+        assert result == 12.34568
+        assert type(result) == float
+
+    @patch.object(MetaTrader5, "positions_get")
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_normalize_array(self, mock_symbol_info, mock_position_get):
+        mock_symbol_info.return_value.trade_tick_size = 0.25
+        mock_symbol_info.return_value.digits = 2
+
+        trade = Trade(symbol="US500", lot=1.0, stop_loss=1.0, take_profit=1.0)
+
+        result = trade.normalize(np.array([4100.1, 4100.13, 4100.4, 4100.9]))
+        assert result.tolist() == [4100.0, 4100.25, 4100.5, 4101.0]
 
     @patch.object(MetaTrader5, "symbol_info_tick")
     @patch.object(MetaTrader5, "positions_get")
@@ -169,3 +189,127 @@ class TestTrade:
         assert trade.trade_direction == "buy"
         trade.position_close()
         assert trade.trade_direction is None
+
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    @patch.object(MetaTrader5, "positions_get", return_value=())
+    @patch.object(MetaTrader5, "symbol_info")
+    @patch.object(MetaTrader5, "order_send")
+    def test_position_open_reads_positions_once(
+        self,
+        mock_order_send,
+        mock_symbol_info,
+        mock_position_get,
+        mock_symbol_info_tick,
+    ):
+        mock_order_send.return_value.retcode = MetaTrader5.TRADE_RETCODE_DONE
+        mock_symbol_info.return_value.trade_tick_size = 1e-05
+        mock_symbol_info_tick.return_value.ask = 1.0
+
+        trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=1.0, take_profit=1.0)
+        trade._trade_allowed = True
+        mock_position_get.reset_mock()
+
+        assert trade.position_open(True, False) == "buy"
+        assert mock_position_get.call_count == 1
+        assert mock_symbol_info_tick.call_count == 1
+        assert mock_order_send.call_count == 1
+        assert mock_order_send.call_args.args[0]["position"] == 0
+
+    @patch.object(MetaTrader5, "symbol_info_tick")
+    @patch.object(MetaTrader5, "positions_get")
+    @patch.object(MetaTrader5, "symbol_info")
+    @patch.object(MetaTrader5, "order_send")
+    def test_position_close_uses_order_result(
+        self,
+        mock_order_send,
+        mock_symbol_info,
+        mock_position_get,
+        mock_symbol_info_tick,
+    ):
+        mock_order_send.return_value.retcode = MetaTrader5.TRADE_RETCODE_DONE
+        mock_symbol_info.return_value.trade_tick_size = 1e-05
+        mock_symbol_info_tick.return_value.bid = 1.0
+        mock_position_get.return_value = (MagicMock(ticket=42, type=MetaTrader5.ORDER_TYPE_BUY, volume=1.0),)
+
+        trade = Trade(symbol="EURUSD", lot=1.0, stop_loss=1.0, take_profit=1.0)
+        mock_position_get.reset_mock()
+
+        trade.position_close()
+
+        assert trade.trade_direction is None
+        assert mock_position_get.call_count == 1
+        assert mock_order_send.call_args.args[0]["position"] == 42
+        assert mock_order_send.call_args.args[0]["type"] == MetaTrader5.ORDER_TYPE_SELL
+
+    @patch.object(MetaTrader5, "positions_get")
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_direction_of_many_positions(self, mock_symbol_info, mock_position_get):
+        mock_symbol_info.return_value.trade_tick_size = 1e-05
+        mock_symbol_info.return_value.digits = 5
+        mock_position_get.return_value = (
+            MagicMock(ticket=1, type=0, volume=0.1),
+            MagicMock(ticket=2, type=1, volume=0.3),
+        )
+
+        trade = Trade(symbol="EURUSD", lot=0.1, stop_loss=1.0, take_profit=1.0)
+        # The direction is the one of the net volume, not of the first position.
+        assert trade.trade_direction == "sell"
+
+        mock_position_get.return_value += (MagicMock(ticket=3, type=0, volume=0.2),)
+        trade.position_check()
+        assert trade.trade_direction is None
+
+    @pytest.mark.simulator(symbols=["EURUSD"], history_minutes=1)
+    def test_position_open_and_close_async(self, simulator):
+        trade = Trade(symbol="EURUSD", lot=0.1, stop_loss=0.001, take_profit=0.001, book=PositionBook(max_age=0.0))
+        trade._trade_allowed = True
+        release = threading.Event()
+        # The terminal thread is busy, so the same signal is sent twice while the first is in flight.
+        busy = get_worker().submit(None, release.wait)
+
+        async def main():
+            calls = [asyncio.ensure_future(trade.position_open_async(True, False)) for _ in range(2)]
+            await asyncio.sleep(0)
+            release.set()
+            directions = await asyncio.gather(*calls)
+            positions = simulator.positions_get(symbol="EURUSD")
+            await trade.position_close_async()
+            return directions, positions
+
+        directions, positions = asyncio.run(main())
+        assert busy.result()
+        assert directions == ["buy", "buy"]
+        assert len(positions) == 1
+        assert simulator.calls["order_send"] == 2
+        assert trade.trade_direction is None
+        assert simulator.positions_get(symbol="EURUSD") == ()
+
+    @pytest.mark.simulator(symbols=["EURUSD"], history_minutes=1)
+    def test_position_close_of_hedged_positions(self, simulator):
+        trade = Trade(symbol="EURUSD", lot=0.1, stop_loss=0.001, take_profit=0.001, book=PositionBook(max_age=0.0))
+        trade._open(MetaTrader5.ORDER_TYPE_BUY)
+        trade.lot = 0.2
+        # A hedging account opens one more position of the same side.
+        trade._open(MetaTrader5.ORDER_TYPE_BUY, positions=())
+        assert len(simulator.positions_get(symbol="EURUSD")) == 2
+
+        trade.position_close()
+        # Each position is closed by its ticket, none is opened the other way.
+        assert simulator.positions_get(symbol="EURUSD") == ()
+        assert simulator.calls["order_send"] == 4
+        assert trade.trade_direction is None
+
+    @patch.object(MetaTrader5, "order_send")
+    @patch.object(MetaTrader5, "positions_get")
+    @patch.object(MetaTrader5, "symbol_info")
+    def test_unknown_positions_send_no_order(self, mock_symbol_info, mock_position_get, mock_order_send):
+        mock_position_get.return_value = (MagicMock(ticket=1, type=0, volume=0.1),)
+        trade = Trade(symbol="EURUSD", lot=0.1, stop_loss=1.0, take_profit=1.0)
+        trade._trade_allowed = True
+        assert trade.trade_direction == "buy"
+
+        mock_position_get.return_value = None
+        trade.position_close()
+        trade.trade_direction = None
+        trade.position_open(True, False)
+        mock_order_send.assert_not_called()
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from metatrader5EasyT.positions import PositionBook
+from metatrader5EasyT.trailing import TrailingStop
+from metatrader5EasyT.trailing import trail_levels
+
+pytestmark = pytest.mark.simulator(symbols=["EURUSD", "USDJPY", "GBPUSD"], history_minutes=1, start_time=1640995200)
+
+
+def deal(simulator, symbol: str, order_type: int, magic: int = 7777, sl: float = 0.0, tp: float = 0.0):
+    request = {"action": simulator.TRADE_ACTION_DEAL, "symbol": symbol, "volume": 0.1, "type": order_type}
+    return simulator.order_send({**request, "magic": magic, "sl": sl, "tp": tp})
+
+
+class TestTrailLevels:
+    def test_stops_only_move_towards_the_price(self, simulator):
+        stop_loss, moved = trail_levels(
+            np.array([0, 0, 1, 1]),
+            np.array([1.1005, 1.10002, 1.0990, 1.0990]),
+            np.array([1.0990, 1.0999, 0.0, 1.0995]),
+            np.full(4, 0.001),
+            np.full(4, 0.00001),
+        )
+
+        assert moved.tolist() == [True, False, True, False]
+        assert np.allclose(stop_loss, [1.0995, 1.0999, 1.1, 1.0995])
+
+    def test_step_and_tick_size(self, simulator):
+        # One tick of 0.25 is not enough when the step is two ticks.
+        stop_loss, moved = trail_levels([0, 0], [4100.4, 4100.6], [4098.0, 4098.0], [2.0, 2.0], [0.25, 0.25], step=2)
+
+        assert moved.tolist() == [False, True]
+        assert stop_loss.tolist() == [4098.0, 4098.5]
+
+    def test_stops_level(self, simulator):
+        # The distance of 0.0005 is shorter than the 10 points of stops level, the stops are 0.001 from the price.
+        stop_loss, moved = trail_levels(
+            [0, 1, 0],
+            [1.1005, 1.0990, 1.1005],
+            [1.0990, 0.0, 1.0996],
+            np.full(3, 0.0005),
+            np.full(3, 0.00001),
+            1,
+            0.001,
+        )
+
+        assert moved.tolist() == [True, True, False]
+        assert np.allclose(stop_loss, [1.0995, 1.1, 1.0996])
+
+
+class TestTrailingStop:
+    def test_only_moved_stops_are_sent(self, simulator):
+        book = PositionBook(max_age=0.0)
+        deal(simulator, "EURUSD", 0, tp=2.0)
+        deal(simulator, "USDJPY", 1)
+        deal(simulator, "GBPUSD", 0)
+        trailing = TrailingStop({"EURUSD": 0.001, "USDJPY": 0.1}, book=book)
+
+        modifications = trailing.update()
+        assert len(modifications) == 2
+        assert modifications["retcode"].tolist() == [simulator.TRADE_RETCODE_DONE] * 2
+        eurusd, usdjpy = book.positions("EURUSD")[0], book.positions("USDJPY")[0]
+        assert eurusd.sl == round(np.floor(round((eurusd.price_current - 0.001) / 1e-05, 6)) * 1e-05, 5)
+        assert eurusd.tp == 2.0
+        assert usdjpy.sl > usdjpy.price_current
+        # GBPUSD has no distance, it is not trailed.
+        assert book.positions("GBPUSD")[0].sl == 0.0
+
+        calls = simulator.calls["order_send"]
+        assert len(trailing.update()) == 0
+        assert simulator.calls["order_send"] == calls
+
+        simulator.advance(60)
+        for modification in trailing.update():
+            position = book.position(int(modification["ticket"]))
+            assert position.sl == modification["sl"]
+            if position.type == simulator.POSITION_TYPE_BUY:
+                assert modification["sl"] > modification["sl_before"]
+
+            else:
+                assert modification["sl"] < modification["sl_before"]
+
+    def test_ticks_and_magic(self, simulator):
+        book = PositionBook(max_age=0.0)
+        deal(simulator, "EURUSD", 0, magic=1)
+        deal(simulator, "EURUSD", 1, magic=7777)
+        trailing = TrailingStop(0.001, book=book, magic=7777)
+
+        modifications = trailing.update({"EURUSD": SimpleNamespace(bid=1.2, ask=1.20002)})
+
+        assert len(modifications) == 1
+        assert modifications["sl"].tolist() == [1.20102]
+        assert [position.sl for position in book.positions("EURUSD")] == [0.0, 1.20102]
+
+    def test_invalid_step(self, simulator):
+        with pytest.raises(ValueError):
+            TrailingStop(0.001, book=PositionBook(), step=0)
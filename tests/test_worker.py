@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+from metatrader5EasyT.worker import get_worker
+from metatrader5EasyT.worker import TerminalWorker
+
+
+class TestTerminalWorker:
+    def test_calls_run_in_a_single_thread(self):
+        worker = TerminalWorker()
+
+        threads = {worker.submit(None, threading.get_ident).result() for _ in range(10)}
+        worker.shutdown()
+
+        assert len(threads) == 1
+        assert threading.get_ident() not in threads
+
+    def test_identical_requests_in_flight_are_coalesced(self):
+        worker = TerminalWorker()
+        release = threading.Event()
+        calls = []
+
+        def blocking_call():
+            release.wait()
+            calls.append(1)
+            return len(calls)
+
+        first = worker.submit("tick", blocking_call)
+        second = worker.submit("tick", blocking_call)
+        other = worker.submit("other", blocking_call)
+        release.set()
+
+        assert first is second
+        assert first.result() == 1
+        assert other.result() == 2
+        assert worker.submit("tick", blocking_call).result() == 3
+        worker.shutdown()
+
+    def test_run_does_not_block_the_event_loop(self):
+        worker = TerminalWorker()
+        release = threading.Event()
+
+        async def main():
+            call = asyncio.ensure_future(worker.run(release.wait, key="wait"))
+            duplicate = asyncio.ensure_future(worker.run(release.wait, key="wait"))
+            await asyncio.sleep(0)
+            assert not call.done()
+            release.set()
+            return await asyncio.gather(call, duplicate)
+
+        assert asyncio.run(main()) == [True, True]
+        worker.shutdown()
+
+    def test_shared_worker(self):
+        assert get_worker() is get_worker()